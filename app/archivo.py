@@ -0,0 +1,167 @@
+# app/archivo.py
+# ─────────────────────────────────────────────────────────────
+#  Archivo caliente/frío de inspecciones
+#
+#  `inspecciones` solo crece (DELETE_AFTER_CONSOLIDATION = False)
+#  y cada consulta sobre ella se encarece con los años, aunque los
+#  conductores solo miran su ciclo actual de 15.
+#
+#  archivar() mueve a `inspecciones_archivo` (mismo esquema, mismo
+#  id) las inspecciones:
+#    - más antiguas que ARCHIVO_HORIZONTE_DIAS, y
+#    - ya incluidas en un reporte consolidado (el de su ciclo)
+#  Se ejecuta con  python -m app.scripts.archivar_inspecciones
+#
+#  Lecturas: la tabla caliente siempre; el archivo SOLO cuando el
+#  rango pedido llega a fechas archivadas:
+#    - leer_reciente() → listados "los N más recientes" (panel,
+#      APIs paginadas): si la página de la tabla caliente se llena
+#      con fechas posteriores al archivo, el archivo ni se consulta
+#    - modelos_para()  → exportaciones: UNION ALL de ambas tablas
+#      solo si fecha_desde cae en el periodo archivado
+#    - obtener()       → detalle por id, con respaldo en el archivo
+#
+#  Los rollups (stats_*) no cambian al archivar: cuentan ambas.
+# ─────────────────────────────────────────────────────────────
+
+import os
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import cache, models, replica
+
+ARCHIVO_HORIZONTE_DIAS = int(os.getenv("ARCHIVO_HORIZONTE_DIAS", "365"))
+LOTE_ARCHIVO           = 2000
+
+_I = models.Inspeccion
+_A = models.InspeccionArchivo
+
+# Mismo orden de columnas en ambas tablas (ColumnasInspeccion)
+_COLUMNAS = [c.name for c in _I.__table__.columns]
+
+
+# ══════════════════════════════════════════════════════════════
+#  QUÉ SE ARCHIVA
+# ══════════════════════════════════════════════════════════════
+
+def condicion_consolidada(modelo=_I):
+    """
+    La inspección ya quedó en un reporte consolidado: existe el
+    reporte de su usuario para su ciclo (índice usuario_id, ciclo).
+    """
+    R = models.ReporteInspeccion
+    return exists().where(
+        R.usuario_id == modelo.usuario_id,
+        R.ciclo == modelo.ciclo,
+    )
+
+
+def _archivables(corte: datetime, lote: int):
+    return (
+        select(_I.id)
+        .where(_I.fecha < corte, condicion_consolidada(_I))
+        .order_by(_I.id)
+        .limit(lote)
+    )
+
+
+def contar_archivables(db: Session, horizonte_dias: int = ARCHIVO_HORIZONTE_DIAS) -> int:
+    corte = datetime.now() - timedelta(days=horizonte_dias)
+    return db.scalar(
+        select(func.count()).select_from(_I).where(_I.fecha < corte, condicion_consolidada(_I))
+    )
+
+
+def archivar(db: Session, horizonte_dias: int = ARCHIVO_HORIZONTE_DIAS, lote: int = LOTE_ARCHIVO) -> int:
+    """
+    Mueve las inspecciones archivables por lotes de id. Cada lote se
+    copia y se borra en la misma transacción: cortar el proceso a
+    mitad no pierde ni duplica filas. Returns: filas movidas.
+    """
+    corte = datetime.now() - timedelta(days=horizonte_dias)
+    total = 0
+    while True:
+        ids = db.scalars(_archivables(corte, lote)).all()
+        if not ids:
+            break
+        try:
+            db.execute(
+                insert(_A).from_select(
+                    _COLUMNAS,
+                    select(*(_I.__table__.c[c] for c in _COLUMNAS)).where(_I.id.in_(ids)),
+                )
+            )
+            db.execute(delete(_I).where(_I.id.in_(ids)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        total += len(ids)
+
+    if total:
+        cache.invalidar_inspecciones()
+    return total
+
+
+# ══════════════════════════════════════════════════════════════
+#  LECTURA TRANSPARENTE
+# ══════════════════════════════════════════════════════════════
+
+def ultima_fecha_archivada(db: Session):
+    """Fecha más reciente del archivo (None si está vacío). Cacheada."""
+    return cache.obtener(
+        "inspecciones:archivo_ultima", lambda: db.scalar(select(func.max(_A.fecha))),
+        guardar=not replica.es_replica(db),
+    )
+
+
+def modelos_para(db: Session, fecha_desde: datetime = None) -> tuple:
+    """Tablas que hay que leer para un rango que empieza en `fecha_desde` (None = desde siempre)."""
+    ultima = ultima_fecha_archivada(db)
+    if ultima is None or (fecha_desde is not None and fecha_desde > ultima):
+        return (_I,)
+    return (_I, _A)
+
+
+def _orden(fecha, id_):
+    # fecha DESC, id DESC con las fechas NULL al final (como MySQL/SQLite)
+    return (fecha is not None, fecha or datetime.min, id_)
+
+
+def leer_reciente(
+    db: Session,
+    construir: Callable,
+    limite: int,
+    clave: Callable,
+    fecha_desde: datetime = None,
+) -> list:
+    """
+    Las `limite` filas más recientes de ambas tablas.
+
+    construir(modelo) → Select ya filtrado y ordenado (fecha DESC, id DESC),
+    sin LIMIT. clave(fila) → (fecha, id) de una fila del resultado.
+    El archivo solo se consulta si la página caliente no basta: no se
+    llenó, o su fila más antigua no es posterior a lo archivado.
+    """
+    filas = db.execute(construir(_I).limit(limite)).all()
+
+    if modelos_para(db, fecha_desde) == (_I,):
+        return filas
+    ultima = ultima_fecha_archivada(db)
+    if len(filas) >= limite:
+        fecha_min, _ = clave(filas[-1])
+        if fecha_min is not None and fecha_min > ultima:
+            return filas
+
+    archivadas = db.execute(construir(_A).limit(limite)).all()
+    if not archivadas:
+        return filas
+    return sorted(filas + archivadas, key=lambda f: _orden(*clave(f)), reverse=True)[:limite]
+
+
+def obtener(db: Session, inspeccion_id: int):
+    """Inspección por id, buscando en el archivo si ya no está en la tabla caliente."""
+    return db.get(_I, inspeccion_id) or db.get(_A, inspeccion_id)
@@ -0,0 +1,194 @@
+# app/auditoria.py
+# ─────────────────────────────────────────────────────────────
+#  Escritura de logs de auditoría (logs_auditoria)
+#
+#  Dos caminos, ambos vía registrar():
+#
+#  1. CON db  → el evento se agrega a la transacción en curso
+#               (db.add, SIN commit). El commit de la acción lo
+#               guarda: una sola transacción, acción y log juntos
+#               o ninguno. Llamar ANTES del db.commit() de la ruta.
+#
+#  2. SIN db  → eventos de lectura (login, descarga de PDF,
+#               exportaciones) que no tienen transacción propia.
+#               Van a una cola en memoria y una tarea asyncio los
+#               inserta por lotes cada AUDITORIA_FLUSH_SEG segundos
+#               o al llegar a AUDITORIA_LOTE eventos. El lifespan
+#               de main.py arranca la tarea y vacía la cola al
+#               apagar. Sin tarea (scripts) se escribe al momento.
+#
+#  La fecha es la del evento, no la de la inserción del lote.
+#  admin_id guarda el usuario que hizo la acción (admin o conductor).
+# ─────────────────────────────────────────────────────────────
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import metricas, models
+from app.database import SessionLocal
+
+_log = logging.getLogger("auditoria")
+
+AUDITORIA_FLUSH_SEG = float(os.getenv("AUDITORIA_FLUSH_SEG", "2"))
+AUDITORIA_LOTE      = int(os.getenv("AUDITORIA_LOTE", "200"))
+AUDITORIA_COLA_MAX  = int(os.getenv("AUDITORIA_COLA_MAX", "10000"))
+
+# Acciones conocidas → etiqueta para el filtro de /admin/logs
+ACCIONES = {
+    "CREAR_USUARIO":         "+ Crear usuario",
+    "EDITAR_USUARIO":        "✏ Editar usuario",
+    "ELIMINAR_USUARIO":      "✕ Eliminar usuario",
+    "SUSPENDER_USUARIO":     "⏸ Suspender usuario",
+    "REACTIVAR_USUARIO":     "▶ Reactivar usuario",
+    "LOGIN":                 "🔑 Inicio de sesión",
+    "DESCARGAR_PDF":         "📄 Descarga PDF",
+    "DESCARGAR_REPORTE":     "📚 Descarga consolidado",
+    "DESCARGAR_REPORTE15":   "📚 Reporte 15 manual",
+    "EXPORTAR_INSPECCIONES": "⬇ Exportación",
+}
+
+_cola: deque = deque()
+_lock = threading.Lock()
+_stats = {"en_transaccion": 0, "encolados": 0, "escritos": 0, "lotes": 0, "errores": 0, "max_espera_ms": 0.0}
+
+_tarea: asyncio.Task = None
+_loop: asyncio.AbstractEventLoop = None
+_despertar: asyncio.Event = None
+
+
+# ══════════════════════════════════════════════════════════════
+#  API
+# ══════════════════════════════════════════════════════════════
+
+def registrar(accion: str, detalles: str, usuario_id: int = None, db: Session = None):
+    """
+    Registra un evento de auditoría.
+
+    Con `db`: se agrega a la transacción actual (el llamador hace commit).
+    Sin `db`: se encola y se escribe por lotes en segundo plano.
+    """
+    fila = {
+        "admin_id": usuario_id,
+        "accion": accion,
+        "detalles": detalles,
+        "fecha": datetime.now(),
+    }
+
+    if db is not None:
+        db.add(models.LogAuditoria(**fila))
+        _stats["en_transaccion"] += 1
+        return
+
+    if _tarea is None or _tarea.done():
+        _escribir([(time.monotonic(), fila)])   # sin tarea de fondo: escritura directa
+        return
+
+    with _lock:
+        _cola.append((time.monotonic(), fila))
+        _stats["encolados"] += 1
+        pendientes = len(_cola)
+
+    if pendientes >= AUDITORIA_COLA_MAX:
+        # Cola llena (BD caída o lenta): se vacía en el hilo llamador
+        vaciar()
+    elif pendientes >= AUDITORIA_LOTE:
+        _loop.call_soon_threadsafe(_despertar.set)
+
+
+def vaciar() -> int:
+    """Escribe todo lo pendiente en la cola. Returns: eventos escritos."""
+    total = 0
+    while True:
+        with _lock:
+            lote = [_cola.popleft() for _ in range(min(len(_cola), AUDITORIA_LOTE))]
+        if not lote:
+            return total
+        if not _escribir(lote):
+            return total
+        total += len(lote)
+
+
+def _escribir(lote: list) -> bool:
+    db = SessionLocal()
+    try:
+        db.execute(insert(models.LogAuditoria), [fila for _, fila in lote])
+        db.commit()
+    except Exception:
+        db.rollback()
+        _stats["errores"] += 1
+        _log.exception("No se pudieron escribir %d eventos de auditoría; se reintentará", len(lote))
+        with _lock:
+            # De vuelta al frente de la cola, respetando el tope
+            espacio = max(0, AUDITORIA_COLA_MAX - len(_cola))
+            _cola.extendleft(reversed(lote[-espacio:] if espacio else []))
+        return False
+    finally:
+        db.close()
+
+    ahora = time.monotonic()
+    _stats["escritos"] += len(lote)
+    _stats["lotes"] += 1
+    _stats["max_espera_ms"] = max(_stats["max_espera_ms"], (ahora - lote[0][0]) * 1000)
+    return True
+
+
+# ══════════════════════════════════════════════════════════════
+#  TAREA DE FONDO (lifespan)
+# ══════════════════════════════════════════════════════════════
+
+async def _bucle():
+    while True:
+        try:
+            await asyncio.wait_for(_despertar.wait(), timeout=AUDITORIA_FLUSH_SEG)
+        except asyncio.TimeoutError:
+            pass
+        _despertar.clear()
+        if _cola:
+            await asyncio.to_thread(vaciar)
+
+
+def iniciar():
+    """Arranca la tarea de escritura por lotes (llamar desde el lifespan)."""
+    global _tarea, _loop, _despertar
+    _loop = asyncio.get_running_loop()
+    _despertar = asyncio.Event()
+    _tarea = asyncio.create_task(_bucle(), name="auditoria")
+
+
+async def detener():
+    """Detiene la tarea y escribe lo que quede en la cola."""
+    global _tarea
+    if _tarea is not None:
+        _tarea.cancel()
+        try:
+            await _tarea
+        except asyncio.CancelledError:
+            pass
+        _tarea = None
+    escritos = await asyncio.to_thread(vaciar)
+    if escritos:
+        _log.info("Auditoría: %d eventos escritos al apagar", escritos)
+    if _cola:
+        _log.error("Auditoría: %d eventos sin escribir al apagar", len(_cola))
+
+
+def estadisticas() -> dict:
+    return {
+        **_stats,
+        "max_espera_ms": round(_stats["max_espera_ms"], 1),
+        "pendientes": len(_cola),
+        "tarea_activa": _tarea is not None and not _tarea.done(),
+        "flush_seg": AUDITORIA_FLUSH_SEG,
+        "lote": AUDITORIA_LOTE,
+    }
+
+
+metricas.registrar("auditoria", estadisticas)
@@ -0,0 +1,231 @@
+# app/busqueda.py
+# ─────────────────────────────────────────────────────────────
+#  Búsqueda indexada de inspecciones por placa y conductor
+#
+#  Antes: placa ILIKE '%x%' / nombre_conductor ILIKE '%x%'
+#  → el comodín inicial impide usar índices: full scan por cada
+#  filtro del panel admin.
+#
+#  Ahora:
+#    placa     → columna placa_norm (MAYÚSCULAS, solo alfanumérico)
+#                con índice; se busca por PREFIJO como rango:
+#                placa_norm >= 'KSK' AND placa_norm < 'KSL'
+#                (equivale a LIKE 'KSK%' pero usa el índice también
+#                en SQLite, donde LIKE no distingue mayúsculas y
+#                por eso no lo aprovecha). En MySQL se emite
+#                LIKE 'KSK%': el rango solo vale con orden binario y
+#                las columnas usan la collation de la tabla
+#                (utf8mb4_0900_ai_ci), donde 'perez' < 'pere{' es
+#                falso; LIKE con prefijo fijo también usa el índice
+#    conductor → 1) se resuelve contra la tabla usuarios (decenas
+#                   de filas, cacheada) con coincidencia parcial
+#                   → usuario_id IN (...)  (índice usuario_id)
+#                2) OR conductor_norm con prefijo 'juan p' (mismo
+#                   rango) para nombres históricos que ya no
+#                   coinciden con el usuario
+#
+#  placa_norm / conductor_norm se llenan solos al insertar
+#  (evento before_insert) y con el backfill "busqueda_norm_v1"
+#  para filas antiguas (python -m app.scripts.migrar).
+# ─────────────────────────────────────────────────────────────
+
+import unicodedata
+
+from sqlalchemy import and_, desc, event, func, literal, or_, select, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from app import cache, models, replica
+from app.migraciones import backfill
+
+LIMITE_SUGERENCIAS = 10
+MIN_CARACTERES     = 2
+_LOTE_BACKFILL     = 2000
+
+_I = models.Inspeccion
+
+
+# ══════════════════════════════════════════════════════════════
+#  NORMALIZACIÓN
+# ══════════════════════════════════════════════════════════════
+
+def normalizar_placa(texto: str) -> str:
+    """' ksk-45a ' → 'KSK45A'"""
+    if not texto:
+        return ""
+    return "".join(c for c in texto.upper() if c.isalnum())[:20]
+
+
+def normalizar_nombre(texto: str) -> str:
+    """'  José  PÉREZ ' → 'jose perez' (sin tildes, minúsculas, un espacio)"""
+    if not texto:
+        return ""
+    sin_tildes = "".join(
+        c for c in unicodedata.normalize("NFKD", texto)
+        if not unicodedata.combining(c)
+    )
+    limpio = "".join(c if c.isalnum() else " " for c in sin_tildes.lower())
+    return " ".join(limpio.split())[:100]
+
+
+@event.listens_for(models.Inspeccion, "before_insert")
+@event.listens_for(models.Inspeccion, "before_update")
+def _llenar_columnas_norm(mapper, connection, inspeccion):
+    inspeccion.placa_norm = normalizar_placa(inspeccion.placa) or None
+    inspeccion.conductor_norm = normalizar_nombre(inspeccion.nombre_conductor) or None
+
+
+# ══════════════════════════════════════════════════════════════
+#  CONDICIONES (usadas por los filtros del panel y exportaciones)
+# ══════════════════════════════════════════════════════════════
+
+def _nombres_usuarios(db: Session) -> list:
+    """[(usuario_id, "nombre visible normalizado nombre cedula"), ...] — cacheado."""
+    def calcular():
+        return [
+            (u.id, normalizar_nombre(f"{u.nombre_visible or ''} {u.nombre or ''} {u.cedula}"))
+            for u in db.query(
+                models.Usuario.id, models.Usuario.nombre_visible,
+                models.Usuario.nombre, models.Usuario.cedula,
+            )
+        ]
+    return cache.obtener("usuarios:nombres_norm", calcular, guardar=not replica.es_replica(db))
+
+
+def usuarios_por_nombre(db: Session, texto: str) -> list:
+    """IDs de usuarios cuyo nombre/cédula contiene `texto` (coincidencia parcial)."""
+    termino = normalizar_nombre(texto)
+    if not termino:
+        return []
+    return [uid for uid, nombre in _nombres_usuarios(db) if termino in nombre]
+
+
+class _Prefijo(FunctionElement):
+    """(columna, desde, hasta, patron) → condición de prefijo según el motor."""
+    inherit_cache = True
+    name = "prefijo"
+
+
+@compiles(_Prefijo)
+def _prefijo_rango(elemento, compilador, **kw):
+    # Orden binario (SQLite): rango >= 'abc' AND < 'abd'
+    columna, desde, hasta, _ = elemento.clauses
+    return compilador.process(and_(columna >= desde, columna < hasta).self_group(), **kw)
+
+
+@compiles(_Prefijo, "mysql")
+def _prefijo_like(elemento, compilador, **kw):
+    # Collation _ci: el rango binario no vale; LIKE 'abc%' (índice igual)
+    columna, _, _, patron = elemento.clauses
+    return compilador.process(columna.like(patron, escape="/"), **kw)
+
+
+def _con_prefijo(columna, prefijo: str):
+    """columna LIKE 'abc%' escrito de forma indexable en cada motor."""
+    siguiente = prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+    patron = prefijo.replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+    return _Prefijo(columna, literal(prefijo), literal(siguiente), literal(patron))
+
+
+def condicion_conductor(db: Session, texto: str, modelo=_I):
+    """`modelo`: Inspeccion o InspeccionArchivo (mismas columnas)."""
+    termino = normalizar_nombre(texto)
+    if not termino:
+        return modelo.conductor_norm.is_not(None)
+    ids = usuarios_por_nombre(db, termino)
+    por_nombre = _con_prefijo(modelo.conductor_norm, termino)
+    return or_(modelo.usuario_id.in_(ids), por_nombre) if ids else por_nombre
+
+
+def condicion_placa(texto: str, modelo=_I):
+    prefijo = normalizar_placa(texto)
+    if not prefijo:
+        return modelo.placa_norm.is_not(None)
+    return _con_prefijo(modelo.placa_norm, prefijo)
+
+
+# ══════════════════════════════════════════════════════════════
+#  SUGERENCIAS (endpoint JSON del filtro)
+# ══════════════════════════════════════════════════════════════
+
+def sugerencias(db: Session, q: str, limite: int = LIMITE_SUGERENCIAS, totales: dict = None) -> dict:
+    """
+    Autocompletado del panel: conductores y placas que empiezan
+    (o contienen, para conductores) el texto.
+
+    Returns:
+        {"conductores": [{"usuario_id", "nombre", "total"}],
+         "placas": [{"placa", "total", "ultima"}]}
+    """
+    resultado = {"conductores": [], "placas": []}
+    totales = totales or {}
+
+    termino = normalizar_nombre(q)
+    if len(termino) >= MIN_CARACTERES:
+        ids = usuarios_por_nombre(db, termino)
+        if ids:
+            ids.sort(key=lambda uid: totales.get(uid, 0), reverse=True)
+            ids = ids[:limite]
+            nombres = dict(
+                db.query(
+                    models.Usuario.id,
+                    func.coalesce(models.Usuario.nombre_visible, models.Usuario.nombre, models.Usuario.cedula),
+                ).filter(models.Usuario.id.in_(ids))
+            )
+            resultado["conductores"] = [
+                {"usuario_id": uid, "nombre": nombres.get(uid), "total": totales.get(uid, 0)}
+                for uid in ids
+            ]
+
+    prefijo = normalizar_placa(q)
+    if len(prefijo) >= MIN_CARACTERES:
+        filas = db.execute(
+            select(
+                _I.placa_norm,
+                func.count().label("total"),
+                func.max(_I.fecha).label("ultima"),
+            )
+            .where(_con_prefijo(_I.placa_norm, prefijo))
+            .group_by(_I.placa_norm)
+            .order_by(desc("total"))
+            .limit(limite)
+        ).all()
+        resultado["placas"] = [
+            {"placa": f.placa_norm, "total": f.total, "ultima": f.ultima.isoformat() if f.ultima else None}
+            for f in filas
+        ]
+
+    return resultado
+
+
+# ══════════════════════════════════════════════════════════════
+#  BACKFILL — filas anteriores a las columnas *_norm
+# ══════════════════════════════════════════════════════════════
+
+@backfill("busqueda_norm_v1", origen=(models.Inspeccion,))
+def backfill_columnas_norm(db: Session) -> int:
+    """Recorre inspecciones por id en lotes y llena placa_norm / conductor_norm."""
+    ultimo_id = 0
+    total = 0
+    while True:
+        filas = db.execute(
+            select(_I.id, _I.placa, _I.nombre_conductor)
+            .where(_I.id > ultimo_id)
+            .order_by(_I.id)
+            .limit(_LOTE_BACKFILL)
+        ).all()
+        if not filas:
+            return total
+
+        db.execute(update(_I), [
+            {
+                "id": f.id,
+                "placa_norm": normalizar_placa(f.placa) or None,
+                "conductor_norm": normalizar_nombre(f.nombre_conductor) or None,
+            }
+            for f in filas
+        ])
+        db.commit()
+        total += len(filas)
+        ultimo_id = filas[-1].id
@@ -0,0 +1,222 @@
+# app/cache.py
+# ─────────────────────────────────────────────────────────────
+#  Caché de agregados (dashboard, listas admin) con TTL
+#  + invalidación explícita.
+#
+#  Los agregados solo cambian cuando se envía una inspección o
+#  se edita un usuario, así que:
+#    - cada valor vive como máximo CACHE_TTL_SEG segundos
+#    - submit_inspeccion y las rutas que mutan usuarios llaman
+#      a invalidar_inspecciones() / invalidar_usuarios()
+#
+#  Backends (CACHE_BACKEND en .env):
+#    memoria  → dict en el proceso (defecto). Cada worker de
+#               gunicorn tiene el suyo; el TTL acota la diferencia.
+#    sqlite   → archivo local compartido por todos los workers
+#               (CACHE_SQLITE_PATH). La invalidación es global.
+#    ninguno  → desactiva la caché (siempre recalcula).
+#
+#  Claves con prefijo por dominio: "dashboard:", "inspecciones:",
+#  "usuarios:". invalidar() borra por prefijo.
+#
+#  Lo leído de la réplica (app/replica.py) NO se guarda
+#  (guardar=False): tras un submit, la réplica puede ir hasta
+#  DB_REPLICA_RETRASO_MAX_SEG atrasada y volvería a llenar la caché
+#  recién invalidada con datos viejos para todos durante el TTL.
+# ─────────────────────────────────────────────────────────────
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from app import metricas
+
+_log = logging.getLogger("cache")
+
+_HERE = Path(__file__).resolve().parent  # app/
+
+CACHE_BACKEND     = os.getenv("CACHE_BACKEND", "memoria").lower()
+CACHE_TTL_SEG     = int(os.getenv("CACHE_TTL_SEG", "60"))
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", str(_HERE / "data" / "cache.db"))
+
+
+# ══════════════════════════════════════════════════════════════
+#  BACKENDS
+# ══════════════════════════════════════════════════════════════
+
+class MemoriaBackend:
+    """Dict en memoria del proceso, protegido con lock."""
+
+    def __init__(self):
+        self._datos: dict = {}
+        self._lock = threading.Lock()
+
+    def leer(self, clave: str):
+        with self._lock:
+            item = self._datos.get(clave)
+            if item is None:
+                return False, None
+            expira, valor = item
+            if expira < time.monotonic():
+                del self._datos[clave]
+                return False, None
+            return True, valor
+
+    def escribir(self, clave: str, valor: Any, ttl: int):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + ttl, valor)
+
+    def borrar_prefijo(self, prefijo: str):
+        with self._lock:
+            for clave in [k for k in self._datos if k.startswith(prefijo)]:
+                del self._datos[clave]
+
+
+class SQLiteBackend:
+    """
+    Archivo SQLite local compartido entre workers.
+
+    Los valores se serializan con pickle (solo los escribe la propia
+    app, en un archivo local). Expiración con reloj de pared porque
+    los workers son procesos distintos.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        con = self._conexion()
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " clave TEXT PRIMARY KEY,"
+            " valor BLOB NOT NULL,"
+            " expira REAL NOT NULL)"
+        )
+
+    def _conexion(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def leer(self, clave: str):
+        fila = self._conexion().execute(
+            "SELECT valor, expira FROM cache WHERE clave = ?", (clave,)
+        ).fetchone()
+        if fila is None or fila[1] < time.time():
+            return False, None
+        return True, pickle.loads(fila[0])
+
+    def escribir(self, clave: str, valor: Any, ttl: int):
+        self._conexion().execute(
+            "INSERT OR REPLACE INTO cache (clave, valor, expira) VALUES (?, ?, ?)",
+            (clave, pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL), time.time() + ttl),
+        )
+
+    def borrar_prefijo(self, prefijo: str):
+        patron = prefijo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        self._conexion().execute(
+            "DELETE FROM cache WHERE clave LIKE ? ESCAPE '\\' OR expira < ?",
+            (patron, time.time()),
+        )
+
+
+class SinCacheBackend:
+    def leer(self, clave: str):
+        return False, None
+
+    def escribir(self, clave: str, valor: Any, ttl: int):
+        pass
+
+    def borrar_prefijo(self, prefijo: str):
+        pass
+
+
+def _crear_backend():
+    if CACHE_BACKEND == "sqlite":
+        try:
+            return SQLiteBackend(CACHE_SQLITE_PATH)
+        except Exception:
+            _log.exception("No se pudo abrir la caché SQLite (%s); usando memoria", CACHE_SQLITE_PATH)
+            return MemoriaBackend()
+    if CACHE_BACKEND == "ninguno":
+        return SinCacheBackend()
+    return MemoriaBackend()
+
+
+_backend = _crear_backend()
+_stats = {"hits": 0, "misses": 0, "invalidaciones": 0}
+
+
+# ══════════════════════════════════════════════════════════════
+#  API
+# ══════════════════════════════════════════════════════════════
+
+def obtener(clave: str, calcular: Callable[[], Any], ttl: int = None, guardar: bool = True) -> Any:
+    """
+    Devuelve el valor cacheado de `clave` o lo calcula con `calcular()`.
+    guardar=False: usa un hit, pero lo calculado no se escribe
+    (p. ej. `guardar=not replica.es_replica(db)`).
+
+    Un fallo del backend nunca rompe el request: se recalcula.
+    """
+    try:
+        hit, valor = _backend.leer(clave)
+    except Exception:
+        _log.exception("Error leyendo caché (%s)", clave)
+        hit, valor = False, None
+
+    if hit:
+        _stats["hits"] += 1
+        return valor
+
+    _stats["misses"] += 1
+    valor = calcular()
+    if not guardar:
+        return valor
+    try:
+        _backend.escribir(clave, valor, ttl or CACHE_TTL_SEG)
+    except Exception:
+        _log.exception("Error escribiendo caché (%s)", clave)
+    return valor
+
+
+def invalidar(*prefijos: str):
+    """Borra todas las claves que empiezan por alguno de los prefijos."""
+    for prefijo in prefijos:
+        try:
+            _backend.borrar_prefijo(prefijo)
+        except Exception:
+            _log.exception("Error invalidando caché (%s)", prefijo)
+    _stats["invalidaciones"] += 1
+
+
+def invalidar_inspecciones():
+    """Hook: llamar tras el commit de un submit."""
+    invalidar("dashboard:", "inspecciones:", "usuarios:")
+
+
+def invalidar_usuarios():
+    """Hook: llamar tras crear/editar/suspender/eliminar un usuario."""
+    invalidar("dashboard:", "usuarios:")
+
+
+def estadisticas() -> dict:
+    total = _stats["hits"] + _stats["misses"]
+    return {
+        "backend": type(_backend).__name__,
+        "ttl_seg": CACHE_TTL_SEG,
+        **_stats,
+        "hit_rate": round(_stats["hits"] / total, 4) if total else 0.0,
+    }
+
+
+metricas.registrar("cache_agregados", estadisticas)
@@ -0,0 +1,155 @@
+# app/ciclos.py
+# ─────────────────────────────────────────────────────────────
+#  Ciclos de consolidación (15 inspecciones por ciclo)
+#
+#  Antes: cada submit hacía count(*) de las inspecciones del
+#  usuario y consolidaba si el total era exactamente 15:
+#    - un count completo por submit
+#    - dos submits concurrentes podían ver 14 → 16 y saltarse
+#      la consolidación
+#    - pasado el 15, el total nunca volvía a ser 15
+#
+#  Ahora:
+#    contadores_usuario.total se incrementa con UN UPSERT atómico
+#    (total = total + 1) dentro de la transacción del submit y se
+#    lee de vuelta: la fila queda bloqueada hasta el commit, así que
+#    cada submit obtiene un número distinto (1, 2, 3...).
+#      n        → posición global de la inspección del usuario
+#      ciclo    → (n - 1) // 15 + 1   (columna inspecciones.ciclo)
+#      cierre   → n % 15 == 0          (consolidar el ciclo)
+#    El ciclo se lee por índice (usuario_id, ciclo).
+#
+#  contadores_usuario.version sube con el total y con cada reporte
+#  consolidado (marcar_cambio): es la versión del historial del
+#  conductor (ETag de /inspecciones/mis-inspecciones).
+#
+#  Filas anteriores: backfill "ciclos_v1" (python -m app.scripts.migrar).
+#  Un usuario sin contador (antes del backfill) lo inicializa con
+#  su count(*) la primera vez.
+# ─────────────────────────────────────────────────────────────
+
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import insertar_si_falta, upsert_incremento
+from app.migraciones import backfill
+
+TAMANO_CICLO = 15
+
+_C = models.ContadorUsuario
+_MODELOS = (models.Inspeccion, models.InspeccionArchivo)
+
+
+def ciclo_de(n: int) -> int:
+    """Posición global (1-based) → número de ciclo (1-based)."""
+    return (n - 1) // TAMANO_CICLO + 1
+
+
+def _contar_existentes(db: Session, usuario_id: int) -> int:
+    return sum(
+        db.scalar(select(func.count()).select_from(M).where(M.usuario_id == usuario_id))
+        for M in _MODELOS
+    )
+
+
+def _sembrar(db: Session, usuario_id: int):
+    if db.get(_C, usuario_id) is None:
+        # Usuario sin contador todavía: se siembra con lo que ya tiene
+        insertar_si_falta(
+            db, _C,
+            {"usuario_id": usuario_id, "total": _contar_existentes(db, usuario_id), "actualizado": datetime.now()},
+            ["usuario_id"],
+        )
+
+
+def siguiente(db: Session, usuario_id: int) -> int:
+    """
+    Reserva la siguiente posición del usuario (atómico, SIN commit:
+    va en la transacción del submit). Returns: n (1, 2, 3...).
+    """
+    _sembrar(db, usuario_id)
+    upsert_incremento(
+        db, _C, {"usuario_id": usuario_id}, {"total": 1, "version": 1},
+        asignar={"actualizado": datetime.now()},
+    )
+    return db.scalar(select(_C.total).where(_C.usuario_id == usuario_id))
+
+
+def marcar_cambio(db: Session, usuario_id: int):
+    """Cambio en el historial del usuario que no es un submit (reporte consolidado). SIN commit."""
+    _sembrar(db, usuario_id)
+    upsert_incremento(db, _C, {"usuario_id": usuario_id}, {"version": 1}, asignar={"actualizado": datetime.now()})
+
+
+def version_usuario(db: Session, usuario_id: int) -> tuple:
+    """(total, version) del historial del usuario en una lectura por PK."""
+    fila = db.execute(select(_C.total, _C.version).where(_C.usuario_id == usuario_id)).first()
+    if fila is None:
+        return _contar_existentes(db, usuario_id), 0
+    return fila.total, fila.version or 0
+
+
+def total_usuario(db: Session, usuario_id: int) -> int:
+    """Inspecciones enviadas por el usuario (lectura por PK)."""
+    total = db.scalar(select(_C.total).where(_C.usuario_id == usuario_id))
+    return total if total is not None else _contar_existentes(db, usuario_id)
+
+
+def ciclo_actual(db: Session, usuario_id: int) -> int:
+    """Ciclo de la última inspección del usuario (1 si no tiene ninguna)."""
+    return ciclo_de(max(total_usuario(db, usuario_id), 1))
+
+
+def inspecciones_del_ciclo(db: Session, usuario_id: int, ciclo: int) -> list:
+    """Inspecciones de un ciclo, de la más antigua a la más reciente (índice usuario_id, ciclo)."""
+    I = models.Inspeccion
+    return (
+        db.query(I)
+        .filter(I.usuario_id == usuario_id, I.ciclo == ciclo)
+        .order_by(I.fecha, I.id)
+        .all()
+    )
+
+
+# ══════════════════════════════════════════════════════════════
+#  BACKFILL — ciclo de las inspecciones anteriores + contadores
+# ══════════════════════════════════════════════════════════════
+
+@backfill("ciclos_v1", origen=(models.Inspeccion, models.InspeccionArchivo))
+def backfill_ciclos(db: Session) -> int:
+    """
+    Numera las inspecciones de cada usuario por (fecha, id), en la
+    tabla caliente y en el archivo, y deja su contador en el total.
+    Un commit por usuario.
+    """
+    usuarios = set()
+    for M in _MODELOS:
+        usuarios.update(db.scalars(select(M.usuario_id).where(M.usuario_id.is_not(None)).distinct()))
+
+    total = 0
+    for uid in sorted(usuarios):
+        filas = sorted(
+            (
+                (f.fecha or datetime.min, f.id, M)
+                for M in _MODELOS
+                for f in db.execute(select(M.id, M.fecha).where(M.usuario_id == uid))
+            ),
+            key=lambda t: (t[0], t[1]),
+        )
+        por_modelo = {M: [] for M in _MODELOS}
+        for n, (_, id_, M) in enumerate(filas, 1):
+            por_modelo[M].append({"id": id_, "ciclo": ciclo_de(n)})
+        for M, cambios in por_modelo.items():
+            if cambios:
+                db.execute(update(M), cambios)
+
+        upsert_incremento(
+            db, _C, {"usuario_id": uid}, {},
+            asignar={"total": len(filas), "actualizado": datetime.now()},
+        )
+        db.commit()
+        total += len(filas)
+    return total
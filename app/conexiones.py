@@ -0,0 +1,213 @@
+# app/conexiones.py
+# ─────────────────────────────────────────────────────────────
+#  Pool de conexiones a la BD: configuración e instrumentación
+#
+#  Antes: pool por defecto (5 + 10 de overflow, timeout 30 s, sin
+#  recycle) con pool_pre_ping=True → un SELECT 1 extra en CADA
+#  checkout. Con varios workers de gunicorn al inicio de turno
+#  aparecían "QueuePool limit ... timed out".
+#
+#  Ahora todo se ajusta por entorno (ver .env.example):
+#    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE
+#    DB_PRE_PING:
+#      siempre   → pool_pre_ping de SQLAlchemy (ping en cada checkout)
+#      inactivas → ping solo si la conexión llevaba más de
+#                  DB_PING_INACTIVA_SEG sin usarse (defecto)
+#      no        → sin ping (confía en DB_POOL_RECYCLE)
+#
+#  QueuePoolInstrumentado mide cuánto espera cada checkout por una
+#  conexión libre:
+#    - histograma de esperas, conexiones en uso, overflow, timeouts
+#      → /api/admin/metricas ("pool_bd"), por worker
+#    - esperas > DB_POOL_ESPERA_ALERTA_MS → warning en el log con la
+#      ruta del request (como mucho uno cada _ALERTA_CADA_SEG)
+# ─────────────────────────────────────────────────────────────
+
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app import metricas, perfilado
+
+_log = logging.getLogger("conexiones")
+
+DB_POOL_SIZE        = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW     = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT     = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE     = int(os.getenv("DB_POOL_RECYCLE", "1800"))   # < wait_timeout de MySQL
+DB_PRE_PING         = os.getenv("DB_PRE_PING", "inactivas").strip().lower()
+DB_PING_INACTIVA_SEG = float(os.getenv("DB_PING_INACTIVA_SEG", "300"))
+DB_POOL_ESPERA_ALERTA_MS = float(os.getenv("DB_POOL_ESPERA_ALERTA_MS", "500"))
+
+MODOS_PRE_PING = ("siempre", "inactivas", "no")
+if DB_PRE_PING not in MODOS_PRE_PING:
+    raise RuntimeError(f"❌ DB_PRE_PING inválido: {DB_PRE_PING!r} (use {' | '.join(MODOS_PRE_PING)})")
+
+_ALERTA_CADA_SEG = 10
+# Límites superiores (ms) de los buckets del histograma de espera
+_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+_lock = threading.Lock()
+_stats = {
+    "checkouts": 0,
+    "espera_ms_total": 0.0,
+    "espera_ms_max": 0.0,
+    "esperas_lentas": 0,
+    "overflow_eventos": 0,   # checkouts que abrieron una conexión de overflow
+    "timeouts": 0,           # checkouts que agotaron DB_POOL_TIMEOUT
+    "pings": 0,
+    "pings_fallidos": 0,
+}
+_histograma = [0] * (len(_BUCKETS_MS) + 1)
+_alerta = {"ultima": 0.0, "suprimidas": 0}
+_engines: dict = {}   # nombre → Engine (primaria, replica)
+
+
+def _ruta_actual() -> str:
+    perfil = perfilado.perfil_actual()
+    return perfil.ruta if perfil is not None else "(fuera de request)"
+
+
+def _registrar_espera(pool: QueuePool, espera_ms: float, overflow: bool):
+    with _lock:
+        _stats["checkouts"] += 1
+        _stats["espera_ms_total"] += espera_ms
+        _stats["espera_ms_max"] = max(_stats["espera_ms_max"], espera_ms)
+        _stats["overflow_eventos"] += overflow
+        i = next((i for i, limite in enumerate(_BUCKETS_MS) if espera_ms <= limite), len(_BUCKETS_MS))
+        _histograma[i] += 1
+
+        if espera_ms < DB_POOL_ESPERA_ALERTA_MS:
+            return
+        _stats["esperas_lentas"] += 1
+        ahora = time.monotonic()
+        if ahora - _alerta["ultima"] < _ALERTA_CADA_SEG:
+            _alerta["suprimidas"] += 1
+            return
+        suprimidas, _alerta["suprimidas"], _alerta["ultima"] = _alerta["suprimidas"], 0, ahora
+
+    _log.warning(
+        "Espera de %.0f ms por una conexión en %s (en uso %d/%d, overflow %d/%d)%s",
+        espera_ms, _ruta_actual(), pool.checkedout(), pool.size(),
+        max(pool.overflow(), 0), DB_MAX_OVERFLOW,
+        f" · {suprimidas} esperas lentas más desde el último aviso" if suprimidas else "",
+    )
+
+
+class QueuePoolInstrumentado(QueuePool):
+    """QueuePool que mide la espera de cada checkout."""
+
+    def _do_get(self):
+        overflow_antes = self.overflow()
+        t0 = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except exc.TimeoutError:
+            with _lock:
+                _stats["timeouts"] += 1
+            _log.error(
+                "Pool agotado en %s: %d en uso, sin conexión tras %.0f s",
+                _ruta_actual(), self.checkedout(), DB_POOL_TIMEOUT,
+            )
+            raise
+        # overflow() cuenta desde -pool_size: solo > 0 es una conexión de overflow
+        abrio_overflow = self.overflow() > max(overflow_antes, 0)
+        _registrar_espera(self, (time.perf_counter() - t0) * 1000, abrio_overflow)
+        return conexion
+
+
+# ══════════════════════════════════════════════════════════════
+#  PING DE CONEXIONES INACTIVAS (DB_PRE_PING=inactivas)
+# ══════════════════════════════════════════════════════════════
+
+def _al_devolver(dbapi_conn, registro):
+    registro.info["devuelta"] = time.monotonic()
+
+
+def _al_prestar(dbapi_conn, registro, proxy):
+    devuelta = registro.info.get("devuelta")
+    if devuelta is None or time.monotonic() - devuelta < DB_PING_INACTIVA_SEG:
+        return   # recién creada o usada hace poco: sin round trip
+    with _lock:
+        _stats["pings"] += 1
+    cursor = dbapi_conn.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    except Exception:
+        with _lock:
+            _stats["pings_fallidos"] += 1
+        # El pool descarta esta conexión y reintenta con otra
+        raise exc.DisconnectionError()
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+# ══════════════════════════════════════════════════════════════
+#  API
+# ══════════════════════════════════════════════════════════════
+
+def opciones_engine() -> dict:
+    """kwargs de create_engine para el pool configurado."""
+    return {
+        "poolclass": QueuePoolInstrumentado,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_PRE_PING == "siempre",
+    }
+
+
+def instalar(engine: Engine, nombre: str = "primaria"):
+    """Engancha el ping de inactivas (si aplica) y las métricas. Idempotente."""
+    _engines[nombre] = engine
+    if DB_PRE_PING == "inactivas" and not event.contains(engine, "checkout", _al_prestar):
+        event.listen(engine, "checkin", _al_devolver)
+        event.listen(engine, "checkout", _al_prestar)
+
+
+def estadisticas() -> dict:
+    with _lock:
+        n = _stats["checkouts"]
+        histograma = {f"<={limite}": c for limite, c in zip(_BUCKETS_MS, _histograma)}
+        histograma[f">{_BUCKETS_MS[-1]}"] = _histograma[-1]
+        datos = {
+            **_stats,
+            "espera_ms_total": round(_stats["espera_ms_total"], 1),
+            "espera_ms_max": round(_stats["espera_ms_max"], 1),
+            "espera_ms_promedio": round(_stats["espera_ms_total"] / n, 2) if n else 0.0,
+            "histograma_espera_ms": histograma,
+        }
+    # Estado actual de cada pool; los contadores de arriba suman todos
+    datos["pools"] = {
+        nombre: {
+            "pool": type(e.pool).__name__,
+            **({
+                "en_uso": e.pool.checkedout(),
+                "libres": e.pool.checkedin(),
+                "overflow_actual": max(e.pool.overflow(), 0),
+            } if isinstance(e.pool, QueuePool) else {}),
+        }
+        for nombre, e in _engines.items()
+    }
+    datos["config"] = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout_seg": DB_POOL_TIMEOUT,
+        "recycle_seg": DB_POOL_RECYCLE,
+        "pre_ping": DB_PRE_PING,
+        "ping_inactiva_seg": DB_PING_INACTIVA_SEG,
+        "espera_alerta_ms": DB_POOL_ESPERA_ALERTA_MS,
+    }
+    return datos
+
+
+metricas.registrar("pool_bd", estadisticas)
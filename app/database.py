@@ -1,31 +1,64 @@
 # app/database.py
 
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import sessionmaker, declarative_base, Session
 from dotenv import load_dotenv
+from fastapi import Request
 
 # Carga .env SOLO si existe (local / VPS)
 load_dotenv()
 
+from app import conexiones, sqlite_local  # noqa: E402  (leen DB_POOL_* / SQLITE_* del .env ya cargado)
+
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_NAME = os.getenv("DB_NAME")
 
-if not all([DB_USER, DB_PASSWORD, DB_NAME]):
-    raise RuntimeError("❌ Variables de entorno de base de datos incompletas")
+# DATABASE_URL explícita (p. ej. sqlite:////opt/misionales/misionales.db
+# en sucursales sin servidor MySQL, ver app/sqlite_local.py) o MySQL
+# a partir de DB_USER / DB_PASSWORD / DB_HOST / DB_NAME
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+if not DATABASE_URL:
+    if not all([DB_USER, DB_PASSWORD, DB_NAME]):
+        raise RuntimeError("❌ Variables de entorno de base de datos incompletas (DATABASE_URL o DB_USER/DB_PASSWORD/DB_NAME)")
 
-DATABASE_URL = (
+    DATABASE_URL = (
+        f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}"
+        f"@{DB_HOST}/{DB_NAME}?charset=utf8mb4"
+    )
+
+# Réplica de lectura opcional (ver app/replica.py): URL completa o solo
+# el host (mismas credenciales y base de datos que la primaria)
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST")
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL") or (
     f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}"
-    f"@{DB_HOST}/{DB_NAME}?charset=utf8mb4"
+    f"@{DB_REPLICA_HOST}/{DB_NAME}?charset=utf8mb4"
+    if DB_REPLICA_HOST else None
 )
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,   # evita conexiones muertas
-    echo=False,           # en producción debe ser False
-)
+
+def _crear_engine(url: str, nombre: str):
+    # Pool configurable por entorno e instrumentado (ver app/conexiones.py)
+    opciones = conexiones.opciones_engine()
+    if sqlite_local.es_sqlite(url):
+        opciones.update(sqlite_local.opciones_engine())
+    nuevo = create_engine(
+        url,
+        echo=False,           # en producción debe ser False
+        **opciones,
+    )
+    conexiones.instalar(nuevo, nombre)
+    if sqlite_local.es_sqlite(url):
+        sqlite_local.instalar(nuevo)   # WAL, pragmas y escritor único
+    return nuevo
+
+
+engine = _crear_engine(DATABASE_URL, "primaria")
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -33,6 +66,14 @@ SessionLocal = sessionmaker(
     bind=engine,
 )
 
+# None si no hay réplica configurada
+engine_replica = _crear_engine(DATABASE_REPLICA_URL, "replica") if DATABASE_REPLICA_URL else None
+SessionReplica = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=engine_replica,
+) if engine_replica is not None else None
+
 Base = declarative_base()
 
 
@@ -56,4 +97,77 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_db_lectura(request: Request):
+    """
+    Como get_db, pero para rutas de SOLO LECTURA (panel admin,
+    reportes, exportaciones): usa la réplica si está configurada,
+    responde y su retraso es aceptable; si no, la primaria.
+    Una sesión de réplica no puede escribir (ver app/replica.py).
+    """
+    from app import replica
+
+    db = SessionReplica() if replica.usar_replica(request) else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ========================================
+# UPSERT ATÓMICO DE CONTADORES
+# ========================================
+
+def upsert_incremento(db: Session, modelo, claves: dict, incrementos: dict, asignar: dict = None):
+    """
+    INSERT de la fila con los incrementos como valor inicial; si ya
+    existe, suma los incrementos en la BD (col = col + n).
+
+    Una sola sentencia atómica en MySQL (ON DUPLICATE KEY UPDATE) y en
+    SQLite (ON CONFLICT DO UPDATE): dos requests concurrentes nunca
+    pierden un incremento. NO hace commit.
+    """
+    asignar = asignar or {}
+    valores = {**claves, **incrementos, **asignar}
+    sumas = {c: getattr(modelo, c) + n for c, n in incrementos.items()}
+    dialecto = db.get_bind().dialect.name
+
+    if dialecto == "mysql":
+        stmt = mysql_insert(modelo).values(**valores)
+        stmt = stmt.on_duplicate_key_update(**sumas, **asignar)
+        db.execute(stmt)
+    elif dialecto == "sqlite":
+        stmt = sqlite_insert(modelo).values(**valores)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(claves.keys()),
+            set_={**sumas, **asignar},
+        )
+        db.execute(stmt)
+    else:
+        condicion = [getattr(modelo, k) == v for k, v in claves.items()]
+        res = db.execute(update(modelo).where(*condicion).values(**sumas, **asignar))
+        if res.rowcount == 0:
+            db.execute(insert(modelo).values(**valores))
+
+
+def insertar_si_falta(db: Session, modelo, valores: dict, claves: list):
+    """
+    INSERT de la fila solo si no existe ninguna con esas claves; si ya
+    existe no la toca. Atómico (ON DUPLICATE KEY / ON CONFLICT DO
+    NOTHING): dos requests concurrentes no chocan. NO hace commit.
+    """
+    dialecto = db.get_bind().dialect.name
+
+    if dialecto == "mysql":
+        stmt = mysql_insert(modelo).values(**valores)
+        primera = claves[0]
+        db.execute(stmt.on_duplicate_key_update(**{primera: getattr(stmt.inserted, primera)}))
+    elif dialecto == "sqlite":
+        stmt = sqlite_insert(modelo).values(**valores)
+        db.execute(stmt.on_conflict_do_nothing(index_elements=claves))
+    else:
+        condicion = [getattr(modelo, k) == valores[k] for k in claves]
+        if db.query(modelo).filter(*condicion).first() is None:
+            db.execute(insert(modelo).values(**valores))
@@ -0,0 +1,229 @@
+# app/descargas.py
+# ─────────────────────────────────────────────────────────────
+#  Entrega HTTP de los PDF guardados en disco
+#
+#  Antes: safe_return_pdf() mandaba siempre el archivo completo,
+#  sin validadores ni Cache-Control útiles: el navegador (y el
+#  service worker) volvían a bajar reportes que no cambian, y una
+#  descarga cortada en el celular empezaba otra vez de cero.
+#
+#  Ahora respuesta_pdf():
+#    - ETag FUERTE = sha256 del archivo: el guardado en
+#      reportes_inspeccion para los consolidados (reportes.etag) o,
+#      para el resto, calculado una vez por (ruta, tamaño, mtime)
+#    - Last-Modified = mtime del archivo
+#    - If-None-Match / If-Modified-Since que coinciden → 304 sin cuerpo
+#    - Range: bytes=… (un solo rango) → 206 con Content-Range;
+#      If-Range para reanudar solo si el archivo no cambió; rango
+#      imposible → 416. Varios rangos → 200 completo (lo permite la RFC)
+#    - inmutable=True → Cache-Control immutable de un año (reportes
+#      consolidados: un id = un PDF que no cambia); si no, no-cache
+#      (el navegador guarda el PDF pero revalida con el ETag)
+#
+#  Entrega por el proxy (PDF_DELIVERY, opcional):
+#    python     → los bytes salen de uvicorn (defecto)
+#    x-accel    → nginx: cabecera X-Accel-Redirect con la URI interna
+#                 PDF_ACCEL_PREFIJO + ruta relativa a PDF_ACCEL_RAIZ
+#    x-sendfile → Apache (mod_xsendfile) / lighttpd: X-Sendfile con
+#                 la ruta absoluta
+#  La autorización y el 304 siguen en la app; el proxy manda el
+#  archivo con sendfile (y resuelve Range) sin ocupar un worker
+#  durante toda la descarga lenta. Archivos fuera de la raíz → python.
+#  Prueba con un proxy de juguete: python -m app.scripts.test_x_accel
+# ─────────────────────────────────────────────────────────────
+
+import hashlib
+import logging
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import quote
+
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+_log = logging.getLogger("descargas")
+_HERE = Path(__file__).resolve().parent  # app/
+
+CACHE_INMUTABLE = "private, max-age=31536000, immutable"
+CACHE_REVALIDAR = "private, no-cache"
+_BLOQUE = 64 * 1024
+
+MODOS_ENTREGA = ("python", "x-accel", "x-sendfile")
+PDF_DELIVERY = os.getenv("PDF_DELIVERY", "python").strip().lower()
+if PDF_DELIVERY not in MODOS_ENTREGA:
+    raise ValueError(f"PDF_DELIVERY inválido: {PDF_DELIVERY!r} (use {', '.join(MODOS_ENTREGA)})")
+PDF_ACCEL_RAIZ    = Path(os.getenv("PDF_ACCEL_RAIZ", str(_HERE / "data" / "generated_pdfs"))).resolve()
+PDF_ACCEL_PREFIJO = "/" + os.getenv("PDF_ACCEL_PREFIJO", "/_pdfs/").strip("/") + "/"
+
+
+# ══════════════════════════════════════════════════════════════
+#  VALIDADORES
+# ══════════════════════════════════════════════════════════════
+
+@lru_cache(maxsize=2048)
+def _sha256(ruta: str, tamano: int, mtime_ns: int) -> str:
+    # tamaño y mtime en la clave: si el archivo se regenera, se recalcula
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(_BLOQUE), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def etag_archivo(path: Path) -> str:
+    """ETag fuerte del contenido (mismo formato que reportes.etag)."""
+    st = path.stat()
+    return f'"{_sha256(str(path), st.st_size, st.st_mtime_ns)[:32]}"'
+
+
+def _coincide(etag: str, if_none_match: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110 §13.1.2)."""
+    if if_none_match.strip() == "*":
+        return True
+    valor = etag.removeprefix("W/")
+    return any(e.strip().removeprefix("W/") == valor for e in if_none_match.split(","))
+
+
+def _fecha_http(texto: str):
+    try:
+        return parsedate_to_datetime(texto).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def no_modificado(request: Request, etag: str, mtime: float) -> bool:
+    """If-None-Match manda; If-Modified-Since solo si no viene If-None-Match."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _coincide(etag, if_none_match)
+    desde = _fecha_http(request.headers.get("if-modified-since", ""))
+    return desde is not None and int(mtime) <= desde
+
+
+def _rango(request: Request, etag: str, mtime: float, tamano: int):
+    """
+    (inicio, fin) inclusivo del Range pedido, None si se sirve completo,
+    o "fuera" si el rango no se puede satisfacer (416).
+    """
+    valor = request.headers.get("range", "").strip()
+    if not valor.startswith("bytes=") or "," in valor:
+        return None
+
+    if_range = request.headers.get("if-range")
+    if if_range:
+        # Reanudar solo si es el mismo archivo: ETag fuerte exacto o misma fecha
+        if if_range.startswith(("\"", "W/")):
+            if if_range != etag:
+                return None
+        elif _fecha_http(if_range) != int(mtime):
+            return None
+
+    inicio, _, fin = valor[len("bytes="):].partition("-")
+    try:
+        if not inicio:                       # bytes=-500 → los últimos 500
+            n = int(fin)
+            if n <= 0:
+                return "fuera"
+            return max(tamano - n, 0), tamano - 1
+        inicio = int(inicio)
+        fin = min(int(fin), tamano - 1) if fin else tamano - 1
+    except ValueError:
+        return None
+    if inicio >= tamano or fin < inicio:
+        return "fuera"
+    return inicio, fin
+
+
+def _leer(path: Path, inicio: int, fin: int):
+    with open(path, "rb") as f:
+        f.seek(inicio)
+        restante = fin - inicio + 1
+        while restante > 0:
+            bloque = f.read(min(_BLOQUE, restante))
+            if not bloque:
+                break
+            restante -= len(bloque)
+            yield bloque
+
+
+# ══════════════════════════════════════════════════════════════
+#  RESPUESTA
+# ══════════════════════════════════════════════════════════════
+
+def _cabecera_proxy(path: Path, modo: str):
+    """(cabecera, valor) para que el proxy sirva el archivo, o None si va por Python."""
+    if modo == "x-sendfile":
+        return "X-Sendfile", str(path)
+    if modo == "x-accel":
+        try:
+            relativa = path.relative_to(PDF_ACCEL_RAIZ)
+        except ValueError:
+            _log.warning("PDF fuera de PDF_ACCEL_RAIZ (%s), se sirve por Python: %s", PDF_ACCEL_RAIZ, path)
+            return None
+        return "X-Accel-Redirect", PDF_ACCEL_PREFIJO + quote(relativa.as_posix())
+    return None
+
+
+def respuesta_pdf(
+    path: Path,
+    filename: str,
+    request: Request = None,
+    etag: str = None,
+    inmutable: bool = False,
+    modo: str = None,
+) -> Response:
+    """
+    El PDF con validadores y soporte de 304 / 206. Sin `request`
+    (p. ej. el PDF recién generado del submit) se sirve completo.
+    `etag`: el guardado en BD si existe; si no, se calcula del archivo.
+    `modo`: PDF_DELIVERY por defecto.
+    """
+    st = path.stat()
+    etag = etag or etag_archivo(path)
+    mime = mimetypes.guess_type(path)[0] or "application/pdf"
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": CACHE_INMUTABLE if inmutable else CACHE_REVALIDAR,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Content-Type-Options": "nosniff",
+    }
+
+    if request is not None and no_modificado(request, etag, st.st_mtime):
+        return Response(status_code=304, headers={
+            k: headers[k] for k in ("ETag", "Last-Modified", "Cache-Control")
+        })
+
+    proxy = _cabecera_proxy(path, modo or PDF_DELIVERY)
+    if proxy is not None:
+        # Cuerpo vacío: el proxy pone los bytes, Content-Length y los 206
+        headers[proxy[0]] = proxy[1]
+        headers["Content-Type"] = mime
+        return Response(status_code=200, headers=headers)
+
+    if request is not None:
+        rango = _rango(request, etag, st.st_mtime, st.st_size)
+        if rango == "fuera":
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{st.st_size}", **headers})
+        if rango is not None:
+            inicio, fin = rango
+            headers["Content-Range"] = f"bytes {inicio}-{fin}/{st.st_size}"
+            headers["Content-Length"] = str(fin - inicio + 1)
+            return StreamingResponse(_leer(path, inicio, fin), status_code=206, media_type=mime, headers=headers)
+
+    return FileResponse(path, media_type=mime, filename=filename, headers=headers)
+
+
+def es_descarga_nueva(respuesta: Response, request: Request) -> bool:
+    """Para auditar una vez por descarga: ni 304 ni la continuación de una descarga por rangos."""
+    if respuesta.status_code == 206:
+        return respuesta.headers.get("content-range", "").startswith("bytes 0-")
+    if "x-accel-redirect" in respuesta.headers or "x-sendfile" in respuesta.headers:
+        # El rango lo resuelve el proxy: se mira lo que pidió el cliente
+        rango = request.headers.get("range", "").replace(" ", "")
+        return not rango.startswith("bytes=") or rango.startswith("bytes=0-")
+    return respuesta.status_code == 200
@@ -0,0 +1,239 @@
+# app/estadisticas.py
+# ─────────────────────────────────────────────────────────────
+#  Estadísticas precalculadas para el dashboard admin
+#
+#  Tres tablas de rollup (ver models.py):
+#    stats_diarias    → día × tipo de vehículo × usuario
+#    stats_mensuales  → año × mes
+#    stats_usuarios   → total por usuario + última inspección
+#
+#  registrar_inspeccion() se llama ANTES del commit del submit,
+#  así la inspección y sus contadores se guardan en la misma
+#  transacción (o ninguno). El dashboard lee solo de aquí.
+#
+#  reconstruir() recalcula todo desde `inspecciones` e
+#  `inspecciones_archivo` (backfill inicial o tras una corrección
+#  manual de datos).
+# ─────────────────────────────────────────────────────────────
+
+import itertools
+import json
+import logging
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import case, delete, desc, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import upsert_incremento
+
+_log = logging.getLogger("estadisticas")
+
+TIPO_DEFECTO = "Moto"
+_LOTE_INSERT = 1000
+
+
+# ══════════════════════════════════════════════════════════════
+#  HELPERS
+# ══════════════════════════════════════════════════════════════
+
+def tiene_aspecto_malo(aspectos) -> bool:
+    """True si algún aspecto está en M. Acepta formato viejo y nuevo."""
+    if not aspectos:
+        return False
+    try:
+        asp = json.loads(aspectos) if isinstance(aspectos, str) else aspectos
+    except (ValueError, TypeError):
+        return False
+    if not isinstance(asp, dict):
+        return False
+    for v in asp.values():
+        valor = v.get("valor") if isinstance(v, dict) else v
+        if valor == "M":
+            return True
+    return False
+
+
+# ══════════════════════════════════════════════════════════════
+#  ESCRITURA — incremental (en cada submit)
+# ══════════════════════════════════════════════════════════════
+
+def registrar_inspeccion(db: Session, inspeccion: models.Inspeccion):
+    """
+    Suma la inspección a los tres rollups.
+
+    NO hace commit: el llamador lo hace junto con la inspección.
+    """
+    fecha = inspeccion.fecha or datetime.now()
+    tipo = inspeccion.tipo_vehiculo or TIPO_DEFECTO
+    malo = 1 if tiene_aspecto_malo(inspeccion.aspectos) else 0
+
+    upsert_incremento(
+        db, models.EstadisticaDiaria,
+        {"dia": fecha.date(), "tipo_vehiculo": tipo, "usuario_id": inspeccion.usuario_id},
+        {"total": 1, "con_malo": malo},
+    )
+    upsert_incremento(
+        db, models.EstadisticaMensual,
+        {"anio": fecha.year, "mes": fecha.month},
+        {"total": 1},
+    )
+    upsert_incremento(
+        db, models.EstadisticaUsuario,
+        {"usuario_id": inspeccion.usuario_id},
+        {"total": 1},
+        {"ultima_inspeccion": fecha},
+    )
+
+
+# ══════════════════════════════════════════════════════════════
+#  ESCRITURA — reconstrucción completa (backfill)
+# ══════════════════════════════════════════════════════════════
+
+def reconstruir(db: Session) -> dict:
+    """
+    Borra y recalcula los rollups recorriendo `inspecciones` en streaming.
+
+    La agregación se hace en Python (no hay forma portable de leer el
+    JSON de aspectos en SQL), pero el resultado ocupa poco: una fila
+    por día/tipo/usuario. Hace commit al final.
+    """
+    diarias: dict = {}
+    mensuales: dict = {}
+    usuarios: dict = {}
+
+    # Tabla caliente + archivo (app/archivo.py): archivar no cambia los totales
+    filas = itertools.chain.from_iterable(
+        db.execute(
+            select(M.fecha, M.usuario_id, M.tipo_vehiculo, M.aspectos)
+            .execution_options(yield_per=_LOTE_INSERT)
+        )
+        for M in (models.Inspeccion, models.InspeccionArchivo)
+    )
+
+    total = 0
+    for fecha, usuario_id, tipo, aspectos in filas:
+        if fecha is None or usuario_id is None:
+            continue
+        total += 1
+        clave = (fecha.date(), tipo or TIPO_DEFECTO, usuario_id)
+        d = diarias.setdefault(clave, [0, 0])
+        d[0] += 1
+        d[1] += 1 if tiene_aspecto_malo(aspectos) else 0
+
+        mensuales[(fecha.year, fecha.month)] = mensuales.get((fecha.year, fecha.month), 0) + 1
+
+        u = usuarios.setdefault(usuario_id, [0, None])
+        u[0] += 1
+        if u[1] is None or fecha > u[1]:
+            u[1] = fecha
+
+    db.execute(delete(models.EstadisticaDiaria))
+    db.execute(delete(models.EstadisticaMensual))
+    db.execute(delete(models.EstadisticaUsuario))
+
+    _insertar_lotes(db, models.EstadisticaDiaria, [
+        {"dia": k[0], "tipo_vehiculo": k[1], "usuario_id": k[2], "total": v[0], "con_malo": v[1]}
+        for k, v in diarias.items()
+    ])
+    _insertar_lotes(db, models.EstadisticaMensual, [
+        {"anio": k[0], "mes": k[1], "total": v}
+        for k, v in mensuales.items()
+    ])
+    _insertar_lotes(db, models.EstadisticaUsuario, [
+        {"usuario_id": k, "total": v[0], "ultima_inspeccion": v[1]}
+        for k, v in usuarios.items()
+    ])
+    db.commit()
+
+    resumen = {
+        "inspecciones": total,
+        "stats_diarias": len(diarias),
+        "stats_mensuales": len(mensuales),
+        "stats_usuarios": len(usuarios),
+    }
+    _log.info("Rollups reconstruidos: %s", resumen)
+    return resumen
+
+
+def _insertar_lotes(db: Session, modelo, filas: list):
+    for i in range(0, len(filas), _LOTE_INSERT):
+        lote = filas[i:i + _LOTE_INSERT]
+        if lote:
+            db.execute(insert(modelo), lote)
+
+
+# ══════════════════════════════════════════════════════════════
+#  LECTURA — consultas del dashboard
+# ══════════════════════════════════════════════════════════════
+
+def total_inspecciones(db: Session) -> int:
+    return int(db.query(func.coalesce(func.sum(models.EstadisticaUsuario.total), 0)).scalar() or 0)
+
+
+def total_conductores(db: Session) -> int:
+    """Usuarios con al menos una inspección."""
+    return db.query(models.EstadisticaUsuario).filter(models.EstadisticaUsuario.total > 0).count()
+
+
+def totales_por_usuario(db: Session) -> dict:
+    """{usuario_id: total_inspecciones}"""
+    return {
+        usuario_id: int(total)
+        for usuario_id, total in db.query(
+            models.EstadisticaUsuario.usuario_id, models.EstadisticaUsuario.total
+        ).all()
+    }
+
+
+def top_conductores(db: Session, limite: int = 5) -> list:
+    """[(nombre, total), ...] de los usuarios activos con más inspecciones."""
+    nombre = case(
+        (func.trim(func.coalesce(models.Usuario.nombre_visible, '')) != '', models.Usuario.nombre_visible),
+        (func.trim(func.coalesce(models.Usuario.nombre, '')) != '', models.Usuario.nombre),
+        else_="Conductor " + models.Usuario.cedula
+    )
+    filas = (
+        db.query(nombre.label("nombre"), models.EstadisticaUsuario.total.label("total"))
+        .join(models.Usuario, models.Usuario.id == models.EstadisticaUsuario.usuario_id)
+        .filter(models.Usuario.activo == 1, models.EstadisticaUsuario.total > 0)
+        .order_by(desc(models.EstadisticaUsuario.total))
+        .limit(limite)
+        .all()
+    )
+    return [(f.nombre, int(f.total)) for f in filas]
+
+
+def por_dia(db: Session, dias: int = 90) -> list:
+    """Serie continua de los últimos `dias` días: [{"fecha": "dd/mm/yy", "total": n}, ...]"""
+    desde = date.today() - timedelta(days=dias)
+    filas = (
+        db.query(
+            models.EstadisticaDiaria.dia,
+            func.sum(models.EstadisticaDiaria.total).label("total"),
+        )
+        .filter(models.EstadisticaDiaria.dia >= desde)
+        .group_by(models.EstadisticaDiaria.dia)
+        .all()
+    )
+    totales = {f.dia: int(f.total) for f in filas}
+
+    return [
+        {
+            "fecha": (desde + timedelta(days=i)).strftime("%d/%m/%y"),
+            "total": totales.get(desde + timedelta(days=i), 0),
+        }
+        for i in range(dias)
+    ]
+
+
+def por_mes(db: Session) -> list:
+    """[{"anio": 2026, "meses": [n_ene, ..., n_dic]}, ...] del año más reciente al más antiguo."""
+    anual: dict = {}
+    for f in db.query(models.EstadisticaMensual).all():
+        anual.setdefault(f.anio, [0] * 12)[f.mes - 1] = int(f.total)
+
+    return [
+        {"anio": anio, "meses": anual[anio]}
+        for anio in sorted(anual.keys(), reverse=True)
+    ]
@@ -0,0 +1,206 @@
+# app/exportacion.py
+# ─────────────────────────────────────────────────────────────
+#  Exportación masiva de inspecciones (CSV / NDJSON) en streaming
+#
+#  - Los generadores abren SU PROPIA sesión: la sesión de la
+#    dependencia get_db se cierra antes de enviar la respuesta.
+#    Por eso los filtros llegan ya construidos ({modelo: [cond]}):
+#    resolverlos aquí (p. ej. conductor → usuarios) usaría esa
+#    sesión cerrada y dejaría una conexión del pool sin devolver.
+#  - Lectura con cursor del lado del servidor (stream_results +
+#    yield_per): memoria constante aunque sean 1M de filas.
+#  - Se envía un bloque cada LOTE filas; la cabecera sale de
+#    inmediato, antes de la primera consulta.
+#
+#  Aspectos aplanados → una columna por aspecto, con el texto de
+#  ASPECTOS_POR_TIPO como encabezado:
+#    - filtro tipo=Carro → solo las columnas de Carro
+#    - sin filtro        → unión de los tres tipos (las columnas
+#                          que no aplican al vehículo quedan vacías)
+#
+#  Si el rango llega a inspecciones archivadas, la consulta es un
+#  UNION ALL de inspecciones + inspecciones_archivo (app/archivo.py).
+# ─────────────────────────────────────────────────────────────
+
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from sqlalchemy import literal_column, select, union_all
+
+from app import models
+from app.database import SessionLocal
+from app.routes.inspecciones import ASPECTOS_POR_TIPO
+
+LOTE = 1000
+TIPO_DEFECTO = "Moto"
+
+_I = models.Inspeccion
+
+# (encabezado, atributo de la inspección | None = columna de Usuario)
+COLUMNAS_BASE = (
+    ("id",                  "id"),
+    ("fecha",               "fecha"),
+    ("usuario_id",          "usuario_id"),
+    ("cedula",              None),
+    ("conductor",           "nombre_conductor"),
+    ("placa",               "placa"),
+    ("tipo_vehiculo",       "tipo_vehiculo"),
+    ("proceso",             "proceso"),
+    ("desde",               "desde"),
+    ("hasta",               "hasta"),
+    ("marca",               "marca"),
+    ("modelo",              "modelo"),
+    ("linea",               "linea"),
+    ("motor",               "motor"),
+    ("gasolina",            "gasolina"),
+    ("licencia_num",        "licencia_num"),
+    ("licencia_venc",       "licencia_venc"),
+    ("porte_propiedad",     "porte_propiedad"),
+    ("soat",                "soat"),
+    ("soat_venc",           "soat_venc"),
+    ("certificado_emision", "certificado_emision"),
+    ("tecnomecanica_venc",  "tecnomecanica_venc"),
+    ("poliza_seguro",       "poliza_seguro"),
+    ("condiciones_optimas", "condiciones_optimas"),
+    ("observaciones",       "observaciones"),
+)
+
+
+# ══════════════════════════════════════════════════════════════
+#  ASPECTOS
+# ══════════════════════════════════════════════════════════════
+
+def columnas_aspectos(tipo: str = None) -> list:
+    """Encabezados de aspectos: los del tipo pedido o la unión de todos."""
+    if tipo in ASPECTOS_POR_TIPO:
+        return list(ASPECTOS_POR_TIPO[tipo])
+    return list(dict.fromkeys(
+        label for labels in ASPECTOS_POR_TIPO.values() for label in labels
+    ))
+
+
+def _valores_aspectos(aspectos: str, tipo: str) -> dict:
+    """
+    '{"1": "B", "2": {"valor": "M", ...}}' → {label: "B", ...}
+
+    La clave guardada es la posición (1-based) en la lista del tipo,
+    igual que en get_aspectos_enriquecidos del panel admin.
+    """
+    if not aspectos:
+        return {}
+    try:
+        asp = json.loads(aspectos)
+    except (ValueError, TypeError):
+        return {}
+    if not isinstance(asp, dict):
+        return {}
+
+    labels = ASPECTOS_POR_TIPO.get(tipo or TIPO_DEFECTO, ASPECTOS_POR_TIPO[TIPO_DEFECTO])
+    valores = {}
+    for k, v in asp.items():
+        try:
+            idx = int(k) - 1
+        except ValueError:
+            continue
+        if 0 <= idx < len(labels):
+            valores[labels[idx]] = v.get("valor", "") if isinstance(v, dict) else v
+    return valores
+
+
+# ══════════════════════════════════════════════════════════════
+#  LECTURA EN STREAMING
+# ══════════════════════════════════════════════════════════════
+
+def _select(M, filtros: dict):
+    columnas = [
+        (getattr(M, attr) if attr else models.Usuario.cedula).label(nombre)
+        for nombre, attr in COLUMNAS_BASE
+    ]
+    return (
+        select(*columnas, M.aspectos.label("_aspectos"))
+        .join(models.Usuario, M.usuario_id == models.Usuario.id)
+        .where(*filtros[M])
+    )
+
+
+def _filas(filtros: dict, modelos: tuple = (_I,), bind=None):
+    """
+    Genera (dict_base, aspectos_json, tipo) leyendo por lotes con su propia sesión.
+    filtros: {modelo: condiciones} ya construidas; modelos: tablas a leer (ver archivo.modelos_para);
+    bind: engine a leer (réplica o primaria, ver app/replica.py), None = primaria.
+    """
+    if len(modelos) == 1:
+        consulta = _select(modelos[0], filtros).order_by(modelos[0].fecha.desc(), modelos[0].id.desc())
+    else:
+        consulta = union_all(*(_select(M, filtros) for M in modelos)).order_by(
+            literal_column("fecha").desc(), literal_column("id").desc()
+        )
+    consulta = consulta.execution_options(stream_results=True, yield_per=LOTE)
+
+    db = SessionLocal(bind=bind) if bind is not None else SessionLocal()
+    try:
+        for fila in db.execute(consulta):
+            base = {nombre: getattr(fila, nombre) for nombre, _ in COLUMNAS_BASE}
+            yield base, fila._aspectos, fila.tipo_vehiculo
+    finally:
+        db.close()
+
+
+def _texto(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat(sep=" ", timespec="seconds")
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return "" if valor is None else valor
+
+
+# ══════════════════════════════════════════════════════════════
+#  FORMATOS
+# ══════════════════════════════════════════════════════════════
+
+def generar_csv(filtros: dict, tipo: str = None, modelos: tuple = (_I,), bind=None):
+    """CSV con BOM UTF-8 (Excel reconoce tildes y ñ)."""
+    aspectos = columnas_aspectos(tipo)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([nombre for nombre, _ in COLUMNAS_BASE] + aspectos)
+    yield "\ufeff" + buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    n = 0
+    for base, asp_json, tipo_fila in _filas(filtros, modelos, bind):
+        valores = _valores_aspectos(asp_json, tipo_fila)
+        writer.writerow(
+            [_texto(v) for v in base.values()]
+            + [valores.get(label, "") for label in aspectos]
+        )
+        n += 1
+        if n % LOTE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def generar_ndjson(filtros: dict, modelos: tuple = (_I,), bind=None):
+    """Un objeto JSON por línea; aspectos como {label: "B"|"M"}."""
+    lineas = []
+    primera = True
+    for base, asp_json, tipo_fila in _filas(filtros, modelos, bind):
+        base["fecha"] = base["fecha"].isoformat() if base["fecha"] else None
+        base["aspectos"] = _valores_aspectos(asp_json, tipo_fila)
+        lineas.append(json.dumps(base, ensure_ascii=False, default=_texto))
+        # La primera fila sale sola para que el cliente vea datos ya
+        if primera or len(lineas) >= LOTE:
+            primera = False
+            yield "\n".join(lineas) + "\n"
+            lineas = []
+
+    if lineas:
+        yield "\n".join(lineas) + "\n"
@@ -0,0 +1,373 @@
+# app/importacion.py
+# ─────────────────────────────────────────────────────────────
+#  Importación del histórico anterior a la BD
+#
+#  Antes de MySQL las inspecciones se guardaban en
+#  app/data/inspecciones.json y las firmas/PDFs sueltos en
+#  app/data/_backup_legacy/ (firma_AAAAMMDDHHMMSS.png). No había
+#  forma de traerlas al esquema actual.
+#
+#  importar():
+#    - lee el JSON en streaming (leer_objetos: un objeto cada vez,
+#      memoria constante): array JSON o un objeto por línea
+#    - mapea cada objeto a una fila de `inspecciones` (alias de
+#      claves antiguas, fechas en varios formatos, aspectos dict →
+#      texto JSON, textos recortados al largo de la columna)
+#    - conductor: usuario_id, cédula o nombre (sin tildes) de un
+#      usuario existente; si no se resuelve, queda sin usuario
+#    - firma: se enlaza (hard link; copia si no se puede) a su sitio
+#      canónico firmas/usuarios/<id>/<archivo>
+#    - INSERT por lotes de N filas (executemany), un commit por lote
+#
+#  Idempotente por clave natural (fecha al segundo, placa_norm,
+#  conductor_norm): antes de cada lote se consultan las claves ya
+#  presentes en inspecciones e inspecciones_archivo (índice fecha),
+#  lo que también descarta los repetidos de lotes anteriores del
+#  mismo archivo; dentro del lote, un set que se vacía en cada
+#  volcado. Relanzarlo tras un corte continúa donde quedó.
+#
+#  Las importadas quedan fuera de los ciclos (ciclo NULL): sus
+#  consolidados son los reporte15_*.pdf del histórico. Por eso no
+#  se importa con migraciones de datos pendientes: ciclos_v1
+#  numeraría también las importadas y desplazaría los ciclos de
+#  cada conductor. Al terminar, el script recalcula rollups y
+#  registro de vehículos.
+# ─────────────────────────────────────────────────────────────
+
+import json
+import os
+import re
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from sqlalchemy import String, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import busqueda, models, vencimientos
+from app import ciclos, reportes, vehiculos  # noqa: F401  (registran sus backfills: pendientes())
+from app.database import insertar_si_falta
+from app.migraciones import marcar_sin_datos, pendientes
+
+LOTE_IMPORTACION = 1000
+
+_I = models.Inspeccion
+_MODELOS = (models.Inspeccion, models.InspeccionArchivo)
+
+# columna → claves aceptadas en el JSON antiguo (la primera presente gana)
+ALIAS = {
+    "usuario_id":       ("usuario_id", "user_id"),
+    "nombre_conductor": ("nombre_conductor", "conductor", "nombre"),
+    "fecha":            ("fecha", "fecha_inspeccion", "timestamp", "creado"),
+    "firma_file":       ("firma_file", "firma", "firma_path", "firma_archivo"),
+    "tipo_vehiculo":    ("tipo_vehiculo", "tipo"),
+}
+# Columnas que se copian tal cual si vienen (texto)
+_COLUMNAS_TEXTO = (
+    "placa", "proceso", "desde", "hasta", "marca", "gasolina", "modelo", "motor",
+    "linea", "licencia_num", "licencia_venc", "porte_propiedad", "soat",
+    "certificado_emision", "poliza_seguro", "observaciones", "condiciones_optimas",
+)
+FORMATOS_FECHA = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d-%m-%Y %H:%M:%S", "%d-%m-%Y %H:%M", "%Y%m%d%H%M%S")
+_TIMESTAMP_ARCHIVO = re.compile(r"(\d{14})")
+
+# Largo máximo de cada columna de texto (MySQL en modo estricto rechaza lo que sobra)
+_LARGOS = {
+    c.name: c.type.length
+    for c in _I.__table__.columns
+    if isinstance(c.type, String) and c.type.length
+}
+
+
+# ══════════════════════════════════════════════════════════════
+#  LECTURA EN STREAMING
+# ══════════════════════════════════════════════════════════════
+
+def leer_objetos(ruta: Path, bloque: int = 1 << 16):
+    """
+    Genera los objetos de un array JSON ([{...}, {...}]) o de un
+    archivo con un objeto por línea, leyendo de a `bloque` caracteres.
+    En memoria solo queda el objeto en curso.
+    """
+    decodificador = json.JSONDecoder()
+    with open(ruta, encoding="utf-8-sig") as f:
+        buf, pos, en_array = "", 0, None
+        while True:
+            # Separadores entre objetos: espacios, comas y el '[' inicial
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buf):
+                mas = f.read(bloque)
+                if not mas:
+                    return
+                buf, pos = mas, 0
+                continue
+            if en_array is None:
+                en_array = buf[pos] == "["
+                pos += en_array
+                continue
+            if en_array and buf[pos] == "]":
+                return
+            try:
+                objeto, fin = decodificador.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                mas = f.read(bloque)
+                if not mas:
+                    raise
+                buf, pos = buf[pos:] + mas, 0   # objeto partido entre bloques
+                continue
+            yield objeto
+            pos = fin
+            if pos > bloque:
+                buf, pos = buf[pos:], 0
+
+
+# ══════════════════════════════════════════════════════════════
+#  MAPEO
+# ══════════════════════════════════════════════════════════════
+
+def _valor(objeto: dict, columna: str):
+    for clave in ALIAS.get(columna, (columna,)):
+        if objeto.get(clave) not in (None, ""):
+            return objeto[clave]
+    return None
+
+
+def parsear_fecha_hora(valor):
+    """ISO, dd/mm/aaaa hh:mm[:ss], AAAAMMDDHHMMSS o epoch → datetime al segundo. None si no se reconoce."""
+    if isinstance(valor, (int, float)):
+        return datetime.fromtimestamp(valor).replace(microsecond=0)
+    if not isinstance(valor, str) or not valor.strip():
+        return None
+    texto = valor.strip()
+    try:
+        return datetime.fromisoformat(texto.replace("Z", "")).replace(microsecond=0, tzinfo=None)
+    except ValueError:
+        pass
+    for fmt in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+class Usuarios:
+    """Resuelve el conductor de una fila antigua: id, cédula o nombre único."""
+
+    def __init__(self, db: Session, defecto: str = None):
+        filas = db.execute(select(models.Usuario.id, models.Usuario.cedula,
+                                  models.Usuario.nombre_visible, models.Usuario.nombre)).all()
+        self.ids = {f.id for f in filas}
+        self.por_cedula = {f.cedula: f.id for f in filas}
+        self.por_nombre: dict = {}
+        for f in filas:
+            for nombre in {busqueda.normalizar_nombre(f.nombre_visible), busqueda.normalizar_nombre(f.nombre)} - {""}:
+                # Un nombre compartido por dos usuarios no identifica a nadie
+                self.por_nombre[nombre] = f.id if self.por_nombre.get(nombre, f.id) == f.id else None
+        self.defecto = self.por_cedula.get(defecto) if defecto else None
+        if defecto and self.defecto is None:
+            raise ValueError(f"No existe un usuario con cédula {defecto}")
+
+    def resolver(self, objeto: dict, conductor_norm: str):
+        try:
+            uid = int(_valor(objeto, "usuario_id"))
+        except (TypeError, ValueError):
+            uid = None
+        if uid in self.ids:
+            return uid
+        cedula = str(objeto.get("cedula") or "").strip()
+        if cedula in self.por_cedula:
+            return self.por_cedula[cedula]
+        return self.por_nombre.get(conductor_norm) or self.defecto
+
+
+def mapear(objeto: dict, usuarios: Usuarios, normalize_placa: Callable):
+    """Objeto antiguo → dict de columnas de `inspecciones`, o None si no tiene fecha."""
+    if not isinstance(objeto, dict):
+        return None
+    firma = _valor(objeto, "firma_file")
+    firma = Path(str(firma).replace("\\", "/")).name if firma else None
+
+    fecha = parsear_fecha_hora(_valor(objeto, "fecha"))
+    if fecha is None and firma and (m := _TIMESTAMP_ARCHIVO.search(firma)):
+        fecha = parsear_fecha_hora(m.group(1))   # firma_20251017195054.png
+    if fecha is None:
+        return None
+
+    fila = {c: str(objeto[c]).strip() for c in _COLUMNAS_TEXTO if objeto.get(c) not in (None, "")}
+    fila["placa"] = normalize_placa(fila.get("placa", ""))
+    conductor = _valor(objeto, "nombre_conductor")
+    if conductor:
+        fila["nombre_conductor"] = " ".join(str(conductor).split()).title()
+    if tipo := _valor(objeto, "tipo_vehiculo"):
+        fila["tipo_vehiculo"] = str(tipo).strip()
+
+    aspectos = objeto.get("aspectos")
+    if isinstance(aspectos, (dict, list)):
+        aspectos = json.dumps(aspectos, ensure_ascii=False)
+    fila["aspectos"] = aspectos or None
+
+    fila = {c: (v[:_LARGOS[c]] if c in _LARGOS and isinstance(v, str) else v) for c, v in fila.items()}
+    fila.update(
+        fecha=fecha,
+        firma_file=firma,
+        ciclo=None,
+        placa_norm=busqueda.normalizar_placa(fila["placa"]) or None,
+        conductor_norm=busqueda.normalizar_nombre(fila.get("nombre_conductor")) or None,
+        licencia_venc_fecha=vencimientos.parsear_fecha(fila.get("licencia_venc")),
+    )
+    fila["usuario_id"] = usuarios.resolver(objeto, fila["conductor_norm"] or "")
+    return fila
+
+
+def clave_natural(fila: dict) -> tuple:
+    return (fila["fecha"], fila["placa_norm"] or "", fila["conductor_norm"] or "")
+
+
+# ══════════════════════════════════════════════════════════════
+#  FIRMAS
+# ══════════════════════════════════════════════════════════════
+
+def enlazar_firma(nombre: str, usuario_id: int, origen: Path, destino_base: Path) -> bool:
+    """Deja la firma en destino_base/usuarios/<id>/<nombre>. True si queda en su sitio."""
+    destino = destino_base / "usuarios" / str(usuario_id) / nombre
+    if destino.exists():
+        return True
+    fuente = origen / nombre
+    if not fuente.exists():
+        return False
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(fuente, destino)
+    except OSError:   # otro sistema de archivos o sin soporte de hard links
+        shutil.copy2(fuente, destino)
+    return True
+
+
+# ══════════════════════════════════════════════════════════════
+#  IMPORTACIÓN
+# ══════════════════════════════════════════════════════════════
+
+def _claves_existentes(db: Session, filas: list) -> set:
+    fechas = list({f["fecha"] for f in filas})
+    existentes = set()
+    for M in _MODELOS:
+        for fecha, placa_norm, conductor_norm in db.execute(
+            select(M.fecha, M.placa_norm, M.conductor_norm).where(M.fecha.in_(fechas))
+        ):
+            existentes.add((fecha.replace(microsecond=0) if fecha else None, placa_norm or "", conductor_norm or ""))
+    return existentes
+
+
+def _sembrar_contadores(db: Session, usuarios: set):
+    """
+    Usuarios sin contador de ciclos: se crea con sus inspecciones
+    EN ciclo, para que las importadas (ciclo NULL) no desplacen la
+    numeración (ciclos.siguiente lo sembraría con el count total).
+    """
+    for uid in usuarios:
+        total = sum(
+            db.scalar(select(func.count()).select_from(M).where(M.usuario_id == uid, M.ciclo.is_not(None)))
+            for M in _MODELOS
+        )
+        insertar_si_falta(
+            db, models.ContadorUsuario,
+            {"usuario_id": uid, "total": total, "actualizado": datetime.now()},
+            ["usuario_id"],
+        )
+
+
+def importar(
+    db: Session,
+    ruta_json: Path,
+    origen_firmas: Path,
+    destino_firmas: Path,
+    lote: int = LOTE_IMPORTACION,
+    cedula_defecto: str = None,
+    dry_run: bool = False,
+    progreso: Callable[[dict], None] = None,
+) -> dict:
+    """
+    Importa el JSON antiguo por lotes. Con dry_run no escribe nada
+    (ni filas ni firmas) pero cuenta igual (los repetidos entre lotes
+    distintos cuentan como nuevos: no llegan a la BD). Returns: resumen.
+
+    Raises:
+        RuntimeError: hay migraciones de datos pendientes (correr migrar).
+    """
+    from app.routes.inspecciones import normalize_placa
+
+    if not dry_run:
+        marcar_sin_datos(db)   # BD vacía: importar sin pasar por migrar
+    faltan = pendientes(db)
+    if faltan and not dry_run:
+        raise RuntimeError(
+            f"migraciones de datos pendientes ({', '.join(faltan)}): "
+            "ejecutar antes python -m app.scripts.migrar"
+        )
+
+    usuarios = Usuarios(db, cedula_defecto)
+    resumen = {
+        "leidas": 0, "insertadas": 0, "duplicadas": 0, "sin_fecha": 0,
+        "sin_usuario": 0, "firmas_enlazadas": 0, "firmas_sin_enlazar": 0,
+    }
+    vistas: set = set()          # claves del lote en curso (duplicados internos)
+    afectados: set = set()
+    t0 = time.perf_counter()
+
+    def volcar(filas: list):
+        nuevas = []
+        existentes = _claves_existentes(db, filas)
+        for fila in filas:
+            if clave_natural(fila) in existentes:
+                resumen["duplicadas"] += 1
+                continue
+            nuevas.append(fila)
+            if fila["usuario_id"] is None:
+                resumen["sin_usuario"] += 1
+            else:
+                afectados.add(fila["usuario_id"])
+            if fila["firma_file"]:
+                enlazada = (
+                    fila["usuario_id"] is not None and
+                    (dry_run or enlazar_firma(fila["firma_file"], fila["usuario_id"], origen_firmas, destino_firmas))
+                )
+                resumen["firmas_enlazadas" if enlazada else "firmas_sin_enlazar"] += 1
+        if nuevas and not dry_run:
+            db.execute(insert(_I), nuevas)
+            db.commit()
+        resumen["insertadas"] += len(nuevas)
+        if progreso:
+            progreso({**resumen, "filas_por_seg": resumen["leidas"] / max(time.perf_counter() - t0, 1e-9)})
+
+    por_volcar = []
+    for objeto in leer_objetos(ruta_json):
+        resumen["leidas"] += 1
+        fila = mapear(objeto, usuarios, normalize_placa)
+        if fila is None:
+            resumen["sin_fecha"] += 1
+            continue
+        clave = clave_natural(fila)
+        if clave in vistas:
+            resumen["duplicadas"] += 1
+            continue
+        vistas.add(clave)
+        por_volcar.append(fila)
+        if len(por_volcar) >= lote:
+            volcar(por_volcar)
+            por_volcar = []
+            vistas.clear()      # los lotes anteriores ya están en la BD
+    if por_volcar:
+        volcar(por_volcar)
+
+    if afectados and not dry_run:
+        _sembrar_contadores(db, afectados)
+        db.commit()
+    segundos = time.perf_counter() - t0
+    resumen["segundos"] = round(segundos, 2)
+    resumen["filas_por_seg"] = round(resumen["leidas"] / max(segundos, 1e-9))
+    resumen["usuarios"] = sorted(afectados)
+    return resumen
@@ -0,0 +1,185 @@
+# app/lecturas.py
+# ─────────────────────────────────────────────────────────────
+#  Modelo de lectura para los listados (sin ORM)
+#
+#  Antes: mis_inspecciones y la lista de usuarios cargaban
+#  entidades ORM completas (con aspectos/observaciones, pin_hash,
+#  token...) en el identity map de la sesión, para copiar después
+#  cuatro o cinco campos a un dict.
+#
+#  Ahora:
+#    - select() de Core con SOLO las columnas del listado, en el
+#      orden de los campos del DTO → DTO(*fila), sin identity map,
+#      sin estado de instancia ni lazy loads
+#    - DTOs = dataclasses con __slots__ (menos memoria por fila y
+#      acceso a atributos más rápido que un dict)
+#    - respuesta_json(): ORJSONResponse si orjson está instalado
+#      (serializa datetime y dataclasses en C); si no, JSONResponse
+#
+#  Las APIs paginadas (/api/admin/inspecciones, mis-inspecciones)
+#  ya proyectaban columnas en app/paginacion.py: aquí solo ganan el
+#  serializador.
+#
+#  Sincronización por deltas del historial del conductor:
+#  mis-inspecciones?formato=json&since=<cursor> devuelve solo lo
+#  creado después del cursor (ver cursor_historial), y el ETag sale
+#  de contadores_usuario (ciclos.version_usuario), sin consultar el
+#  listado: sin cambios → 304 tras una lectura por PK.
+#
+#  Micro-benchmark por fila: python -m app.scripts.bench_lecturas
+# ─────────────────────────────────────────────────────────────
+
+import dataclasses
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+except ImportError:   # opcional: sin orjson se usa json de la stdlib
+    orjson = None
+
+
+# ══════════════════════════════════════════════════════════════
+#  DTOs
+# ══════════════════════════════════════════════════════════════
+
+@dataclass(slots=True)
+class InspeccionLista:
+    id: int
+    fecha: datetime
+    placa: str
+    tipo_vehiculo: str
+    proceso: str
+    desde: str
+    hasta: str
+    condiciones_optimas: str
+    observaciones: str
+
+
+@dataclass(slots=True)
+class ReporteLista:
+    id: int
+    fecha_reporte: datetime
+    total_incluidas: int
+    ciclo: int
+
+
+@dataclass(slots=True)
+class UsuarioLista:
+    id: int
+    cedula: str
+    nombre_visible: str
+    nombre: str
+    rol: str
+    activo: int
+
+
+def columnas(dto, modelo) -> list:
+    """Columnas del modelo en el orden de los campos del DTO."""
+    return [getattr(modelo, f.name) for f in dataclasses.fields(dto)]
+
+
+def proyectar(db: Session, dto, consulta) -> list:
+    return [dto(*fila) for fila in db.execute(consulta)]
+
+
+# ══════════════════════════════════════════════════════════════
+#  CONSULTAS
+# ══════════════════════════════════════════════════════════════
+
+def inspecciones_del_ciclo(db: Session, usuario_id: int, ciclo: int, despues_de: int = 0) -> list:
+    """Como ciclos.inspecciones_del_ciclo, pero solo las columnas del listado (y solo id > despues_de)."""
+    I = models.Inspeccion
+    return proyectar(db, InspeccionLista, (
+        select(*columnas(InspeccionLista, I))
+        .where(I.usuario_id == usuario_id, I.ciclo == ciclo, I.id > despues_de)
+        .order_by(I.fecha, I.id)
+    ))
+
+
+def reportes_del_usuario(db: Session, usuario_id: int, despues_de: int = 0) -> list:
+    """Como reportes.del_usuario, sin ruta ni hash del PDF (y solo id > despues_de)."""
+    R = models.ReporteInspeccion
+    return proyectar(db, ReporteLista, (
+        select(*columnas(ReporteLista, R))
+        .where(R.usuario_id == usuario_id, R.id > despues_de)
+        .order_by(R.fecha_reporte.desc())
+    ))
+
+
+# ══════════════════════════════════════════════════════════════
+#  HISTORIAL DEL CONDUCTOR — cursor y ETag
+# ══════════════════════════════════════════════════════════════
+
+def cursor_historial(ciclo: int, en_ciclo: int, registros: list, reportes: list, anterior=None) -> str:
+    """
+    "ciclo.en_ciclo.ultima_inspeccion.ultimo_reporte": lo que el
+    cliente ya tiene. `anterior` = cursor leído (si la respuesta es
+    un delta, los ids que no avanzan se conservan).
+    """
+    _, _, ultima, ultimo = anterior or (0, 0, 0, 0)
+    ultima = max([ultima] + [r.id for r in registros])
+    ultimo = max([ultimo] + [r.id for r in reportes])
+    return f"{ciclo}.{en_ciclo}.{ultima}.{ultimo}"
+
+
+def leer_cursor(texto: str):
+    """Cursor → (ciclo, en_ciclo, ultima_inspeccion, ultimo_reporte); None si falta o es inválido."""
+    try:
+        partes = tuple(int(p) for p in (texto or "").split("."))
+    except ValueError:
+        return None
+    return partes if len(partes) == 4 and min(partes) >= 0 else None
+
+
+def etag_historial(usuario: models.Usuario, total: int, version: int) -> str:
+    """Cambia con cada submit, cada reporte y si el admin cambia el nombre visible."""
+    nombre = zlib.crc32((usuario.nombre_visible or usuario.nombre or "").encode("utf-8"))
+    return f'W/"h{usuario.id}-{total}-{version}-{nombre:x}"'
+
+
+def usuarios(db: Session) -> list:
+    """Todos los usuarios, sin pin_hash ni token."""
+    U = models.Usuario
+    return proyectar(db, UsuarioLista, select(*columnas(UsuarioLista, U)).order_by(U.id))
+
+
+# ══════════════════════════════════════════════════════════════
+#  SERIALIZACIÓN
+# ══════════════════════════════════════════════════════════════
+
+def _por_defecto(valor):
+    if dataclasses.is_dataclass(valor):
+        return dataclasses.asdict(valor)
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"{type(valor).__name__} no es serializable a JSON")
+
+
+def dumps(contenido) -> bytes:
+    """JSON compacto en bytes (orjson si está disponible)."""
+    if orjson is not None:
+        return orjson.dumps(contenido)
+    return json.dumps(contenido, default=_por_defecto, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class _JSONRespuesta(JSONResponse):
+    """Respaldo sin orjson: misma salida compacta que dumps()."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def respuesta_json(contenido, status_code: int = 200, headers: dict = None):
+    """JSONResponse con el serializador rápido. Acepta DTOs, datetime y date."""
+    clase = ORJSONResponse if orjson is not None else _JSONRespuesta
+    return clase(contenido, status_code=status_code, headers=headers)
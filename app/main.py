@@ -13,13 +13,16 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from sqlalchemy.orm import Session
 from app.security import get_current_user
  
-from app.database import Base, engine, get_db
-from app import models
+from app.database import Base, SessionLocal, engine, engine_replica, get_db
+from app import models, perfilado, auditoria, ciclos, particiones, descargas
+from app.migraciones import asegurar_esquema, marcar_sin_datos, pendientes
  
 # ==========================================================
 #   BASE DE DATOS — crear tablas al iniciar
+#   + columnas/índices nuevos en tablas existentes
 # ==========================================================
 Base.metadata.create_all(bind=engine)
+asegurar_esquema(engine)
  
 # ==========================================================
 #   DIRECTORIOS — rutas absolutas desde este archivo
@@ -67,6 +70,8 @@ async def lifespan(app: FastAPI):
     print(f"📂 STATIC_DIR:      {STATIC_DIR}")
     print(f"📂 TEMPLATES_DIR:   {TEMPLATES_DIR}")
     print(f"📂 PDF_DIR:         {PDF_DIR}")
+    print(f"📄 PDF_DELIVERY:    {descargas.PDF_DELIVERY}"
+          + (f" ({descargas.PDF_ACCEL_PREFIJO} → {descargas.PDF_ACCEL_RAIZ})" if descargas.PDF_DELIVERY == "x-accel" else ""))
     print(f"🔒 HTTPS_ENABLED:   {HTTPS_ENABLED}")
     print(f"🔧 DEBUG:           {DEBUG}")
     print(f"🌐 ALLOWED_HOSTS:   {ALLOWED_HOSTS}")
@@ -74,13 +79,27 @@ async def lifespan(app: FastAPI):
     print("=" * 70 + "\n")
     
     # Warnings
+    _db = SessionLocal()
+    try:
+        marcar_sin_datos(_db)   # BD recién creada: nada que migrar
+        _pendientes = pendientes(_db)
+    finally:
+        _db.close()
+    if _pendientes:
+        print(f"⚠️  WARNING: migraciones de datos pendientes: {', '.join(_pendientes)}")
+        print("   Ejecutar: python -m app.scripts.migrar\n")
+    _aviso_particiones = particiones.aviso(engine)
+    if _aviso_particiones:
+        print(f"⚠️  WARNING: {_aviso_particiones}\n")
     if DEBUG:
         print("⚠️  WARNING: DEBUG = True (no para producción)\n")
     if not HTTPS_ENABLED and not DEBUG:
         print("⚠️  WARNING: HTTPS_ENABLED = False en modo no-debug\n")
     
+    auditoria.iniciar()   # escritura por lotes de logs de auditoría
     yield
     # ── Shutdown ───────────────────────────────────────
+    await auditoria.detener()   # ✅ vacía la cola antes de salir
     print("\n🛑 Sistema detenido\n")
  
  
@@ -118,11 +137,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
-    expose_headers=["X-Advertencias", "Content-Disposition", "Content-Type"],
+    expose_headers=["X-Advertencias", "Content-Disposition", "Content-Type", "X-DB-Queries", "X-DB-Time-Ms"],
     max_age=86400,  # 24 horas
 )
  
-# ✅ 3. Headers de Seguridad (middleware personalizado)
+# ✅ 3. Perfilado SQL por request (consultas, tiempo BD, N+1)
+perfilado.instalar(engine)
+if engine_replica is not None:
+    perfilado.instalar(engine_replica)
+
+
+@app.middleware("http")
+async def perfilar_consultas(request: Request, call_next):
+    token = perfilado.iniciar(request.method, request.url.path, request.scope)
+    try:
+        response = await call_next(request)
+    finally:
+        perfil = perfilado.terminar(token)
+
+    if DEBUG and perfil is not None:
+        response.headers["X-DB-Queries"] = str(perfil.consultas)
+        response.headers["X-DB-Time-Ms"] = f"{perfil.tiempo_ms:.1f}"
+    return response
+
+
+# ✅ 4. Headers de Seguridad (middleware personalizado)
 @app.middleware("http")
 async def add_security_headers(request: Request, call_next):
     """
@@ -320,7 +359,7 @@ async def form_page(
     Si sesión expirada → levanta 401 → exception handler redirige a /login
     """
     fecha_hoy = datetime.now().strftime("%d - %m - %Y")
-    total_inspecciones = db.query(models.Inspeccion).count()
+    total_inspecciones = ciclos.total_usuario(db, usuario_actual.id)  # ✅ del usuario, por PK
 
     return templates.TemplateResponse(
         "form.html",
@@ -0,0 +1,39 @@
+# app/metricas.py
+# ─────────────────────────────────────────────────────────────
+#  Registro de métricas en proceso
+#
+#  Cada subsistema (caché de sesiones, caché de agregados, ...)
+#  registra una función sin argumentos que devuelve un dict
+#  serializable. GET /api/admin/metricas devuelve el snapshot.
+#
+#  Los valores son POR WORKER: con varios workers de gunicorn
+#  cada uno reporta sus propios contadores.
+# ─────────────────────────────────────────────────────────────
+
+import logging
+import os
+from datetime import datetime
+from typing import Callable
+
+_log = logging.getLogger("metricas")
+
+_fuentes: dict[str, Callable[[], dict]] = {}
+
+
+def registrar(nombre: str, fuente: Callable[[], dict]):
+    """Registra (o reemplaza) una fuente de métricas."""
+    _fuentes[nombre] = fuente
+
+
+def snapshot() -> dict:
+    datos = {
+        "pid": os.getpid(),
+        "timestamp": datetime.now().isoformat(),
+    }
+    for nombre, fuente in _fuentes.items():
+        try:
+            datos[nombre] = fuente()
+        except Exception as e:
+            _log.exception("Error leyendo métricas de %s", nombre)
+            datos[nombre] = {"error": type(e).__name__}
+    return datos
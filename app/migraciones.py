@@ -0,0 +1,190 @@
+# app/migraciones.py
+# ─────────────────────────────────────────────────────────────
+#  Migraciones ligeras de esquema
+#
+#  Base.metadata.create_all() crea tablas nuevas pero NO toca
+#  las existentes: una columna o un índice agregado a models.py
+#  no llega a una BD que ya tiene la tabla.
+#
+#  asegurar_esquema() compara models.py con la BD real y agrega
+#  lo que falte (solo agrega, nunca borra ni altera tipos):
+#    - columnas nuevas (siempre NULL-ables o con default)
+#    - índices declarados en el modelo
+#    - el ON DELETE de las claves foráneas que lo declaran (solo
+#      MySQL: SQLite no altera constraints ni los hace cumplir por
+#      defecto)
+#
+#  Se llama al arrancar la app y desde los scripts, después de
+#  create_all(). Es idempotente.
+#
+#  Migraciones de DATOS (backfills): cada módulo registra las
+#  suyas con @backfill("nombre"). Se ejecutan una sola vez con
+#      python -m app.scripts.migrar
+#  y quedan anotadas en `migraciones_aplicadas`. No corren al
+#  arrancar (pueden tardar); la app solo avisa si hay pendientes.
+#  Cada backfill declara las tablas que recorre (origen=): si están
+#  todas vacías (BD recién creada) no hay nada que migrar y
+#  marcar_sin_datos() lo anota como aplicado con 0 filas. Se anota
+#  en vez de saltarlo en pendientes(): las filas que lleguen después
+#  ya las escribe el código nuevo.
+# ─────────────────────────────────────────────────────────────
+
+import logging
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from app.database import Base, SessionLocal, insertar_si_falta
+from app.models import MigracionAplicada
+
+_log = logging.getLogger("migraciones")
+
+
+def _agregar_columnas(conn, tabla, existentes: set) -> list:
+    agregadas = []
+    preparador = conn.dialect.identifier_preparer
+    for col in tabla.columns:
+        if col.name in existentes:
+            continue
+        tipo = col.type.compile(dialect=conn.dialect)
+        ddl = f"ALTER TABLE {preparador.format_table(tabla)} ADD COLUMN {preparador.format_column(col)} {tipo}"
+        if col.server_default is not None:
+            ddl += f" DEFAULT {col.server_default.arg}"
+        conn.execute(text(ddl))
+        agregadas.append(f"{tabla.name}.{col.name}")
+    return agregadas
+
+
+def _agregar_indices(conn, tabla, existentes: set) -> list:
+    agregados = []
+    for indice in tabla.indexes:
+        if indice.name in existentes:
+            continue
+        conn.execute(CreateIndex(indice))
+        agregados.append(indice.name)
+    return agregados
+
+
+def _ajustar_ondelete(conn, tabla, reflejadas: list) -> list:
+    """
+    Recrea las FK cuyo ON DELETE en la BD no es el del modelo (p. ej.
+    logs_auditoria.admin_id → SET NULL: si no, un usuario con logs no
+    se puede eliminar).
+    """
+    ajustadas = []
+    preparador = conn.dialect.identifier_preparer
+    for fk in tabla.foreign_key_constraints:
+        if not fk.ondelete:
+            continue
+        columnas = [c.name for c in fk.columns]
+        actual = next((r for r in reflejadas if r["constrained_columns"] == columnas), None)
+        if actual is None or (actual["options"].get("ondelete") or "").upper() == fk.ondelete.upper():
+            continue
+        destino = fk.elements[0].column
+        nombre = actual["name"]
+        conn.execute(text(f"ALTER TABLE {preparador.format_table(tabla)} DROP FOREIGN KEY {preparador.quote(nombre)}"))
+        conn.execute(text(
+            f"ALTER TABLE {preparador.format_table(tabla)} ADD CONSTRAINT {preparador.quote(nombre)} "
+            f"FOREIGN KEY ({', '.join(preparador.quote(c) for c in columnas)}) "
+            f"REFERENCES {preparador.format_table(destino.table)} ({preparador.quote(destino.name)}) "
+            f"ON DELETE {fk.ondelete}"
+        ))
+        ajustadas.append(f"{tabla.name}.{nombre}")
+    return ajustadas
+
+
+def asegurar_esquema(engine: Engine) -> dict:
+    """
+    Agrega a las tablas existentes las columnas e índices de models.py
+    que falten y ajusta el ON DELETE de sus FK (MySQL).
+    Returns: {"columnas": [...], "indices": [...], "claves_foraneas": [...]}
+    """
+    inspector = inspect(engine)
+    tablas_bd = set(inspector.get_table_names())
+    resumen = {"columnas": [], "indices": [], "claves_foraneas": []}
+
+    with engine.begin() as conn:
+        for tabla in Base.metadata.sorted_tables:
+            if tabla.name not in tablas_bd:
+                continue  # create_all ya la creó completa
+
+            columnas = {c["name"] for c in inspector.get_columns(tabla.name)}
+            resumen["columnas"] += _agregar_columnas(conn, tabla, columnas)
+
+            indices = {i["name"] for i in inspector.get_indexes(tabla.name)}
+            resumen["indices"] += _agregar_indices(conn, tabla, indices)
+
+            if engine.dialect.name == "mysql":
+                resumen["claves_foraneas"] += _ajustar_ondelete(conn, tabla, inspector.get_foreign_keys(tabla.name))
+
+    if any(resumen.values()):
+        _log.info("Esquema actualizado: %s", resumen)
+    return resumen
+
+
+# ══════════════════════════════════════════════════════════════
+#  MIGRACIONES DE DATOS
+# ══════════════════════════════════════════════════════════════
+
+# nombre → función(db) -> filas tocadas. La función hace sus propios
+# commits por lotes; si falla a mitad, se puede relanzar.
+_BACKFILLS: dict = {}
+# nombre → modelos que recorre el backfill
+_ORIGENES: dict = {}
+
+
+def backfill(nombre: str, origen: tuple = ()):
+    """Decorador: registra una migración de datos de una sola vez."""
+    def registrar(funcion: Callable[[Session], int]):
+        _BACKFILLS[nombre] = funcion
+        _ORIGENES[nombre] = origen
+        return funcion
+    return registrar
+
+
+def pendientes(db: Session) -> list:
+    aplicadas = {n for (n,) in db.query(MigracionAplicada.nombre).all()}
+    return [n for n in _BACKFILLS if n not in aplicadas]
+
+
+def marcar_sin_datos(db: Session) -> list:
+    """
+    Anota como aplicados (0 filas) los backfills pendientes cuyas
+    tablas de origen están todas vacías. Idempotente y seguro con
+    varios workers a la vez. Hace commit. Returns: nombres anotados.
+    """
+    marcados = []
+    for nombre in pendientes(db):
+        origen = _ORIGENES[nombre]
+        if not origen or any(db.execute(select(1).select_from(M).limit(1)).first() for M in origen):
+            continue
+        insertar_si_falta(db, MigracionAplicada,
+                          {"nombre": nombre, "aplicada": datetime.now(), "filas": 0}, ["nombre"])
+        marcados.append(nombre)
+    if marcados:
+        db.commit()
+        _log.info("Backfills sin datos que migrar: %s", ", ".join(marcados))
+    return marcados
+
+
+def ejecutar_backfills(db: Session = None) -> dict:
+    """Ejecuta en orden de registro los backfills pendientes. Returns: {nombre: filas}"""
+    propia = db is None
+    db = db or SessionLocal()
+    resultado = {}
+    try:
+        for nombre in pendientes(db):
+            _log.info("Backfill %s: iniciando", nombre)
+            filas = _BACKFILLS[nombre](db)
+            db.add(MigracionAplicada(nombre=nombre, aplicada=datetime.now(), filas=filas))
+            db.commit()
+            resultado[nombre] = filas
+            _log.info("Backfill %s: %s filas", nombre, filas)
+    finally:
+        if propia:
+            db.close()
+    return resultado
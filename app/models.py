@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Date, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 from datetime import datetime
@@ -22,8 +22,11 @@ class Usuario(Base):
     inspecciones = relationship("Inspeccion", back_populates="usuario")
 
 
-class Inspeccion(Base):
-    __tablename__ = "inspecciones"
+class ColumnasInspeccion:
+    """
+    Columnas comunes de `inspecciones` y `inspecciones_archivo`
+    (mismo esquema: una fila se mueve de una a otra tal cual, con su id).
+    """
 
     id                   = Column(Integer, primary_key=True, index=True)
     usuario_id           = Column(Integer, ForeignKey("usuarios.id"))
@@ -50,7 +53,18 @@ class Inspeccion(Base):
     firma_file           = Column(String(200))
     aspectos             = Column(Text, nullable=True)
 
-    usuario = relationship("Usuario", back_populates="inspecciones")
+    # Columnas de búsqueda (ver app/busqueda.py) — se llenan solas al insertar
+    placa_norm           = Column(String(20), nullable=True)    # "KSK45A"
+    conductor_norm       = Column(String(100), nullable=True)   # "juan perez" (sin tildes)
+
+    # Ciclo de consolidación del usuario (1, 2, ...): 15 inspecciones por ciclo (ver app/ciclos.py)
+    ciclo                = Column(Integer, nullable=True)
+
+    # Vencimientos como DATE, parseados al recibir el formulario (ver app/vencimientos.py).
+    # licencia_venc queda como texto declarado (es lo que imprime el PDF).
+    licencia_venc_fecha  = Column(Date, nullable=True)
+    soat_venc            = Column(Date, nullable=True)
+    tecnomecanica_venc   = Column(Date, nullable=True)
 
     @property
     def aspectos_dict(self):
@@ -60,23 +74,231 @@ class Inspeccion(Base):
             return {}
 
 
+class Inspeccion(ColumnasInspeccion, Base):
+    __tablename__ = "inspecciones"
+
+    usuario = relationship("Usuario", back_populates="inspecciones")
+
+    # Paginación por cursor (fecha, id) — ver app/paginacion.py
+    # Búsqueda por prefijo: LIKE 'ksk%' usa el índice
+    __table_args__ = (
+        Index("ix_inspecciones_fecha_id", "fecha", "id"),
+        Index("ix_inspecciones_usuario_fecha_id", "usuario_id", "fecha", "id"),
+        Index("ix_inspecciones_placa_norm", "placa_norm"),
+        Index("ix_inspecciones_conductor_norm", "conductor_norm"),
+        Index("ix_inspecciones_usuario_ciclo", "usuario_id", "ciclo"),
+        Index("ix_inspecciones_licencia_venc_fecha", "licencia_venc_fecha"),
+        Index("ix_inspecciones_usuario_licencia_venc", "usuario_id", "licencia_venc_fecha"),
+    )
+
+
+class InspeccionArchivo(ColumnasInspeccion, Base):
+    """
+    Inspecciones antiguas ya consolidadas, movidas fuera de la tabla
+    caliente por app/scripts/archivar_inspecciones.py (ver app/archivo.py).
+    El id es el original: no se autogenera.
+    """
+    __tablename__ = "inspecciones_archivo"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+
+    usuario = relationship("Usuario")
+
+    __table_args__ = (
+        Index("ix_inspecciones_archivo_fecha_id", "fecha", "id"),
+        Index("ix_inspecciones_archivo_usuario_fecha_id", "usuario_id", "fecha", "id"),
+        Index("ix_inspecciones_archivo_placa_norm", "placa_norm"),
+        Index("ix_inspecciones_archivo_conductor_norm", "conductor_norm"),
+        Index("ix_inspecciones_archivo_usuario_ciclo", "usuario_id", "ciclo"),
+        Index("ix_inspecciones_archivo_licencia_venc_fecha", "licencia_venc_fecha"),
+        Index("ix_inspecciones_archivo_usuario_licencia_venc", "usuario_id", "licencia_venc_fecha"),
+    )
+
+
 class ReporteInspeccion(Base):
     __tablename__ = "reportes_inspeccion"
 
     id               = Column(Integer, primary_key=True, index=True)
-    nombre_conductor = Column(String(100))
+    nombre_conductor = Column(String(100))   # nombre al generar el reporte (solo informativo)
     fecha_reporte    = Column(DateTime, default=datetime.now)
     archivo_pdf      = Column(String(255))
     total_incluidas  = Column(Integer, default=15)
 
+    # Dueño y ciclo consolidado (ver app/reportes.py) — NULL en filas sin backfill
+    usuario_id       = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
+    ciclo            = Column(Integer, nullable=True)
+
+    # Metadatos del PDF: validan el ETag de la descarga sin releer el archivo
+    tamano_bytes     = Column(Integer, nullable=True)
+    sha256           = Column(String(64), nullable=True)
+    version_plantilla = Column(String(40), nullable=True)
+
+    __table_args__ = (
+        Index("ix_reportes_usuario_fecha", "usuario_id", "fecha_reporte"),
+        Index("ix_reportes_usuario_ciclo", "usuario_id", "ciclo"),
+    )
+
 
 class LogAuditoria(Base):
     __tablename__ = "logs_auditoria"
 
     id        = Column(Integer, primary_key=True, index=True)
-    admin_id  = Column(Integer, ForeignKey("usuarios.id"))
+    # Quien hizo la acción (admin, o el conductor en LOGIN / DESCARGAR_*);
+    # SET NULL: el log sobrevive a la eliminación del usuario
+    admin_id  = Column(Integer, ForeignKey("usuarios.id", ondelete="SET NULL"))
     accion    = Column(String(50))   # CREAR_USUARIO, EDITAR_USUARIO, etc.
     detalles  = Column(Text)         # Descripción detallada
     fecha     = Column(DateTime, default=datetime.now)
 
-    admin = relationship("Usuario", foreign_keys=[admin_id])
\ No newline at end of file
+    admin = relationship("Usuario", foreign_keys=[admin_id])
+
+    # /admin/logs: orden por fecha y filtro por usuario, paginados por (fecha, id)
+    __table_args__ = (
+        Index("ix_logs_auditoria_fecha_id", "fecha", "id"),
+        Index("ix_logs_auditoria_admin_fecha_id", "admin_id", "fecha", "id"),
+    )
+
+
+# ══════════════════════════════════════════════════════════════
+#  ESTADÍSTICAS PRECALCULADAS (rollups del dashboard)
+#  Se actualizan en la misma transacción de cada submit
+#  (ver app/estadisticas.py). Reconstruibles desde cero con:
+#      python -m app.scripts.reconstruir_estadisticas
+# ══════════════════════════════════════════════════════════════
+
+class EstadisticaDiaria(Base):
+    __tablename__ = "stats_diarias"
+
+    dia            = Column(Date, primary_key=True)
+    tipo_vehiculo  = Column(String(50), primary_key=True)
+    usuario_id     = Column(Integer, ForeignKey("usuarios.id"), primary_key=True)
+    total          = Column(Integer, default=0, nullable=False)
+    con_malo       = Column(Integer, default=0, nullable=False)   # inspecciones con algún aspecto en M
+
+
+class EstadisticaMensual(Base):
+    __tablename__ = "stats_mensuales"
+
+    anio           = Column(Integer, primary_key=True)
+    mes            = Column(Integer, primary_key=True)            # 1-12
+    total          = Column(Integer, default=0, nullable=False)
+
+
+class EstadisticaUsuario(Base):
+    __tablename__ = "stats_usuarios"
+
+    usuario_id        = Column(Integer, ForeignKey("usuarios.id"), primary_key=True)
+    total             = Column(Integer, default=0, nullable=False)
+    ultima_inspeccion = Column(DateTime, nullable=True)
+
+
+# ══════════════════════════════════════════════════════════════
+#  CICLOS DE CONSOLIDACIÓN (ver app/ciclos.py)
+# ══════════════════════════════════════════════════════════════
+
+class ContadorUsuario(Base):
+    """Inspecciones enviadas por usuario. Se incrementa atómicamente en cada submit."""
+    __tablename__ = "contadores_usuario"
+
+    usuario_id     = Column(Integer, ForeignKey("usuarios.id"), primary_key=True)
+    total          = Column(Integer, default=0, nullable=False)
+    # Sube con cada cambio del historial del usuario (submit o reporte
+    # consolidado): ETag de mis-inspecciones sin consultar el listado
+    version        = Column(Integer, default=0, server_default="0", nullable=False)
+    actualizado    = Column(DateTime, default=datetime.now)
+
+
+# ══════════════════════════════════════════════════════════════
+#  REGISTRO DE VEHÍCULOS (ver app/vehiculos.py)
+#  Una fila por placa con los últimos datos fijos del vehículo;
+#  se actualiza en cada submit y precarga el formulario.
+# ══════════════════════════════════════════════════════════════
+
+class Vehiculo(Base):
+    __tablename__ = "vehiculos"
+
+    placa               = Column(String(20), primary_key=True)   # normalize_placa: "KSK45A" (= inspecciones.placa_norm)
+    tipo_vehiculo       = Column(String(50))
+    marca               = Column(String(100))
+    modelo              = Column(String(50))
+    motor               = Column(String(50))
+    linea               = Column(String(50))
+    porte_propiedad     = Column(String(50))
+    soat                = Column(String(50))
+    certificado_emision = Column(String(50))
+    poliza_seguro       = Column(String(50))
+    soat_venc           = Column(Date, nullable=True, index=True)
+    tecnomecanica_venc  = Column(Date, nullable=True, index=True)
+
+    ultimo_usuario_id   = Column(Integer, ForeignKey("usuarios.id"), nullable=True, index=True)
+    ultima_inspeccion   = Column(DateTime, nullable=True)
+    inspecciones        = Column(Integer, default=0, nullable=False)
+    actualizado         = Column(DateTime, default=datetime.now)
+
+
+# ══════════════════════════════════════════════════════════════
+#  ALERTAS DE VENCIMIENTO precalculadas (ver app/vencimientos.py)
+#  Se reconstruyen cada noche con
+#      python -m app.scripts.precalcular_vencimientos
+# ══════════════════════════════════════════════════════════════
+
+class AlertaVencimiento(Base):
+    __tablename__ = "alertas_vencimiento"
+
+    id             = Column(Integer, primary_key=True)
+    documento      = Column(String(20), nullable=False)      # licencia | soat | tecnomecanica
+    usuario_id     = Column(Integer, nullable=True)          # licencia: conductor · vehículo: último conductor
+    placa          = Column(String(20), nullable=True)       # soat / tecnomecanica
+    titular        = Column(String(150))                     # nombre del conductor (para mostrar)
+    vence          = Column(Date, nullable=False, index=True)
+    calculado      = Column(DateTime, default=datetime.now)
+    hasta          = Column(Date)                            # fin de la ventana precalculada
+
+
+# ══════════════════════════════════════════════════════════════
+#  SESIONES FIRMADAS (SESSION_MODE=firmado) — revocación
+#  Ver app/security.py. Ambas tablas son pequeñas y se leen
+#  cacheadas; nunca se consultan por request.
+# ══════════════════════════════════════════════════════════════
+
+class SesionEpoca(Base):
+    """Época de sesión por usuario: subirla invalida TODOS sus tokens."""
+    __tablename__ = "sesiones_epoca"
+
+    usuario_id     = Column(Integer, primary_key=True)   # sin FK: sobrevive a la eliminación del usuario
+    epoca          = Column(Integer, default=0, nullable=False)
+    actualizado    = Column(DateTime, default=datetime.now)
+
+
+class SesionRevocada(Base):
+    """Token concreto revocado (logout). Se purga al pasar su expiración."""
+    __tablename__ = "sesiones_revocadas"
+
+    jti            = Column(String(32), primary_key=True)
+    usuario_id     = Column(Integer, index=True)
+    expira         = Column(DateTime, nullable=False, index=True)
+
+
+# ══════════════════════════════════════════════════════════════
+#  LATIDO DE LA RÉPLICA DE LECTURA (ver app/replica.py)
+#  Una sola fila que la primaria actualiza; en la réplica su
+#  antigüedad es el retraso de replicación.
+# ══════════════════════════════════════════════════════════════
+
+class LatidoReplica(Base):
+    __tablename__ = "latido_replica"
+
+    id             = Column(Integer, primary_key=True)   # siempre 1
+    latido         = Column(DateTime, nullable=False)
+
+
+# ══════════════════════════════════════════════════════════════
+#  MIGRACIONES DE DATOS aplicadas (ver app/migraciones.py)
+# ══════════════════════════════════════════════════════════════
+
+class MigracionAplicada(Base):
+    __tablename__ = "migraciones_aplicadas"
+
+    nombre         = Column(String(100), primary_key=True)
+    aplicada       = Column(DateTime, default=datetime.now)
+    filas          = Column(Integer, default=0)
@@ -0,0 +1,165 @@
+# app/paginacion.py
+# ─────────────────────────────────────────────────────────────
+#  Paginación por cursor (keyset) + proyección de campos
+#  para las APIs JSON de inspecciones.
+#
+#  En vez de OFFSET (que recorre y descarta todas las filas
+#  anteriores) cada página continúa desde la última (fecha, id)
+#  vista:  WHERE (fecha, id) < (:fecha, :id)
+#          ORDER BY fecha DESC, id DESC  LIMIT :n
+#  Con los índices (fecha, id) y (usuario_id, fecha, id) cada
+#  página cuesta lo mismo, sea la primera o la número 1000.
+#
+#  El cursor es opaco para el cliente: base64 de "fecha|id".
+#
+#  fields= elige columnas de una lista blanca; solo esas viajan
+#  desde la BD (aspectos/observaciones no se leen si no se piden).
+#
+#  Las páginas que llegan a fechas archivadas continúan en
+#  inspecciones_archivo sin que el cliente lo note (app/archivo.py).
+# ─────────────────────────────────────────────────────────────
+
+import base64
+from datetime import datetime
+from typing import Callable
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app import archivo, models
+
+LIMITE_DEFECTO = 100
+LIMITE_MAX     = 500
+
+_I = models.Inspeccion
+
+# nombre público → columna
+CAMPOS_INSPECCION = {
+    "id":                  _I.id,
+    "fecha":               _I.fecha,
+    "conductor":           _I.nombre_conductor,
+    "placa":               _I.placa,
+    "tipo_vehiculo":       _I.tipo_vehiculo,
+    "proceso":             _I.proceso,
+    "usuario_id":          _I.usuario_id,
+    "desde":               _I.desde,
+    "hasta":               _I.hasta,
+    "marca":               _I.marca,
+    "modelo":              _I.modelo,
+    "linea":               _I.linea,
+    "licencia_venc":       _I.licencia_venc,
+    "condiciones_optimas": _I.condiciones_optimas,
+    "observaciones":       _I.observaciones,
+    "aspectos":            _I.aspectos,
+}
+
+# Los que devolvía la API antes de existir fields=
+CAMPOS_DEFECTO = ("id", "fecha", "conductor", "placa", "tipo_vehiculo", "proceso", "usuario_id")
+
+
+# ══════════════════════════════════════════════════════════════
+#  CURSOR
+# ══════════════════════════════════════════════════════════════
+
+def codificar_cursor(fecha, id_) -> str:
+    crudo = f"{fecha.isoformat() if fecha else ''}|{id_}"
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str):
+    """Returns: (fecha | None, id). Raises HTTPException 400 si está corrupto."""
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        fecha_txt, id_txt = base64.urlsafe_b64decode(cursor + relleno).decode().split("|")
+        return (datetime.fromisoformat(fecha_txt) if fecha_txt else None), int(id_txt)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def despues_de(cursor: str, col_fecha=_I.fecha, col_id=_I.id):
+    """
+    Condición "viene después del cursor" en orden (fecha DESC, id DESC).
+    Las filas antiguas con fecha NULL van al final (MySQL y SQLite las
+    ordenan así en DESC). Sirve para cualquier tabla con (fecha, id).
+    """
+    fecha, id_ = decodificar_cursor(cursor)
+    if fecha is None:
+        return and_(col_fecha.is_(None), col_id < id_)
+    return or_(
+        col_fecha < fecha,
+        and_(col_fecha == fecha, col_id < id_),
+        col_fecha.is_(None),
+    )
+
+
+# ══════════════════════════════════════════════════════════════
+#  PROYECCIÓN
+# ══════════════════════════════════════════════════════════════
+
+def resolver_campos(fields: str = None) -> tuple:
+    """'id,placa,fecha' → ("id", "placa", "fecha"). 400 si hay alguno desconocido."""
+    if not fields:
+        return CAMPOS_DEFECTO
+    pedidos = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    desconocidos = [f for f in pedidos if f not in CAMPOS_INSPECCION]
+    if desconocidos:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Campos no permitidos: {', '.join(desconocidos)}. "
+                   f"Disponibles: {', '.join(CAMPOS_INSPECCION)}"
+        )
+    return pedidos or CAMPOS_DEFECTO
+
+
+def _serializar(valor):
+    return valor.isoformat() if isinstance(valor, datetime) else valor
+
+
+# ══════════════════════════════════════════════════════════════
+#  PÁGINA
+# ══════════════════════════════════════════════════════════════
+
+def pagina_inspecciones(
+    db: Session,
+    filtros: Callable = None,
+    cursor: str = None,
+    limite: int = LIMITE_DEFECTO,
+    campos: tuple = CAMPOS_DEFECTO,
+) -> dict:
+    """
+    Una página de inspecciones ordenada de la más reciente a la más antigua.
+
+    filtros(modelo) → condiciones WHERE para Inspeccion o InspeccionArchivo.
+
+    Returns:
+        {"inspecciones": [dict, ...], "siguiente_cursor": str | None}
+        siguiente_cursor es None en la última página.
+    """
+    limite = max(1, min(limite or LIMITE_DEFECTO, LIMITE_MAX))
+
+    def construir(M):
+        # fecha e id siempre se leen: forman el cursor
+        columnas = [getattr(M, CAMPOS_INSPECCION[c].key).label(c) for c in campos]
+        consulta = select(M.fecha.label("_fecha"), M.id.label("_id"), *columnas)
+
+        condiciones = list(filtros(M)) if filtros else []
+        if cursor:
+            condiciones.append(despues_de(cursor, M.fecha, M.id))
+        if condiciones:
+            consulta = consulta.where(*condiciones)
+        return consulta.order_by(M.fecha.desc(), M.id.desc())
+
+    # Se pide una fila extra para saber si hay página siguiente
+    filas = archivo.leer_reciente(db, construir, limite + 1, clave=lambda f: (f._fecha, f._id))
+
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    return {
+        "inspecciones": [
+            {c: _serializar(getattr(f, c)) for c in campos}
+            for f in filas
+        ],
+        "siguiente_cursor": codificar_cursor(filas[-1]._fecha, filas[-1]._id) if hay_mas else None,
+    }
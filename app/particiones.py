@@ -0,0 +1,308 @@
+# app/particiones.py
+# ─────────────────────────────────────────────────────────────
+#  Particionado por rango de fecha de `inspecciones` (solo MySQL)
+#
+#  Casi todas las consultas pesadas filtran por rango de
+#  Inspeccion.fecha (filtros del panel, exportaciones, rollups
+#  por ventana): con la tabla particionada por mes o año, MySQL
+#  solo abre las particiones del rango (partition pruning) y las
+#  particiones viejas se retiran como operación de metadatos.
+#
+#  Opcional: PARTICIONES_INSPECCIONES = mes | anio (vacío = no).
+#    - python -m app.scripts.migrar           → particiona la tabla
+#      la primera vez (reconstruye la tabla: ventana de mantenimiento)
+#    - python -m app.scripts.mantener_particiones  → programar
+#      mensual: crea las PARTICIONES_FUTURAS siguientes y, con
+#      --retirar-antes, saca las viejas (intercambio o borrado)
+#
+#  Lo que exige MySQL para particionar, y que particionar() aplica:
+#    - toda clave única debe incluir la columna de partición:
+#      PRIMARY KEY (id) → PRIMARY KEY (id, fecha); id sigue siendo
+#      AUTO_INCREMENT y único en la práctica, y el ORM sigue
+#      identificando por id
+#    - fecha NOT NULL (parte de la PK)
+#    - sin claves foráneas: se quita la FK usuario_id → usuarios
+#      (la app ya valida el usuario antes de insertar)
+#
+#  Particiones: p202501 (mes) / p2025 (año) = filas con fecha
+#  anterior al inicio del periodo siguiente, más p_futuro
+#  (MAXVALUE) para que un INSERT nunca falle aunque falte el
+#  mantenimiento. agregar_futuras() la divide (REORGANIZE).
+#
+#  Retirar (retirar()): particiones enteras anteriores al corte.
+#    - intercambio → EXCHANGE PARTITION a una tabla suelta
+#      inspecciones_p202301 (mismo esquema, consultable con SQL)
+#    - borrar      → DROP PARTITION
+#  Esas filas dejan de verse en la app (detalle, panel,
+#  exportaciones) y reconstruir_estadisticas ya no las contaría:
+#  para conservarlas visibles, archivar_inspecciones (app/archivo.py).
+#
+#  En SQLite u otros motores todo esto es un no-op.
+#  Benchmark con y sin particiones: python -m app.scripts.bench_particiones
+# ─────────────────────────────────────────────────────────────
+
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app import cache
+
+_log = logging.getLogger("particiones")
+
+GRANULARIDADES = ("mes", "anio")
+GRANULARIDAD = os.getenv("PARTICIONES_INSPECCIONES", "").strip().lower()
+if GRANULARIDAD and GRANULARIDAD not in GRANULARIDADES:
+    raise ValueError(f"PARTICIONES_INSPECCIONES inválido: {GRANULARIDAD!r} (use mes o anio)")
+PARTICIONES_FUTURAS = int(os.getenv("PARTICIONES_FUTURAS", "3"))
+
+TABLA    = "inspecciones"
+P_FUTURO = "p_futuro"
+
+
+def soportado(engine: Engine) -> bool:
+    return engine.dialect.name == "mysql"
+
+
+# ══════════════════════════════════════════════════════════════
+#  PERIODOS
+# ══════════════════════════════════════════════════════════════
+
+def _inicio_periodo(fecha: datetime, granularidad: str) -> datetime:
+    return datetime(fecha.year, 1 if granularidad == "anio" else fecha.month, 1)
+
+
+def _siguiente(inicio: datetime, granularidad: str) -> datetime:
+    if granularidad == "anio":
+        return datetime(inicio.year + 1, 1, 1)
+    return datetime(inicio.year + (inicio.month == 12), inicio.month % 12 + 1, 1)
+
+
+def _nombre(inicio: datetime, granularidad: str) -> str:
+    return f"p{inicio:%Y}" if granularidad == "anio" else f"p{inicio:%Y%m}"
+
+
+def _granularidad_de(nombre: str) -> str:
+    """p2025 → anio, p202501 → mes."""
+    return "anio" if len(nombre) == 5 else "mes"
+
+
+def _limite(descripcion: str):
+    """PARTITION_DESCRIPTION de RANGE COLUMNS: "'2025-02-01 00:00:00'" → datetime (MAXVALUE → None)."""
+    valor = descripcion.strip("'\" ")
+    if valor.upper() == "MAXVALUE":
+        return None
+    return datetime.fromisoformat(valor)
+
+
+def _definiciones(desde: datetime, hasta: datetime, granularidad: str) -> list:
+    """PARTITION ... VALUES LESS THAN ... de cada periodo en [desde, hasta), más p_futuro."""
+    partes = []
+    inicio = _inicio_periodo(desde, granularidad)
+    while inicio < hasta:
+        fin = _siguiente(inicio, granularidad)
+        partes.append(f"PARTITION {_nombre(inicio, granularidad)} VALUES LESS THAN ('{fin:%Y-%m-%d %H:%M:%S}')")
+        inicio = fin
+    partes.append(f"PARTITION {P_FUTURO} VALUES LESS THAN (MAXVALUE)")
+    return partes
+
+
+def _horizonte(granularidad: str, futuras: int) -> datetime:
+    """Inicio del primer periodo que queda en p_futuro: el actual + `futuras` periodos."""
+    fin = _siguiente(_inicio_periodo(datetime.now(), granularidad), granularidad)
+    for _ in range(futuras):
+        fin = _siguiente(fin, granularidad)
+    return fin
+
+
+# ══════════════════════════════════════════════════════════════
+#  ESTADO
+# ══════════════════════════════════════════════════════════════
+
+def particiones(conn, tabla: str = TABLA) -> list:
+    """[{"nombre", "hasta" (datetime o None), "filas" (estimadas)}, ...] en orden; [] si no está particionada."""
+    filas = conn.execute(text(
+        "SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"t": tabla}).all()
+    return [{"nombre": n, "hasta": _limite(d), "filas": f or 0} for n, d, f in filas]
+
+
+def estado(engine: Engine, tabla: str = TABLA) -> dict:
+    if not soportado(engine):
+        return {"particionada": False, "motivo": f"motor {engine.dialect.name}"}
+    with engine.connect() as conn:
+        partes = particiones(conn, tabla)
+    if not partes:
+        return {"particionada": False}
+    acotadas = [p for p in partes if p["hasta"] is not None]
+    return {
+        "particionada": True,
+        "granularidad": _granularidad_de(acotadas[0]["nombre"]) if acotadas else None,
+        "particiones": len(partes),
+        "primera": acotadas[0]["nombre"] if acotadas else None,
+        "hasta": acotadas[-1]["hasta"].isoformat() if acotadas else None,
+        "filas_en_p_futuro": next((p["filas"] for p in partes if p["nombre"] == P_FUTURO), 0),
+    }
+
+
+def aviso(engine: Engine) -> str:
+    """Texto de advertencia para el arranque, o "" si todo está en orden."""
+    if not GRANULARIDAD or not soportado(engine):
+        return ""
+    e = estado(engine)
+    if not e["particionada"]:
+        return f"{TABLA} sin particionar (PARTICIONES_INSPECCIONES={GRANULARIDAD}): ejecutar python -m app.scripts.migrar"
+    if e["hasta"] and datetime.fromisoformat(e["hasta"]) <= _horizonte(e["granularidad"], 0):
+        return f"sin particiones futuras (última hasta {e['hasta'][:10]}): ejecutar python -m app.scripts.mantener_particiones"
+    return ""
+
+
+# ══════════════════════════════════════════════════════════════
+#  CREAR / MANTENER
+# ══════════════════════════════════════════════════════════════
+
+def _requisitos(conn, tabla: str) -> list:
+    """Nombres de las FK a quitar. Aborta si algo impide particionar."""
+    entrantes = conn.execute(text(
+        "SELECT TABLE_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS "
+        "WHERE CONSTRAINT_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME = :t"
+    ), {"t": tabla}).scalars().all()
+    if entrantes:
+        raise RuntimeError(f"{', '.join(entrantes)} tiene(n) claves foráneas hacia {tabla}: MySQL no permite particionarla")
+
+    unicas = conn.execute(text(
+        "SELECT INDEX_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t AND NON_UNIQUE = 0 AND INDEX_NAME <> 'PRIMARY' "
+        "GROUP BY INDEX_NAME HAVING SUM(COLUMN_NAME = 'fecha') = 0"
+    ), {"t": tabla}).scalars().all()
+    if unicas:
+        raise RuntimeError(f"Índices únicos sin fecha en {tabla}: {', '.join(unicas)}")
+
+    sin_fecha = conn.execute(text(f"SELECT COUNT(*) FROM `{tabla}` WHERE fecha IS NULL")).scalar()
+    if sin_fecha:
+        raise RuntimeError(f"{sin_fecha} filas de {tabla} sin fecha: corregirlas antes de particionar")
+
+    return conn.execute(text(
+        "SELECT CONSTRAINT_NAME FROM information_schema.REFERENTIAL_CONSTRAINTS "
+        "WHERE CONSTRAINT_SCHEMA = DATABASE() AND TABLE_NAME = :t"
+    ), {"t": tabla}).scalars().all()
+
+
+def particionar(engine: Engine, granularidad: str = GRANULARIDAD,
+                futuras: int = PARTICIONES_FUTURAS, tabla: str = TABLA) -> dict:
+    """
+    Particiona la tabla por RANGE COLUMNS(fecha), desde el periodo de
+    la inspección más antigua hasta `futuras` periodos por delante.
+    Reconstruye la tabla entera (copia): correrlo fuera de horario.
+    Idempotente: si ya está particionada no hace nada.
+    """
+    if granularidad not in GRANULARIDADES:
+        raise ValueError(f"Granularidad inválida: {granularidad!r}")
+    if not soportado(engine):
+        return {"particionada": False, "motivo": f"motor {engine.dialect.name}"}
+
+    with engine.connect() as conn:
+        if particiones(conn, tabla):
+            return {"particionada": False, "motivo": "ya estaba particionada"}
+
+        claves = _requisitos(conn, tabla)
+        for fk in claves:
+            conn.execute(text(f"ALTER TABLE `{tabla}` DROP FOREIGN KEY `{fk}`"))
+
+        primera = conn.execute(text(f"SELECT MIN(fecha) FROM `{tabla}`")).scalar() or datetime.now()
+        partes = _definiciones(primera, _horizonte(granularidad, futuras), granularidad)
+        # Un solo ALTER: la PK nueva conserva id como primera columna (AUTO_INCREMENT)
+        conn.execute(text(
+            f"ALTER TABLE `{tabla}` MODIFY fecha DATETIME NOT NULL, "
+            f"DROP PRIMARY KEY, ADD PRIMARY KEY (id, fecha) "
+            f"PARTITION BY RANGE COLUMNS(fecha) ({', '.join(partes)})"
+        ))
+        conn.commit()
+
+    cache.invalidar_inspecciones()
+    resumen = {"particionada": True, "granularidad": granularidad, "particiones": len(partes),
+               "claves_foraneas_quitadas": claves}
+    _log.info("%s particionada: %s", tabla, resumen)
+    return resumen
+
+
+def agregar_futuras(engine: Engine, futuras: int = PARTICIONES_FUTURAS, tabla: str = TABLA) -> list:
+    """
+    Divide p_futuro para que existan particiones hasta `futuras`
+    periodos por delante del actual. Returns: nombres creados.
+    Si p_futuro está vacía (lo normal) es una operación instantánea.
+    """
+    if not soportado(engine):
+        return []
+    with engine.connect() as conn:
+        partes = particiones(conn, tabla)
+        acotadas = [p for p in partes if p["hasta"] is not None]
+        if not acotadas:
+            return []
+        granularidad = _granularidad_de(acotadas[0]["nombre"])
+        desde = acotadas[-1]["hasta"]
+        hasta = _horizonte(granularidad, futuras)
+        if desde >= hasta:
+            return []
+
+        nuevas = _definiciones(desde, hasta, granularidad)
+        conn.execute(text(
+            f"ALTER TABLE `{tabla}` REORGANIZE PARTITION {P_FUTURO} INTO ({', '.join(nuevas)})"
+        ))
+        conn.commit()
+    creadas = [d.split()[1] for d in nuevas[:-1]]
+    _log.info("Particiones nuevas en %s: %s", tabla, creadas)
+    return creadas
+
+
+def asegurar(engine: Engine, granularidad: str = GRANULARIDAD, futuras: int = PARTICIONES_FUTURAS) -> dict:
+    """Lo que corre migrar: particiona si está activado y aún no lo está, y completa las futuras."""
+    if not granularidad or not soportado(engine):
+        return {}
+    resumen = particionar(engine, granularidad, futuras)
+    resumen["nuevas"] = agregar_futuras(engine, futuras)
+    return resumen
+
+
+# ══════════════════════════════════════════════════════════════
+#  RETIRAR
+# ══════════════════════════════════════════════════════════════
+
+def retirables(engine: Engine, antes_de: datetime, tabla: str = TABLA) -> list:
+    """Particiones cuyas filas son TODAS anteriores a `antes_de`."""
+    if not soportado(engine):
+        return []
+    with engine.connect() as conn:
+        return [p for p in particiones(conn, tabla) if p["hasta"] is not None and p["hasta"] <= antes_de]
+
+
+def retirar(engine: Engine, antes_de: datetime, modo: str = "intercambio", tabla: str = TABLA) -> list:
+    """
+    Saca de la tabla las particiones anteriores al corte.
+      intercambio → cada una pasa a la tabla `<tabla>_<partición>`
+                    (EXCHANGE PARTITION: solo metadatos) y se quita
+      borrar      → DROP PARTITION
+    Returns: [(partición, filas estimadas, destino o None), ...]
+    """
+    if modo not in ("intercambio", "borrar"):
+        raise ValueError(f"Modo inválido: {modo!r}")
+    hechas = []
+    with engine.connect() as conn:
+        for p in retirables(engine, antes_de, tabla):
+            destino = None
+            if modo == "intercambio":
+                destino = f"{tabla}_{p['nombre']}"
+                conn.execute(text(f"CREATE TABLE `{destino}` LIKE `{tabla}`"))
+                conn.execute(text(f"ALTER TABLE `{destino}` REMOVE PARTITIONING"))
+                conn.execute(text(f"ALTER TABLE `{tabla}` EXCHANGE PARTITION {p['nombre']} WITH TABLE `{destino}`"))
+            conn.execute(text(f"ALTER TABLE `{tabla}` DROP PARTITION {p['nombre']}"))
+            conn.commit()
+            hechas.append((p["nombre"], p["filas"], destino))
+            _log.info("Partición %s retirada de %s (%s)", p["nombre"], tabla, destino or "borrada")
+    if hechas:
+        cache.invalidar_inspecciones()
+    return hechas
@@ -0,0 +1,170 @@
+# app/perfilado.py
+# ─────────────────────────────────────────────────────────────
+#  Perfilado de consultas SQL por request
+#
+#  Eventos del engine (before/after_cursor_execute) miden cada
+#  sentencia; un middleware abre un "perfil" por request en un
+#  ContextVar y lo cierra al responder. Con eso:
+#
+#    - consultas y tiempo de BD por request
+#      → headers X-DB-Queries / X-DB-Time-Ms (solo DEBUG)
+#      → agregados por ruta en /api/admin/metricas
+#    - consultas lentas (> SLOW_QUERY_MS) al log con la ruta
+#    - N+1: la misma sentencia (mismo SQL con parámetros) repetida
+#      N1_UMBRAL veces o más en un request → warning con la ruta
+#
+#  Fuera de un request (scripts, tareas) solo se cuentan los
+#  totales globales.
+# ─────────────────────────────────────────────────────────────
+
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import metricas
+
+_log = logging.getLogger("perfilado")
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+N1_UMBRAL     = int(os.getenv("N1_UMBRAL", "5"))
+_MAX_RUTAS    = 200
+_MAX_SQL_LOG  = 300
+
+
+class PerfilRequest:
+    __slots__ = ("metodo", "path", "scope", "consultas", "tiempo_ms", "formas")
+
+    def __init__(self, metodo: str, path: str, scope: dict = None):
+        self.metodo = metodo
+        self.path = path
+        self.scope = scope
+        self.consultas = 0
+        self.tiempo_ms = 0.0
+        self.formas: Counter = Counter()
+
+    @property
+    def ruta(self) -> str:
+        """Plantilla de la ruta ("/admin/usuarios/{usuario_id}") si ya se resolvió."""
+        route = (self.scope or {}).get("route")
+        return f"{self.metodo} {getattr(route, 'path', self.path)}"
+
+
+_perfil_actual: ContextVar = ContextVar("perfil_sql", default=None)
+
+_lock = threading.Lock()
+_totales = {"consultas": 0, "tiempo_ms": 0.0, "lentas": 0, "n_mas_1": 0, "requests": 0}
+_por_ruta: dict = {}
+
+
+def _sql_corto(sql: str) -> str:
+    sql = " ".join(sql.split())
+    return sql if len(sql) <= _MAX_SQL_LOG else sql[:_MAX_SQL_LOG] + "…"
+
+
+# ══════════════════════════════════════════════════════════════
+#  EVENTOS DEL ENGINE
+# ══════════════════════════════════════════════════════════════
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_perfil_t0", []).append(time.perf_counter())
+
+
+def _despues(conn, cursor, statement, parameters, context, executemany):
+    pila = conn.info.get("_perfil_t0")
+    if not pila:
+        return
+    ms = (time.perf_counter() - pila.pop()) * 1000
+
+    perfil = _perfil_actual.get()
+    if perfil is not None:
+        perfil.consultas += 1
+        perfil.tiempo_ms += ms
+        perfil.formas[statement] += 1
+
+    with _lock:
+        _totales["consultas"] += 1
+        _totales["tiempo_ms"] += ms
+        if ms >= SLOW_QUERY_MS:
+            _totales["lentas"] += 1
+
+    if ms >= SLOW_QUERY_MS:
+        _log.warning(
+            "Consulta lenta %.1f ms [%s]: %s",
+            ms, perfil.ruta if perfil else "fuera de request", _sql_corto(statement),
+        )
+
+
+def instalar(engine: Engine):
+    """Engancha el perfilado a un engine. Idempotente."""
+    if not event.contains(engine, "before_cursor_execute", _antes):
+        event.listen(engine, "before_cursor_execute", _antes)
+        event.listen(engine, "after_cursor_execute", _despues)
+
+
+# ══════════════════════════════════════════════════════════════
+#  CICLO DE VIDA POR REQUEST (lo usa el middleware de main.py)
+# ══════════════════════════════════════════════════════════════
+
+def iniciar(metodo: str, path: str, scope: dict = None):
+    """Abre el perfil del request. Returns: token para terminar()."""
+    return _perfil_actual.set(PerfilRequest(metodo, path, scope))
+
+
+def terminar(token) -> PerfilRequest:
+    """Cierra el perfil: detecta N+1 y acumula por ruta."""
+    perfil = _perfil_actual.get()
+    _perfil_actual.reset(token)
+    if perfil is None:
+        return None
+
+    repetidas = [(sql, n) for sql, n in perfil.formas.items() if n >= N1_UMBRAL]
+    for sql, n in repetidas:
+        _log.warning("Posible N+1 en %s: %d× %s", perfil.ruta, n, _sql_corto(sql))
+
+    with _lock:
+        _totales["requests"] += 1
+        _totales["n_mas_1"] += len(repetidas)
+        ruta = perfil.ruta
+        if ruta in _por_ruta or len(_por_ruta) < _MAX_RUTAS:
+            r = _por_ruta.setdefault(ruta, {
+                "requests": 0, "consultas": 0, "tiempo_ms": 0.0,
+                "max_consultas": 0, "n_mas_1": 0,
+            })
+            r["requests"] += 1
+            r["consultas"] += perfil.consultas
+            r["tiempo_ms"] += perfil.tiempo_ms
+            r["max_consultas"] = max(r["max_consultas"], perfil.consultas)
+            r["n_mas_1"] += len(repetidas)
+    return perfil
+
+
+def perfil_actual() -> PerfilRequest:
+    return _perfil_actual.get()
+
+
+def estadisticas() -> dict:
+    with _lock:
+        rutas = {
+            ruta: {
+                **r,
+                "tiempo_ms": round(r["tiempo_ms"], 1),
+                "consultas_promedio": round(r["consultas"] / r["requests"], 2),
+            }
+            for ruta, r in sorted(_por_ruta.items(), key=lambda kv: -kv[1]["consultas"])
+        }
+        return {
+            **_totales,
+            "tiempo_ms": round(_totales["tiempo_ms"], 1),
+            "slow_query_ms": SLOW_QUERY_MS,
+            "n1_umbral": N1_UMBRAL,
+            "por_ruta": rutas,
+        }
+
+
+metricas.registrar("consultas_sql", estadisticas)
@@ -0,0 +1,179 @@
+# app/replica.py
+# ─────────────────────────────────────────────────────────────
+#  Enrutado de lecturas a la réplica (opcional)
+#
+#  El panel admin, las exportaciones y los agregados competían en
+#  la primaria con los submits de los conductores. Con
+#  DATABASE_REPLICA_URL (o DB_REPLICA_HOST) configurado, las rutas
+#  de solo lectura usan Depends(get_db_lectura) (app/database.py)
+#  y leen de la réplica. Escrituras y lecturas de lo recién escrito
+#  (submit, auth, historial del conductor) siguen en la primaria.
+#
+#  Retraso de replicación — latido (funciona con cualquier motor):
+#    - cada DB_REPLICA_LATIDO_SEG el worker escribe la hora en
+#      latido_replica (fila única) en la PRIMARIA y lee esa fila
+#      en la RÉPLICA; retraso = ahora - latido replicado
+#      (cota superior: el real + DB_REPLICA_LATIDO_SEG)
+#    - retraso > DB_REPLICA_RETRASO_MAX_SEG, réplica caída o sin
+#      latido → las lecturas vuelven a la primaria hasta la
+#      siguiente medición
+#
+#  Leer lo propio: tras una escritura del panel (crear/editar
+#  usuario...) fijar_primaria(response) deja una cookie que envía
+#  las lecturas de ese navegador a la primaria durante
+#  DB_REPLICA_RETRASO_MAX_SEG.
+#
+#  Prueba local: DATABASE_REPLICA_URL apuntando a una segunda
+#  instancia MySQL (o a un archivo SQLite). Si el latido no
+#  avanza en la réplica, las lecturas se quedan en la primaria.
+# ─────────────────────────────────────────────────────────────
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event, select, update
+
+from app import metricas, models
+from app.database import SessionLocal, SessionReplica, engine_replica
+
+_log = logging.getLogger("replica")
+
+DB_REPLICA_RETRASO_MAX_SEG = float(os.getenv("DB_REPLICA_RETRASO_MAX_SEG", "10"))
+DB_REPLICA_LATIDO_SEG      = float(os.getenv("DB_REPLICA_LATIDO_SEG", "5"))
+
+COOKIE_PRIMARIA = "leer_primaria"
+
+_L = models.LatidoReplica
+
+_lock = threading.Lock()
+_estado = {
+    "medido": 0.0,           # time.monotonic() de la última medición
+    "retraso_seg": None,
+    "disponible": False,
+    "motivo": "sin medir",
+}
+_stats = {"lecturas_replica": 0, "lecturas_primaria": 0, "mediciones": 0, "fallos": 0}
+
+
+def configurada() -> bool:
+    return engine_replica is not None
+
+
+def es_replica(db) -> bool:
+    """¿La sesión lee de la réplica? (sus lecturas no deben llenar la caché compartida)"""
+    return engine_replica is not None and db.get_bind() is engine_replica
+
+
+# ══════════════════════════════════════════════════════════════
+#  SOLO LECTURA
+# ══════════════════════════════════════════════════════════════
+
+if SessionReplica is not None:
+    @event.listens_for(SessionReplica, "before_flush")
+    def _sin_escrituras(session, flush_context, instances):
+        raise RuntimeError("Sesión de réplica: solo lectura (usar get_db para escribir)")
+
+
+# ══════════════════════════════════════════════════════════════
+#  LATIDO Y RETRASO
+# ══════════════════════════════════════════════════════════════
+
+def _latir():
+    """Escribe la hora actual en la primaria (fila id=1)."""
+    db = SessionLocal()
+    try:
+        ahora = datetime.now()
+        if db.execute(update(_L).where(_L.id == 1).values(latido=ahora)).rowcount == 0:
+            db.add(_L(id=1, latido=ahora))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _leer_latido_replica():
+    db = SessionReplica()
+    try:
+        return db.scalar(select(_L.latido).where(_L.id == 1))
+    finally:
+        db.close()
+
+
+def _medir():
+    try:
+        _latir()
+        latido = _leer_latido_replica()
+        if latido is None:
+            disponible, retraso, motivo = False, None, "sin latido en la réplica"
+        else:
+            retraso = max((datetime.now() - latido).total_seconds(), 0.0)
+            disponible = retraso <= DB_REPLICA_RETRASO_MAX_SEG
+            motivo = "ok" if disponible else f"retraso {retraso:.1f}s > {DB_REPLICA_RETRASO_MAX_SEG:.0f}s"
+    except Exception as e:
+        disponible, retraso, motivo = False, None, f"error: {type(e).__name__}"
+        _stats["fallos"] += 1
+
+    if disponible != _estado["disponible"]:
+        if disponible:
+            _log.info("Réplica disponible (retraso %.1fs): lecturas a la réplica", retraso)
+        else:
+            _log.warning("Réplica no usable (%s): lecturas a la primaria", motivo)
+    _estado.update(medido=time.monotonic(), retraso_seg=retraso, disponible=disponible, motivo=motivo)
+    _stats["mediciones"] += 1
+
+
+def _disponible() -> bool:
+    """Estado de la réplica, remidiendo cada DB_REPLICA_LATIDO_SEG (un solo hilo mide)."""
+    if time.monotonic() - _estado["medido"] >= DB_REPLICA_LATIDO_SEG and _lock.acquire(blocking=False):
+        try:
+            if time.monotonic() - _estado["medido"] >= DB_REPLICA_LATIDO_SEG:
+                _medir()
+        finally:
+            _lock.release()
+    return _estado["disponible"]
+
+
+# ══════════════════════════════════════════════════════════════
+#  API
+# ══════════════════════════════════════════════════════════════
+
+def usar_replica(request=None) -> bool:
+    """¿Esta lectura puede ir a la réplica?"""
+    usar = configurada() and _disponible()
+    if usar and request is not None:
+        try:
+            usar = float(request.cookies.get(COOKIE_PRIMARIA, "0")) < time.time()
+        except ValueError:
+            pass
+    _stats["lecturas_replica" if usar else "lecturas_primaria"] += 1
+    return usar
+
+
+def fijar_primaria(response):
+    """Tras una escritura: este navegador lee de la primaria hasta que la réplica la alcance."""
+    if configurada():
+        response.set_cookie(
+            COOKIE_PRIMARIA,
+            str(time.time() + DB_REPLICA_RETRASO_MAX_SEG),
+            max_age=int(DB_REPLICA_RETRASO_MAX_SEG) + 1,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+def estadisticas() -> dict:
+    return {
+        "configurada": configurada(),
+        "disponible": _estado["disponible"],
+        "retraso_seg": round(_estado["retraso_seg"], 2) if _estado["retraso_seg"] is not None else None,
+        "motivo": _estado["motivo"],
+        "retraso_max_seg": DB_REPLICA_RETRASO_MAX_SEG,
+        "latido_seg": DB_REPLICA_LATIDO_SEG,
+        **_stats,
+    }
+
+
+metricas.registrar("replica", estadisticas)
@@ -0,0 +1,163 @@
+# app/reportes.py
+# ─────────────────────────────────────────────────────────────
+#  Reportes consolidados (reportes_inspeccion)
+#
+#  Antes el reporte solo guardaba nombre_conductor y se buscaba
+#  por igualdad de texto con normalize_name(nombre_visible): sin
+#  índice, y un cambio de nombre en el admin dejaba al conductor
+#  sin su historial.
+#
+#  Ahora cada reporte lleva:
+#    usuario_id + ciclo     → listado por índice (usuario_id, fecha)
+#                             y "qué ciclo consolida" (app/archivo.py)
+#    tamano_bytes + sha256  → ETag de la descarga; se valida contra
+#                             el tamaño del archivo en disco (stat, sin
+#                             releerlo); si no cuadra, se calcula del
+#                             archivo sin guardarlo (la descarga es un
+#                             GET: no escribe en la BD)
+#    version_plantilla      → versión del formato + hash de la
+#                             plantilla con que se generó el PDF
+#
+#  Filas anteriores: backfill "reportes_usuario_v1".
+# ─────────────────────────────────────────────────────────────
+
+import hashlib
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import ciclos, descargas, models
+from app.migraciones import backfill
+
+_HERE = Path(__file__).resolve().parent  # app/
+
+CODIGO_FORMATO  = "FO-SST-063"
+VERSION_FORMATO = "01"
+PLANTILLA_CONSOLIDADO = _HERE / "templates" / "pdf_template_multiple.html"
+
+_R = models.ReporteInspeccion
+
+
+def _sha256_archivo(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _version_plantilla() -> str:
+    """'01+3fa9c2d1': versión del formato + hash corto de la plantilla."""
+    try:
+        return f"{VERSION_FORMATO}+{hashlib.sha256(PLANTILLA_CONSOLIDADO.read_bytes()).hexdigest()[:8]}"
+    except OSError:
+        return VERSION_FORMATO
+
+
+VERSION_PLANTILLA = _version_plantilla()
+
+
+# ══════════════════════════════════════════════════════════════
+#  API
+# ══════════════════════════════════════════════════════════════
+
+def registrar(
+    db: Session,
+    usuario_id: int,
+    nombre_conductor: str,
+    ciclo: int,
+    path: Path,
+    total_incluidas: int,
+) -> models.ReporteInspeccion:
+    """
+    Crea la fila del reporte con los metadatos del PDF ya generado y
+    sube la versión del historial del usuario. NO hace commit.
+    """
+    reporte = _R(
+        usuario_id=usuario_id,
+        nombre_conductor=nombre_conductor,
+        ciclo=ciclo,
+        fecha_reporte=datetime.now(),
+        archivo_pdf=str(path),
+        total_incluidas=total_incluidas,
+        tamano_bytes=path.stat().st_size,
+        sha256=_sha256_archivo(path),
+        version_plantilla=VERSION_PLANTILLA,
+    )
+    db.add(reporte)
+    ciclos.marcar_cambio(db, usuario_id)
+    return reporte
+
+
+def del_usuario(db: Session, usuario_id: int) -> list:
+    """Reportes del usuario, más recientes primero (índice usuario_id, fecha_reporte)."""
+    return db.scalars(
+        select(_R).where(_R.usuario_id == usuario_id).order_by(_R.fecha_reporte.desc())
+    ).all()
+
+
+def etag(reporte: models.ReporteInspeccion, path: Path) -> str:
+    """
+    ETag del PDF a partir del sha256 guardado. Si el tamaño en disco ya
+    no coincide (archivo regenerado o sin metadatos), se calcula del
+    archivo (descargas.etag_archivo, cacheado por mtime) SIN guardarlo:
+    sha256 y tamano_bytes los escriben registrar() y el backfill.
+    """
+    if reporte.sha256 and reporte.tamano_bytes == path.stat().st_size:
+        return f'"{reporte.sha256[:32]}"'
+    return descargas.etag_archivo(path)
+
+
+# ══════════════════════════════════════════════════════════════
+#  BACKFILL — usuario, ciclo y metadatos de reportes anteriores
+# ══════════════════════════════════════════════════════════════
+
+def _usuario_desde_ruta(archivo_pdf: str):
+    """.../generated_pdfs/usuarios/<id>/reportes/x.pdf → <id>"""
+    partes = Path(archivo_pdf or "").parts
+    for i, parte in enumerate(partes[:-2]):
+        if parte == "usuarios" and partes[i + 1].isdigit() and partes[i + 2] == "reportes":
+            return int(partes[i + 1])
+    return None
+
+
+@backfill("reportes_usuario_v1", origen=(models.ReporteInspeccion,))
+def backfill_reportes(db: Session) -> int:
+    """
+    usuario_id: por la carpeta del PDF (usuarios/<id>/reportes) y, si
+    no, por el nombre normalizado del usuario. ciclo: orden del reporte
+    entre los del usuario (el código anterior consolidaba una vez por
+    ciclo, en orden). Tamaño y sha256 si el archivo sigue en disco.
+    """
+    from app.routes.inspecciones import normalize_name
+
+    usuarios = db.execute(
+        select(models.Usuario.id, models.Usuario.nombre_visible, models.Usuario.nombre)
+    ).all()
+    ids = {u.id for u in usuarios}
+    por_nombre = {normalize_name(u.nombre_visible or u.nombre): u.id for u in usuarios}
+
+    reportes = db.scalars(select(_R).order_by(_R.fecha_reporte, _R.id)).all()
+    for r in reportes:
+        if r.usuario_id is None:
+            uid = _usuario_desde_ruta(r.archivo_pdf)
+            r.usuario_id = uid if uid in ids else por_nombre.get(r.nombre_conductor)
+
+        path = Path(r.archivo_pdf or "")
+        if r.sha256 is None and path.is_file():
+            r.tamano_bytes = path.stat().st_size
+            r.sha256 = _sha256_archivo(path)
+
+    # Ciclo: posición del reporte entre los del mismo usuario
+    siguiente_ciclo: dict = {}
+    for r in reportes:
+        if r.usuario_id is None:
+            continue
+        if r.ciclo is None:
+            r.ciclo = siguiente_ciclo.get(r.usuario_id, 1)
+        siguiente_ciclo[r.usuario_id] = r.ciclo + 1
+
+    db.commit()
+    return len(reportes)
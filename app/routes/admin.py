@@ -9,15 +9,15 @@ Panel de administración para gestionar:
 """
 
 from pathlib import Path
-from fastapi import APIRouter, Depends, HTTPException, Form, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc, extract, and_, cast, Date as SADate, case
+from fastapi import APIRouter, Depends, HTTPException, Form, Query, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, select
 from datetime import datetime, date, timedelta
 
-from app.database import SessionLocal
-from app import models
-from app.security import get_current_user, hash_pin
+from app.database import get_db, get_db_lectura
+from app import models, estadisticas, cache, metricas, paginacion, exportacion, busqueda, auditoria, archivo, vencimientos, replica, lecturas
+from app.security import get_current_user, hash_pin, invalidar_sesiones_usuario, revocar_sesiones_usuario
 from app.routes.inspecciones import ASPECTOS_POR_TIPO
 
 router = APIRouter()
@@ -37,24 +37,24 @@ def require_admin(usuario_actual: models.Usuario = Depends(get_current_user)):
     return usuario_actual
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def registrar_accion(db: Session, admin_id: int, accion: str, detalles: str):
-    """Registra una acción en los logs de auditoría"""
-    log = models.LogAuditoria(
-        admin_id=admin_id,
-        accion=accion,
-        detalles=detalles,
-        fecha=datetime.now()
+def _totales_inspecciones(db: Session) -> tuple:
+    """(total_inspecciones, conductores_unicos) desde los rollups, cacheado."""
+    return cache.obtener(
+        "inspecciones:totales",
+        lambda: (
+            estadisticas.total_inspecciones(db),
+            estadisticas.total_conductores(db),
+        ),
+        guardar=not replica.es_replica(db),
+    )
+
+
+def _conteos_usuarios(db: Session) -> dict:
+    """{usuario_id: total_inspecciones} desde los rollups, cacheado."""
+    return cache.obtener(
+        "usuarios:conteos", lambda: estadisticas.totales_por_usuario(db),
+        guardar=not replica.es_replica(db),
     )
-    db.add(log)
-    db.commit()
 
 
 def get_aspectos_enriquecidos(inspeccion) -> dict:
@@ -96,94 +96,38 @@ def get_aspectos_enriquecidos(inspeccion) -> dict:
 # DASHBOARD
 # ═══════════════════════════════════════════════════════════════════
 
+def _calcular_dashboard(db: Session) -> dict:
+    """KPIs y series del dashboard, leídos de los rollups."""
+    return {
+        "total_usuarios": db.query(models.Usuario).count(),
+        "total_inspecciones": estadisticas.total_inspecciones(db),
+        # Top 5 conductores
+        "usuarios_activos": estadisticas.top_conductores(db, limite=5),
+        # Inspecciones por día (últimos 90 días)
+        "inspecciones_por_dia": estadisticas.por_dia(db, dias=90),
+        # Inspecciones por mes/año
+        "inspecciones_anual": estadisticas.por_mes(db),
+    }
+
+
 @router.get("/admin", response_class=HTMLResponse)
 async def admin_dashboard(
     request: Request,
     usuario_admin: models.Usuario = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db_lectura)
 ):
     """Dashboard admin con gráficas y KPIs"""
     templates = _templates_admin
 
-    total_usuarios = db.query(models.Usuario).count()
-    total_inspecciones = db.query(models.Inspeccion).count()
-
-    # Top 5 conductores
-    usuarios_activos = (
-        db.query(
-            case(
-                (func.trim(func.coalesce(models.Usuario.nombre_visible, '')) != '', models.Usuario.nombre_visible),
-                (func.trim(func.coalesce(models.Usuario.nombre, '')) != '', models.Usuario.nombre),
-                else_="Conductor " + models.Usuario.cedula
-            ).label("nombre"),
-            func.count(models.Inspeccion.id).label("total")
-        )
-        .outerjoin(models.Inspeccion)
-        .filter(models.Usuario.activo == 1)
-        .group_by(models.Usuario.id)
-        .having(func.count(models.Inspeccion.id) > 0)
-        .order_by(desc("total"))
-        .limit(5)
-        .all()
-    )
-
-    # Inspecciones por día (últimos 90 días)
-    hoy = date.today()
-    hace_90_dias = hoy - timedelta(days=90)
-
-    rows = (
-        db.query(
-            cast(models.Inspeccion.fecha, SADate).label("dia"),
-            func.count(models.Inspeccion.id).label("total")
-        )
-        .filter(models.Inspeccion.fecha >= hace_90_dias)
-        .group_by("dia")
-        .order_by("dia")
-        .all()
+    # ✅ Todo sale de los rollups (stats_*) y se cachea hasta el próximo submit
+    datos = cache.obtener(
+        "dashboard:resumen", lambda: _calcular_dashboard(db), guardar=not replica.es_replica(db),
     )
 
-    totales_dia = {r.dia: r.total for r in rows}
-    inspecciones_por_dia = []
-    for i in range(90):
-        fecha = hace_90_dias + timedelta(days=i)
-        inspecciones_por_dia.append({
-            "fecha": fecha.strftime("%d/%m/%y"),
-            "total": totales_dia.get(fecha, 0)
-        })
-
-    # Inspecciones por mes/año
-    rows_anual = (
-        db.query(
-            extract("year", models.Inspeccion.fecha).label("anio"),
-            extract("month", models.Inspeccion.fecha).label("mes"),
-            func.count(models.Inspeccion.id).label("total")
-        )
-        .group_by("anio", "mes")
-        .order_by("anio", "mes")
-        .all()
-    )
-
-    anual_dict = {}
-    for row in rows_anual:
-        anio = int(row.anio)
-        mes = int(row.mes)
-        if anio not in anual_dict:
-            anual_dict[anio] = [0] * 12
-        anual_dict[anio][mes - 1] = int(row.total)
-
-    inspecciones_anual = [
-        {"anio": anio, "meses": anual_dict[anio]}
-        for anio in sorted(anual_dict.keys(), reverse=True)
-    ]
-
     return templates.TemplateResponse("admin/dashboard.html", {
         "request": request,
         "admin": usuario_admin,
-        "total_usuarios": total_usuarios,
-        "total_inspecciones": total_inspecciones,
-        "usuarios_activos": usuarios_activos,
-        "inspecciones_por_dia": inspecciones_por_dia,
-        "inspecciones_anual": inspecciones_anual,
+        **datos,
     })
 
 
@@ -191,11 +135,53 @@ async def admin_dashboard(
 # LISTA DE INSPECCIONES
 # ═══════════════════════════════════════════════════════════════════
 
+def _fecha_filtro(texto: str):
+    """'2025-03-01' → datetime; vacío o inválido → None (se ignora el filtro)."""
+    try:
+        return datetime.strptime(texto.strip(), "%Y-%m-%d") if texto.strip() else None
+    except ValueError:
+        return None
+
+
+def filtros_inspecciones(
+    db: Session,
+    conductor: str = "",
+    placa: str = "",
+    tipo: str = "",
+    fecha_desde: str = "",
+    fecha_hasta: str = "",
+    modelo=models.Inspeccion,
+) -> list:
+    """
+    Condiciones WHERE de los filtros del panel de inspecciones.
+    Compartido por la vista HTML y las exportaciones. Fechas
+    inválidas se ignoran (igual que antes).
+
+    Conductor y placa van por las columnas indexadas de app/busqueda.py
+    (sin ILIKE '%x%', que obliga a recorrer toda la tabla).
+    `modelo`: Inspeccion o InspeccionArchivo (ver app/archivo.py).
+    """
+    filtros = []
+    if conductor.strip():
+        filtros.append(busqueda.condicion_conductor(db, conductor, modelo))
+    if placa.strip():
+        filtros.append(busqueda.condicion_placa(placa, modelo))
+    if tipo.strip():
+        filtros.append(modelo.tipo_vehiculo == tipo.strip())
+    desde = _fecha_filtro(fecha_desde)
+    if desde:
+        filtros.append(modelo.fecha >= desde)
+    hasta = _fecha_filtro(fecha_hasta)
+    if hasta:
+        filtros.append(modelo.fecha < hasta + timedelta(days=1))
+    return filtros
+
+
 @router.get("/admin/inspecciones", response_class=HTMLResponse)
 async def admin_inspecciones(
     request: Request,
     usuario_admin: models.Usuario = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_lectura),
     conductor: str = "",
     placa: str = "",
     tipo: str = "",
@@ -206,29 +192,20 @@ async def admin_inspecciones(
     Panel de inspecciones — Admin ve TODAS.
     Devuelve inspecciones.html con filtros opcionales.
     """
-    q = db.query(models.Inspeccion, models.Usuario).join(
-        models.Usuario, models.Inspeccion.usuario_id == models.Usuario.id
-    )
-
-    if conductor.strip():
-        q = q.filter(models.Inspeccion.nombre_conductor.ilike(f"%{conductor.strip()}%"))
-    if placa.strip():
-        q = q.filter(models.Inspeccion.placa.ilike(f"%{placa.strip()}%"))
-    if tipo.strip():
-        q = q.filter(models.Inspeccion.tipo_vehiculo == tipo.strip())
-    if fecha_desde.strip():
-        try:
-            q = q.filter(models.Inspeccion.fecha >= datetime.strptime(fecha_desde.strip(), "%Y-%m-%d"))
-        except ValueError:
-            pass
-    if fecha_hasta.strip():
-        try:
-            limite = datetime.strptime(fecha_hasta.strip(), "%Y-%m-%d") + timedelta(days=1)
-            q = q.filter(models.Inspeccion.fecha < limite)
-        except ValueError:
-            pass
+    def construir(M):
+        return (
+            select(M, models.Usuario)
+            .join(models.Usuario, M.usuario_id == models.Usuario.id)
+            .where(*filtros_inspecciones(db, conductor, placa, tipo, fecha_desde, fecha_hasta, M))
+            .order_by(M.fecha.desc(), M.id.desc())
+        )
 
-    resultados = q.order_by(models.Inspeccion.fecha.desc()).limit(300).all()
+    # ✅ Incluye inspecciones archivadas solo si las 300 más recientes llegan a ellas
+    resultados = archivo.leer_reciente(
+        db, construir, 300,
+        clave=lambda fila: (fila[0].fecha, fila[0].id),
+        fecha_desde=_fecha_filtro(fecha_desde),
+    )
 
     # Construir dict enriquecido por inspeccion.id SIN tocar el ORM
     # (aspectos_dict es @property de solo lectura)
@@ -237,8 +214,7 @@ async def admin_inspecciones(
         for inspeccion, _ in resultados
     }
 
-    total_activas = db.query(models.Inspeccion).count()
-    conductores_unicos = db.query(models.Inspeccion.usuario_id).distinct().count()
+    total_activas, conductores_unicos = _totales_inspecciones(db)
 
     def _tiene_malo(inspeccion):
         for v in aspectos_map.get(inspeccion.id, {}).values():
@@ -269,30 +245,99 @@ async def admin_inspecciones(
     })
 
 
+@router.get("/api/admin/buscar")
+async def api_buscar(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(busqueda.LIMITE_SUGERENCIAS, ge=1, le=50),
+    usuario_admin: models.Usuario = Depends(require_admin),
+    db: Session = Depends(get_db_lectura)
+):
+    """Sugerencias para los filtros conductor/placa (búsqueda indexada)"""
+    return {
+        "success": True,
+        "q": q,
+        **busqueda.sugerencias(db, q, limite=limit, totales=_conteos_usuarios(db)),
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════
+# EXPORTACIÓN (CSV / NDJSON en streaming)
+# ═══════════════════════════════════════════════════════════════════
+
+_TIPOS_EXPORTACION = {
+    "csv":    "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson; charset=utf-8",
+}
+
+
+@router.get("/admin/export/inspecciones.{formato}")
+async def exportar_inspecciones(
+    formato: str,
+    usuario_admin: models.Usuario = Depends(require_admin),
+    db: Session = Depends(get_db_lectura),
+    conductor: str = "",
+    placa: str = "",
+    tipo: str = "",
+    fecha_desde: str = "",
+    fecha_hasta: str = "",
+):
+    """
+    Todas las inspecciones que cumplen los filtros de /admin/inspecciones,
+    con una columna por aspecto. Se envía en streaming (memoria constante).
+    """
+    if formato not in _TIPOS_EXPORTACION:
+        raise HTTPException(404, "Formato no soportado (csv | ndjson)")
+
+    # El archivo entra en la exportación solo si el rango llega a él
+    modelos = archivo.modelos_para(db, _fecha_filtro(fecha_desde))
+    # Filtros resueltos AHORA: el generador corre con esta sesión ya cerrada
+    filtros = {
+        M: filtros_inspecciones(db, conductor, placa, tipo, fecha_desde, fecha_hasta, M)
+        for M in modelos
+    }
+    # El streaming abre su propia sesión contra la misma BD (réplica o primaria)
+    bind = db.get_bind()
+    if formato == "csv":
+        contenido = exportacion.generar_csv(filtros, tipo.strip() or None, modelos, bind)
+    else:
+        contenido = exportacion.generar_ndjson(filtros, modelos, bind)
+
+    aplicados = {k: v for k, v in {
+        "conductor": conductor, "placa": placa, "tipo": tipo,
+        "fecha_desde": fecha_desde, "fecha_hasta": fecha_hasta,
+    }.items() if v.strip()}
+    auditoria.registrar(
+        "EXPORTAR_INSPECCIONES",
+        f"{formato.upper()} filtros={aplicados or 'ninguno'}",
+        usuario_admin.id,
+    )
+
+    nombre = f"inspecciones_{datetime.now().strftime('%Y%m%d_%H%M')}.{formato}"
+    return StreamingResponse(
+        contenido,
+        media_type=_TIPOS_EXPORTACION[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}"'},
+    )
+
+
 @router.get("/api/admin/inspecciones")
 async def api_inspecciones(
+    cursor: str = Query(None, description="siguiente_cursor de la página anterior"),
+    limit: int = Query(paginacion.LIMITE_DEFECTO, ge=1, le=paginacion.LIMITE_MAX),
+    fields: str = Query(None, description="Campos separados por coma"),
     usuario_admin: models.Usuario = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db_lectura)
 ):
-    """API JSON para obtener TODAS las inspecciones"""
-    inspecciones = db.query(models.Inspeccion).order_by(desc(models.Inspeccion.fecha)).all()
+    """API JSON de inspecciones, paginada por cursor (más recientes primero)"""
+    campos = paginacion.resolver_campos(fields)
+    pagina = paginacion.pagina_inspecciones(db, cursor=cursor, limite=limit, campos=campos)
 
-    return {
+    return lecturas.respuesta_json({
         "success": True,
-        "total": len(inspecciones),
-        "inspecciones": [
-            {
-                "id": insp.id,
-                "fecha": insp.fecha.isoformat() if insp.fecha else None,
-                "conductor": insp.nombre_conductor,
-                "placa": insp.placa,
-                "tipo_vehiculo": insp.tipo_vehiculo,
-                "proceso": insp.proceso,
-                "usuario_id": insp.usuario_id
-            }
-            for insp in inspecciones
-        ]
-    }
+        "total": _totales_inspecciones(db)[0],
+        "limit": limit,
+        **pagina,
+    })
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -313,33 +358,26 @@ async def admin_mis_inspecciones(
 
 @router.get("/api/admin/mis-inspecciones")
 async def api_admin_mis_inspecciones(
+    cursor: str = Query(None, description="siguiente_cursor de la página anterior"),
+    limit: int = Query(paginacion.LIMITE_DEFECTO, ge=1, le=paginacion.LIMITE_MAX),
+    fields: str = Query(None, description="Campos separados por coma"),
     usuario_admin: models.Usuario = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db_lectura)
 ):
-    """API JSON para obtener las inspecciones del admin"""
-    inspecciones = (
-        db.query(models.Inspeccion)
-        .filter(models.Inspeccion.usuario_id == usuario_admin.id)
-        .order_by(desc(models.Inspeccion.fecha))
-        .all()
+    """API JSON de las inspecciones del admin, paginada por cursor"""
+    campos = paginacion.resolver_campos(fields)
+    pagina = paginacion.pagina_inspecciones(
+        db,
+        filtros=lambda M: [M.usuario_id == usuario_admin.id],
+        cursor=cursor, limite=limit, campos=campos,
     )
 
-    return {
+    return lecturas.respuesta_json({
         "success": True,
-        "total": len(inspecciones),
-        "inspecciones": [
-            {
-                "id": insp.id,
-                "fecha": insp.fecha.isoformat() if insp.fecha else None,
-                "conductor": insp.nombre_conductor,
-                "placa": insp.placa,
-                "tipo_vehiculo": insp.tipo_vehiculo,
-                "proceso": insp.proceso,
-                "usuario_id": insp.usuario_id
-            }
-            for insp in inspecciones
-        ]
-    }
+        "total": _conteos_usuarios(db).get(usuario_admin.id, 0),
+        "limit": limit,
+        **pagina,
+    })
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -350,17 +388,10 @@ async def api_admin_mis_inspecciones(
 async def admin_usuarios_list(
     request: Request,
     usuario_admin: models.Usuario = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db_lectura)
 ):
-    usuarios = db.query(models.Usuario).all()
-    stats = dict(
-        db.query(
-            models.Inspeccion.usuario_id,
-            func.count(models.Inspeccion.id)
-        )
-        .group_by(models.Inspeccion.usuario_id)
-        .all()
-    )
+    usuarios = lecturas.usuarios(db)
+    stats = _conteos_usuarios(db)
 
     return _templates_admin.TemplateResponse("admin/usuarios.html", {
         "request": request,
@@ -420,15 +451,15 @@ async def admin_usuario_crear(
         rol=rol
     )
     db.add(nuevo_usuario)
+    auditoria.registrar(
+        "CREAR_USUARIO", f"Cédula '{cedula_clean}' creada con rol '{rol}'",
+        usuario_admin.id, db=db,
+    )
     db.commit()
-    db.refresh(nuevo_usuario)
 
-    registrar_accion(
-        db, usuario_admin.id, "CREAR_USUARIO",
-        f"Cédula '{cedula_clean}' creada con rol '{rol}'"
-    )
+    cache.invalidar_usuarios()
 
-    return RedirectResponse(url="/admin/usuarios?mensaje=Usuario creado exitosamente", status_code=303)
+    return replica.fijar_primaria(RedirectResponse(url="/admin/usuarios?mensaje=Usuario creado exitosamente", status_code=303))
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -483,15 +514,19 @@ async def admin_usuario_actualizar(
         usuario.pin_hash = hash_pin(pin)
         cambios.append("PIN")
 
-    db.commit()
-
+    if any(c == "PIN" or c.startswith("rol") for c in cambios):
+        revocar_sesiones_usuario(db, usuario.id)  # el rol va dentro del token firmado
     if cambios:
-        registrar_accion(
-            db, usuario_admin.id, "EDITAR_USUARIO",
-            f"Cédula '{usuario.cedula}': {', '.join(cambios)}"
+        auditoria.registrar(
+            "EDITAR_USUARIO", f"Cédula '{usuario.cedula}': {', '.join(cambios)}",
+            usuario_admin.id, db=db,
         )
+    db.commit()
+    invalidar_sesiones_usuario(usuario.id)
+
+    cache.invalidar_usuarios()
 
-    return RedirectResponse(url="/admin/usuarios?mensaje=Usuario actualizado", status_code=303)
+    return replica.fijar_primaria(RedirectResponse(url="/admin/usuarios?mensaje=Usuario actualizado", status_code=303))
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -511,7 +546,10 @@ async def admin_usuario_eliminar(
     if usuario.id == usuario_admin.id:
         raise HTTPException(400, "No puedes eliminarte a ti mismo")
 
-    tiene_inspecciones = db.query(models.Inspeccion).filter_by(usuario_id=usuario_id).first()
+    tiene_inspecciones = any(
+        db.query(M.id).filter_by(usuario_id=usuario_id).first()
+        for M in (models.Inspeccion, models.InspeccionArchivo)
+    )
     if tiene_inspecciones:
         raise HTTPException(400, "No se puede eliminar: el usuario tiene inspecciones registradas")
 
@@ -519,14 +557,17 @@ async def admin_usuario_eliminar(
     usuario.token = None
     usuario.token_expira = None
     db.delete(usuario)
+    revocar_sesiones_usuario(db, usuario_id)
+    auditoria.registrar(
+        "ELIMINAR_USUARIO", f"Cédula '{cedula_eliminada}' eliminada",
+        usuario_admin.id, db=db,
+    )
     db.commit()
+    invalidar_sesiones_usuario(usuario_id)
 
-    registrar_accion(
-        db, usuario_admin.id, "ELIMINAR_USUARIO",
-        f"Cédula '{cedula_eliminada}' eliminada"
-    )
+    cache.invalidar_usuarios()
 
-    return RedirectResponse(url="/admin/usuarios?mensaje=Usuario eliminado", status_code=303)
+    return replica.fijar_primaria(RedirectResponse(url="/admin/usuarios?mensaje=Usuario eliminado", status_code=303))
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -549,14 +590,17 @@ async def admin_usuario_suspender(
     usuario.activo = 0
     usuario.token = None
     usuario.token_expira = None
+    revocar_sesiones_usuario(db, usuario.id)
+    auditoria.registrar(
+        "SUSPENDER_USUARIO", f"Cédula '{usuario.cedula}' suspendida",
+        usuario_admin.id, db=db,
+    )
     db.commit()
+    invalidar_sesiones_usuario(usuario.id)
 
-    registrar_accion(
-        db, usuario_admin.id, "SUSPENDER_USUARIO",
-        f"Cédula '{usuario.cedula}' suspendida"
-    )
+    cache.invalidar_usuarios()
 
-    return RedirectResponse(url="/admin/usuarios?mensaje=Usuario suspendido", status_code=303)
+    return replica.fijar_primaria(RedirectResponse(url="/admin/usuarios?mensaje=Usuario suspendido", status_code=303))
 
 
 @router.post("/admin/usuarios/{usuario_id}/reactivar")
@@ -570,35 +614,88 @@ async def admin_usuario_reactivar(
         raise HTTPException(404, "Usuario no encontrado")
 
     usuario.activo = 1
+    auditoria.registrar(
+        "REACTIVAR_USUARIO", f"Cédula '{usuario.cedula}' reactivada",
+        usuario_admin.id, db=db,
+    )
     db.commit()
 
-    registrar_accion(
-        db, usuario_admin.id, "REACTIVAR_USUARIO",
-        f"Cédula '{usuario.cedula}' reactivada"
-    )
+    cache.invalidar_usuarios()
 
-    return RedirectResponse(url="/admin/usuarios?mensaje=Usuario reactivado", status_code=303)
+    return replica.fijar_primaria(RedirectResponse(url="/admin/usuarios?mensaje=Usuario reactivado", status_code=303))
 
 
 # ═══════════════════════════════════════════════════════════════════
 # LOGS DE AUDITORÍA
 # ═══════════════════════════════════════════════════════════════════
 
+LOGS_POR_PAGINA = 50
+
+
+def _actores_logs(db: Session) -> list:
+    """Usuarios para el filtro de /admin/logs: [(id, nombre, cedula)], admins primero."""
+    def calcular():
+        return [
+            (u.id, u.nombre_visible or u.nombre or u.cedula, u.cedula)
+            for u in db.query(
+                models.Usuario.id, models.Usuario.nombre_visible,
+                models.Usuario.nombre, models.Usuario.cedula, models.Usuario.rol,
+            ).order_by(models.Usuario.rol != "admin", models.Usuario.nombre_visible)
+        ]
+    return cache.obtener("usuarios:actores_logs", calcular, guardar=not replica.es_replica(db))
+
+
 @router.get("/admin/logs", response_class=HTMLResponse)
 async def admin_logs(
     request: Request,
     usuario_admin: models.Usuario = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db_lectura),
+    admin_id: str = "",
+    accion: str = "",
+    fecha_desde: str = "",
+    fecha_hasta: str = "",
+    cursor: str = "",
 ):
+    """
+    Logs de auditoría filtrados y paginados por cursor (fecha, id).
+    Índices: (fecha, id) sin filtro de usuario, (admin_id, fecha, id) con él.
+    """
+    L = models.LogAuditoria
+    filtros = []
+    if admin_id.strip().isdigit():
+        filtros.append(L.admin_id == int(admin_id))
+    if accion.strip():
+        filtros.append(L.accion == accion.strip())
+    if fecha_desde.strip():
+        try:
+            filtros.append(L.fecha >= datetime.strptime(fecha_desde.strip(), "%Y-%m-%d"))
+        except ValueError:
+            pass
+    if fecha_hasta.strip():
+        try:
+            filtros.append(L.fecha < datetime.strptime(fecha_hasta.strip(), "%Y-%m-%d") + timedelta(days=1))
+        except ValueError:
+            pass
+    if cursor:
+        filtros.append(paginacion.despues_de(cursor, L.fecha, L.id))
+
+    # ✅ joinedload: el admin de cada log viene en la misma consulta (antes 1 + 100)
     logs = (
-        db.query(models.LogAuditoria)
-        .order_by(desc(models.LogAuditoria.fecha))
-        .limit(100)
+        db.query(L)
+        .options(joinedload(L.admin))
+        .filter(*filtros)
+        .order_by(L.fecha.desc(), L.id.desc())
+        .limit(LOGS_POR_PAGINA + 1)
         .all()
     )
 
+    siguiente_cursor = None
+    if len(logs) > LOGS_POR_PAGINA:
+        logs = logs[:LOGS_POR_PAGINA]
+        siguiente_cursor = paginacion.codificar_cursor(logs[-1].fecha, logs[-1].id)
+
     for log in logs:
-        admin = db.query(models.Usuario).filter_by(id=log.admin_id).first()
+        admin = log.admin
         if admin:
             log.admin_nombre = admin.nombre_visible or admin.nombre or admin.cedula
             log.admin_cedula = admin.cedula
@@ -610,9 +707,53 @@ async def admin_logs(
         "request": request,
         "admin": usuario_admin,
         "logs": logs,
+        "actores": _actores_logs(db),
+        "acciones": auditoria.ACCIONES,
+        "siguiente_cursor": siguiente_cursor,
+        "es_primera_pagina": not cursor,
+        "por_pagina": LOGS_POR_PAGINA,
+        "filtros": {
+            "admin_id": admin_id,
+            "accion": accion,
+            "fecha_desde": fecha_desde,
+            "fecha_hasta": fecha_hasta,
+        },
     })
 
 
+# ═══════════════════════════════════════════════════════════════════
+# API REST: VENCIMIENTOS DE DOCUMENTOS
+# ═══════════════════════════════════════════════════════════════════
+
+@router.get("/api/admin/vencimientos")
+async def api_vencimientos(
+    dias: int = Query(vencimientos.VENCIMIENTOS_DIAS, ge=1, le=365),
+    documento: str = Query(None, description="licencia | soat | tecnomecanica"),
+    usuario_admin: models.Usuario = Depends(require_admin),
+    db: Session = Depends(get_db_lectura)
+):
+    """
+    Licencias, SOAT y revisiones tecnomecánicas que vencen en los
+    próximos `dias`. Lista precalculada de la noche si aplica; si no,
+    consulta en vivo por índices (ver app/vencimientos.py).
+    """
+    resultado = vencimientos.proximos(db, dias)
+    hoy = date.today()
+    alertas = [
+        {**a, "vence": a["vence"].isoformat(), "dias_restantes": (a["vence"] - hoy).days}
+        for a in resultado["alertas"]
+        if not documento or a["documento"] == documento
+    ]
+    return {
+        "success": True,
+        "dias": dias,
+        "origen": resultado["origen"],
+        "calculado": resultado["calculado"].isoformat(timespec="seconds"),
+        "total": len(alertas),
+        "alertas": alertas,
+    }
+
+
 # ═══════════════════════════════════════════════════════════════════
 # API REST: VALIDAR CÉDULA
 # ═══════════════════════════════════════════════════════════════════
@@ -643,10 +784,10 @@ async def validar_cedula(
 @router.get("/api/admin/usuarios")
 async def api_usuarios_list(
     usuario_admin: models.Usuario = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db_lectura)
 ):
-    usuarios = db.query(models.Usuario).all()
-    return {
+    usuarios = lecturas.usuarios(db)
+    return lecturas.respuesta_json({
         "ok": True,
         "usuarios": [
             {
@@ -658,4 +799,16 @@ async def api_usuarios_list(
             }
             for u in usuarios
         ]
-    }
\ No newline at end of file
+    })
+
+
+# ═══════════════════════════════════════════════════════════════════
+# API REST: MÉTRICAS DEL PROCESO
+# ═══════════════════════════════════════════════════════════════════
+
+@router.get("/api/admin/metricas")
+async def api_metricas(
+    usuario_admin: models.Usuario = Depends(require_admin),
+):
+    """Contadores en memoria de este worker (cachés, etc.)"""
+    return metricas.snapshot()
@@ -10,13 +10,18 @@ from collections import defaultdict
 import time
  
 from app.database import get_db
-from app import models
+from app import models, auditoria
 from app.security import (
     hash_pin,
     verify_pin,
     generar_token,
     get_current_user,
-    DEFAULT_TOKEN_EXPIRATION_HOURS
+    invalidar_sesiones_usuario,
+    emitir_token_firmado,
+    revocar_token_firmado,
+    revocar_sesiones_usuario,
+    DEFAULT_TOKEN_EXPIRATION_HOURS,
+    SESSION_MODE,
 )
  
 router = APIRouter(tags=["Auth"])
@@ -183,6 +188,20 @@ def registrar_usuario(
 # LOGIN — CON HTTPONLY COOKIE
 # ════════════════════════════════════════════════════════════════
  
+def _poner_cookie(response: Response, token: str, horas: int):
+    _https = os.getenv("HTTPS_ENABLED", "false").lower() == "true"
+
+    response.set_cookie(
+        key="access_token",
+        value=f"Bearer {token}",
+        httponly=True,              # ✅ No accesible desde JS
+        max_age=horas * 3600,
+        samesite="lax",             # ✅ Protección CSRF
+        secure=_https,              # ✅ Solo HTTPS en producción
+        path="/",                   # ✅ Válido en todo el sitio
+    )
+
+
 @router.post("/login")
 def login(
     request: Request,
@@ -249,26 +268,23 @@ def login(
         _limpiar_fallo(ip)
  
         # Generar token y expiración
-        token = generar_token()
         expiracion_horas = DEFAULT_TOKEN_EXPIRATION_HOURS
-        token_expira = datetime.utcnow() + timedelta(hours=expiracion_horas)
- 
-        usuario.token = token
-        usuario.token_expira = token_expira
-        db.commit()
+        if SESSION_MODE == "firmado":
+            # JWT: no se escribe en BD, cada dispositivo tiene su sesión
+            token, token_expira = emitir_token_firmado(db, usuario, expiracion_horas)
+            auditoria.registrar("LOGIN", f"IP {ip}", usuario.id)
+        else:
+            token = generar_token()
+            token_expira = datetime.utcnow() + timedelta(hours=expiracion_horas)
+ 
+            usuario.token = token
+            usuario.token_expira = token_expira
+            auditoria.registrar("LOGIN", f"IP {ip}", usuario.id, db=db)
+            db.commit()
+            invalidar_sesiones_usuario(usuario.id)  # el token anterior deja de ser válido
  
         # ── PASO 7: Configurar cookie httpOnly ──
-        _https = os.getenv("HTTPS_ENABLED", "false").lower() == "true"
-        
-        response.set_cookie(
-            key="access_token",
-            value=f"Bearer {token}",
-            httponly=True,              # ✅ No accesible desde JS
-            max_age=expiracion_horas * 3600,
-            samesite="lax",             # ✅ Protección CSRF
-            secure=_https,              # ✅ Solo HTTPS en producción
-            path="/",                   # ✅ Válido en todo el sitio
-        )
+        _poner_cookie(response, token, expiracion_horas)
  
         _log.info(f"Login exitoso: cedula={cedula_clean} id={usuario.id} rol={usuario.rol} (IP: {ip})")
  
@@ -300,16 +316,23 @@ def login(
  
 @router.post("/logout")
 def logout(
+    request: Request,
     response: Response,
     usuario: models.Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Logout — invalida token en BD y borra cookie."""
     try:
-        # Invalidar token en BD
-        usuario.token = None
-        usuario.token_expira = None
+        sesion = getattr(request.state, "sesion", None)
+        if sesion:
+            # Token firmado: se revoca solo este dispositivo
+            revocar_token_firmado(db, sesion)
+        else:
+            # Invalidar token en BD
+            usuario.token = None
+            usuario.token_expira = None
         db.commit()
+        invalidar_sesiones_usuario(usuario.id)
         
         # Borrar cookie
         response.delete_cookie(key="access_token", path="/")
@@ -341,9 +364,14 @@ def logout_get(response: Response):
  
 @router.get("/verify")
 def verify_token(
+    request: Request,
     usuario: models.Usuario = Depends(get_current_user)
 ):
     """Verifica si el token en la cookie es válido."""
+    expira = usuario.token_expira
+    sesion = getattr(request.state, "sesion", None)
+    if sesion:
+        expira = datetime.utcfromtimestamp(int(sesion["exp"]))
     return {
         "valid": True,
         "usuario_id": usuario.id,
@@ -351,7 +379,7 @@ def verify_token(
         "nombre": usuario.nombre_visible or usuario.cedula,
         "rol": usuario.rol,
         "activo": bool(usuario.activo),
-        "expires_at": usuario.token_expira.isoformat() if usuario.token_expira else None
+        "expires_at": expira.isoformat() if expira else None
     }
  
  
@@ -379,12 +407,17 @@ def get_current_user_info(
  
 @router.post("/cambiar-pin")
 def cambiar_pin(
+    response: Response,
     pin_actual: str = Form(...),
     pin_nuevo: str = Form(...),
     usuario: models.Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Cambia el PIN del usuario autenticado."""
+    """
+    Cambia el PIN del usuario autenticado y cierra sus demás sesiones.
+    En modo firmado la época nueva revoca también el token actual: este
+    dispositivo recibe una cookie nueva y sigue dentro.
+    """
     
     # Verificar PIN actual
     if not verify_pin(pin_actual, usuario.pin_hash):
@@ -410,7 +443,13 @@ def cambiar_pin(
  
     try:
         usuario.pin_hash = hash_pin(pin_nuevo)
+        revocar_sesiones_usuario(db, usuario.id)  # cierra todos los dispositivos...
         db.commit()
+        invalidar_sesiones_usuario(usuario.id)
+        if SESSION_MODE == "firmado":
+            # ...y este sigue dentro con un token de la época nueva
+            token, _ = emitir_token_firmado(db, usuario, DEFAULT_TOKEN_EXPIRATION_HOURS)
+            _poner_cookie(response, token, DEFAULT_TOKEN_EXPIRATION_HOURS)
         
         _log.info(f"PIN actualizado: usuario_id={usuario.id} cedula={usuario.cedula}")
         
@@ -1,16 +1,16 @@
 from fastapi import APIRouter, Form, Depends, Request
-from fastapi.responses import FileResponse, JSONResponse, Response, HTMLResponse
+from fastapi.responses import JSONResponse, Response, HTMLResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, get_db
-from app import models
+from app import models, estadisticas, cache, auditoria, archivo, ciclos, reportes, vehiculos, vencimientos, replica, sqlite_local, lecturas, descargas
 from app.security import get_current_user
 from app.utils_pdf import render_pdf_from_template
 from pathlib import Path
 from datetime import datetime
 import base64
 import json
-import mimetypes
 import secrets
  
 router = APIRouter()
@@ -41,6 +41,8 @@ LEGACY_DIR = BASE_PDF_DIR
 # ✅ FIX: logotipo_01.png (lowercase, archivo correcto)
 LOGO_PATH = (_HERE / "static" / "img" / "logotipo_01.png").resolve()
  
+PLANTILLA_INDIVIDUAL = _HERE / "templates" / "pdf_template.html"
+
 DELETE_AFTER_CONSOLIDATION = False  # ✅ Mantener inspecciones después de consolidar
  
  
@@ -48,27 +50,17 @@ DELETE_AFTER_CONSOLIDATION = False  # ✅ Mantener inspecciones después de cons
 #   UTILIDADES PDF
 # ===============================
  
-def safe_return_pdf(path: Path, filename: str):
-    """ Retorna un PDF siempre con tipo correcto y evitando .pdf_ """
+def safe_return_pdf(path: Path, filename: str, request: Request = None, etag: str = None, inmutable: bool = False):
+    """
+    Retorna un PDF siempre con tipo correcto y evitando .pdf_.
+    Con `request`: ETag/Last-Modified → 304, y Range → 206 (app/descargas.py).
+    """
     path = path.resolve()
  
     if not path.exists():
         return Response("PDF no encontrado", status_code=500)
  
-    mime = mimetypes.guess_type(path)[0] or "application/pdf"
- 
-    headers = {
-        "Content-Disposition": f'attachment; filename="{filename}"',
-        "Content-Type": mime,
-        "X-Content-Type-Options": "nosniff",
-    }
- 
-    return FileResponse(
-        path,
-        media_type=mime,
-        filename=filename,
-        headers=headers,
-    )
+    return descargas.respuesta_pdf(path, filename, request, etag=etag, inmutable=inmutable)
  
  
 # ===============================
@@ -361,7 +353,9 @@ async def submit_inspeccion(
     licencia_venc: str = Form(""),
     porte_propiedad: str = Form(""),
     soat: str = Form(""),
+    soat_venc: str = Form(""),
     certificado_emision: str = Form(""),
+    tecnomecanica_venc: str = Form(""),
     poliza_seguro: str = Form(""),
     aspectos: str = Form("{}"),
     firma_dataurl: str = Form(None),
@@ -443,34 +437,25 @@ async def submit_inspeccion(
             status_code=422
         )
  
-    # ========== VALIDACIÓN 10: FECHA VENCIMIENTO > HOY ==========
-    if licencia_venc:
-        try:
-            venc_date = None
-            for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
-                try:
-                    venc_date = datetime.strptime(licencia_venc.strip(), fmt).date()
-                    break
-                except ValueError:
-                    continue
-            
-            if venc_date is None:
-                return JSONResponse(
-                    {"error": "Formato de fecha inválido. Use YYYY-MM-DD"},
-                    status_code=422
-                )
-            
-            if venc_date < datetime.now().date():
-                return JSONResponse(
-                    {"error": f"Licencia vencida desde {licencia_venc}. Debe estar vigente."},
-                    status_code=422
-                )
-        except Exception as e:
+    # ========== VALIDACIÓN 10: FECHAS DE VENCIMIENTO ==========
+    # ✅ Se parsean UNA vez: la fecha queda en columnas DATE (ver app/vencimientos.py)
+    venc_licencia = vencimientos.parsear_fecha(licencia_venc)
+    venc_soat = vencimientos.parsear_fecha(soat_venc)
+    venc_tecnomecanica = vencimientos.parsear_fecha(tecnomecanica_venc)
+    for texto, fecha in ((licencia_venc, venc_licencia), (soat_venc, venc_soat),
+                         (tecnomecanica_venc, venc_tecnomecanica)):
+        if texto.strip() and fecha is None:
             return JSONResponse(
-                {"error": f"Error validando fecha: {str(e)}"},
+                {"error": "Formato de fecha inválido. Use YYYY-MM-DD"},
                 status_code=422
             )
  
+    if venc_licencia and venc_licencia < datetime.now().date():
+        return JSONResponse(
+            {"error": f"Licencia vencida desde {licencia_venc}. Debe estar vigente."},
+            status_code=422
+        )
+ 
     # ========== VALIDACIÓN 11: DOCUMENTOS REQUERIDOS ==========
     if not porte_propiedad.strip():
         return JSONResponse(
@@ -614,9 +599,12 @@ async def submit_inspeccion(
             linea=linea,
             licencia_num=licencia_num,
             licencia_venc=licencia_venc,
+            licencia_venc_fecha=venc_licencia,
             porte_propiedad=porte_propiedad,
             soat=soat,
+            soat_venc=venc_soat,
             certificado_emision=certificado_emision,
+            tecnomecanica_venc=venc_tecnomecanica,
             poliza_seguro=poliza_seguro,
             aspectos=aspectos,
             observaciones=observaciones,
@@ -624,32 +612,30 @@ async def submit_inspeccion(
             firma_file=firma_filename,
         )
  
-        db.add(inspeccion)
-        db.commit()
+        # ✅ Con SQLite los submits hacen cola (un escritor); con MySQL no cambia nada
+        async with sqlite_local.escritura_async(db):
+            # ✅ Posición del usuario con contador atómico (sin count(*)); se confirma con el commit
+            total = ciclos.siguiente(db, usuario_id)
+            inspeccion.ciclo = ciclos.ciclo_de(total)
+ 
+            db.add(inspeccion)
+            estadisticas.registrar_inspeccion(db, inspeccion)  # ✅ rollups en la misma transacción
+            vehiculos.registrar(db, inspeccion)                # ✅ registro del vehículo (precarga del formulario)
+            db.commit()
         db.refresh(inspeccion)
+        cache.invalidar_inspecciones()
+        vehiculos.invalidar(placa)
  
         inspeccion = prepare_registro(inspeccion)
  
-        # ── Advertencia licencia vencida ──────────────────────────────
-        _licencia_advertencia = None
-        if licencia_venc:
-            try:
-                for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
-                    try:
-                        _venc = datetime.strptime(licencia_venc.strip(), fmt)
-                        if _venc.date() < datetime.now().date():
-                            _licencia_advertencia = f"⚠️ Licencia vencida desde {licencia_venc}"
-                        break
-                    except ValueError:
-                        continue
-            except Exception:
-                pass
- 
-        total = (
-            db.query(models.Inspeccion)
-            .filter(models.Inspeccion.usuario_id == usuario_id)
-            .count()
-        )
+        # ── Advertencias: documentos del vehículo vencidos ────────────
+        _hoy = datetime.now().date()
+        _advertencias = [
+            f"⚠️ {nombre} vencido desde {fecha:%Y-%m-%d}"
+            for nombre, fecha in (("SOAT", venc_soat), ("Certificado tecnomecánico", venc_tecnomecanica))
+            if fecha and fecha < _hoy
+        ]
+        _advertencia = " · ".join(_advertencias) or None
  
         # PDF individual
         safe_pdf_name = f"inspeccion_{timestamp}.pdf"
@@ -660,8 +646,8 @@ async def submit_inspeccion(
             {
                 "registro": inspeccion,
                 "fecha": datetime.now().strftime("%d - %m - %Y"),
-                "codigo": "FO-SST-063",
-                "version": "01",
+                "codigo": reportes.CODIGO_FORMATO,
+                "version": reportes.VERSION_FORMATO,
                 "logo_path": build_file_uri(LOGO_PATH),
                 "aspectos_lista": inspeccion.aspectos_lista,
                 "titulo_tipo": inspeccion.titulo_tipo,
@@ -669,18 +655,12 @@ async def submit_inspeccion(
             output_path=str(pdf_path),
         )
  
-        # Consolidado a 15
-        if total == 15:
-            registros = (
-                db.query(models.Inspeccion)
-                .filter(models.Inspeccion.usuario_id == usuario_id)
-                .order_by(models.Inspeccion.fecha.desc())
-                .limit(15)
-                .all()
-            )
+        # Consolidado a 15: cada vez que se cierra un ciclo (15, 30, 45...)
+        if total % ciclos.TAMANO_CICLO == 0:
+            registros = ciclos.inspecciones_del_ciclo(db, usuario_id, inspeccion.ciclo)
             
             # ✅ Preparar TODOS los registros
-            registros = list(reversed([prepare_registro(r) for r in registros]))
+            registros = [prepare_registro(r) for r in registros]
  
             fecha_desde = registros[0].fecha.strftime("%d-%m-%Y")
             fecha_hasta = registros[-1].fecha.strftime("%d-%m-%Y")
@@ -696,8 +676,8 @@ async def submit_inspeccion(
                 {
                     "registros": registros,
                     "fecha": datetime.now().strftime("%d-%m-%Y"),
-                    "codigo": "FO-SST-063",
-                    "version": "01",
+                    "codigo": reportes.CODIGO_FORMATO,
+                    "version": reportes.VERSION_FORMATO,
                     "desde": fecha_desde,
                     "hasta": fecha_hasta,
                     "logo_path": build_file_uri(LOGO_PATH),
@@ -711,15 +691,13 @@ async def submit_inspeccion(
             if not reporte_path.exists() or reporte_path.stat().st_size < 1000:
                 raise RuntimeError(f"PDF consolidado inválido: {reporte_path}")
  
-            # ✅ Guardar historial del consolidado
-            hist = models.ReporteInspeccion(
-                nombre_conductor=nombre_conductor,
-                fecha_reporte=datetime.now(),
-                archivo_pdf=str(reporte_path),
-                total_incluidas=15,
-            )
-            db.add(hist)
-            db.commit()
+            # ✅ Guardar historial del consolidado (dueño, ciclo, tamaño y hash del PDF)
+            async with sqlite_local.escritura_async(db):
+                reportes.registrar(
+                    db, usuario_id, nombre_conductor, inspeccion.ciclo,
+                    reporte_path, total_incluidas=len(registros),
+                )
+                db.commit()
  
             # ✅ COMENTADO: No borrar inspecciones después de consolidar
             # Las inspecciones se MANTIENEN en el historial para auditoría
@@ -744,15 +722,15 @@ async def submit_inspeccion(
                 db.commit()
             """
  
-            return safe_return_pdf(reporte_path, reporte_filename)
+            return replica.fijar_primaria(safe_return_pdf(reporte_path, reporte_filename))
  
         # Construir respuesta con advertencias en header
         _pdf_response = safe_return_pdf(pdf_path, safe_pdf_name)
-        if _licencia_advertencia:
+        if _advertencia:
             from urllib.parse import quote
-            _pdf_response.headers["X-Advertencias"] = quote(_licencia_advertencia)
+            _pdf_response.headers["X-Advertencias"] = quote(_advertencia)
             _pdf_response.headers["Access-Control-Expose-Headers"] = "X-Advertencias"
-        return _pdf_response
+        return replica.fijar_primaria(_pdf_response)
  
     except Exception:
         raise  # FastAPI devuelve HTTP 500 automáticamente
@@ -765,6 +743,7 @@ async def submit_inspeccion(
 @router.get("/reporte15/{nombre_conductor}")
 async def generar_pdf15(
     nombre_conductor: str,
+    request: Request,
     usuario_actual: models.Usuario = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -772,16 +751,19 @@ async def generar_pdf15(
     nombre_conductor = normalize_name(nombre_conductor)
  
     try:
-        registros = (
-            db.query(models.Inspeccion)
-            .filter(
-                models.Inspeccion.nombre_conductor == nombre_conductor,
-                models.Inspeccion.usuario_id == usuario_actual.id
+        # ✅ Si el conductor lleva mucho sin inspeccionar, las 15 últimas pueden estar archivadas
+        registros = [
+            fila[0] for fila in archivo.leer_reciente(
+                db,
+                lambda M: (
+                    select(M)
+                    .where(M.nombre_conductor == nombre_conductor, M.usuario_id == usuario_actual.id)
+                    .order_by(M.fecha.desc(), M.id.desc())
+                ),
+                15,
+                clave=lambda fila: (fila[0].fecha, fila[0].id),
             )
-            .order_by(models.Inspeccion.fecha.desc())
-            .limit(15)
-            .all()
-        )
+        ]
  
         if not registros:
             return JSONResponse({"mensaje": "No hay inspecciones"}, status_code=404)
@@ -803,8 +785,8 @@ async def generar_pdf15(
             {
                 "registros": registros,
                 "fecha": datetime.now().strftime("%d-%m-%Y"),
-                "codigo": "FO-SST-063",
-                "version": "01",
+                "codigo": reportes.CODIGO_FORMATO,
+                "version": reportes.VERSION_FORMATO,
                 "desde": fecha_desde,
                 "hasta": fecha_hasta,
                 "logo_path": build_file_uri(LOGO_PATH),
@@ -814,7 +796,8 @@ async def generar_pdf15(
             output_path=str(pdf_path),
         )
  
-        return safe_return_pdf(pdf_path, pdf_filename)
+        auditoria.registrar("DESCARGAR_REPORTE15", f"{len(registros)} inspecciones ({pdf_filename})", usuario_actual.id)
+        return safe_return_pdf(pdf_path, pdf_filename, request)
  
     except Exception:
         raise
@@ -829,6 +812,7 @@ async def generar_pdf15(
 async def mis_inspecciones(
     request: Request,
     formato: str = "html",
+    since: str = "",
     usuario_actual: models.Usuario = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -843,42 +827,55 @@ async def mis_inspecciones(
     Soporta dos formatos:
     - ?formato=html (defecto) → devuelve template lista_inspecciones.html
     - ?formato=json → devuelve JSON con registros + reportes
+
+    JSON por deltas (refrescos en 3G rural):
+    - ETag = versión del historial en contadores_usuario: un
+      If-None-Match que coincide → 304 tras UNA lectura por PK
+    - &since=<cursor de la respuesta anterior> → "delta": true y solo
+      lo creado después: reportes nuevos, inspecciones nuevas del
+      ciclo (o el ciclo nuevo completo si cambió: "ciclo" distinto).
+      Cursor inválido o que no cuadra con el contador → respuesta
+      completa ("delta": false)
     """
     nombre_conductor = normalize_name(
         usuario_actual.nombre_visible or usuario_actual.nombre
     )
  
-    # ✅ OPTIMIZACIÓN: Solo últimas 15 inspecciones (ciclo actual)
-    # Ordenar DESC, limitar 15, luego invertir para mostrar cronológicamente
-    registros_raw = (
-        db.query(models.Inspeccion)
-        .filter(models.Inspeccion.usuario_id == usuario_actual.id)
-        .order_by(models.Inspeccion.fecha.desc())
-        .limit(15)  # ✅ MÁXIMO 15 en la vista principal
-        .all()
-    )
-    # Invertir para mostrar más antigua a más nueva
-    registros = list(reversed(registros_raw))
- 
-    # Reportes consolidados (historial de PDFs generados)
-    reportes_consolidados = (
-        db.query(models.ReporteInspeccion)
-        .filter(models.ReporteInspeccion.nombre_conductor == nombre_conductor)
-        .order_by(models.ReporteInspeccion.fecha_reporte.desc())
-        .all()
-    )
- 
-    # ✅ Contador correcto: len(registros) será siempre <= 15
-    # Si hay 90 inspecciones totales (6 ciclos), muestra 15 del ciclo actual
-    total_activas = len(registros)
-    puede_generar_pdf15 = total_activas >= 15
- 
     # ✅ NUEVO: Soporte para JSON
     if formato.lower() == "json":
-        return JSONResponse({
+        total, version = ciclos.version_usuario(db, usuario_actual.id)
+        etag = lecturas.etag_historial(usuario_actual, total, version)
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=cache_headers)
+
+        # Ciclo actual y posición en él, del mismo contador (sin count)
+        ciclo = ciclos.ciclo_de(max(total, 1))
+        en_ciclo = total - (ciclo - 1) * ciclos.TAMANO_CICLO
+
+        cursor = lecturas.leer_cursor(since)
+        registros = None
+        if cursor and cursor[0] == ciclo:
+            nuevos = lecturas.inspecciones_del_ciclo(db, usuario_actual.id, ciclo, despues_de=cursor[2])
+            if cursor[1] + len(nuevos) == en_ciclo:
+                registros, total_activas = nuevos, en_ciclo
+            else:
+                cursor = None   # no cuadra con el contador (submit concurrente): respuesta completa
+        if registros is None:
+            # Sin cursor o ciclo nuevo: el ciclo completo
+            registros = lecturas.inspecciones_del_ciclo(db, usuario_actual.id, ciclo)
+            total_activas = len(registros)
+        reportes_consolidados = lecturas.reportes_del_usuario(
+            db, usuario_actual.id, despues_de=cursor[3] if cursor else 0,
+        )
+
+        return lecturas.respuesta_json({
             "nombre_conductor": nombre_conductor,
+            "ciclo": ciclo,
             "total_en_ciclo": total_activas,  # 0-15
-            "puede_generar_pdf15": puede_generar_pdf15,
+            "puede_generar_pdf15": total_activas >= 15,
+            "delta": cursor is not None,
+            "cursor": lecturas.cursor_historial(ciclo, total_activas, registros, reportes_consolidados, cursor),
             "registros": [
                 {
                     "id": r.id,
@@ -898,10 +895,26 @@ async def mis_inspecciones(
                     "id": rep.id,
                     "fecha_reporte": rep.fecha_reporte.strftime("%Y-%m-%d %H:%M"),
                     "total_incluidas": rep.total_incluidas,
+                    "ciclo": rep.ciclo,
                 }
                 for rep in reportes_consolidados
             ],
-        })
+        }, headers=cache_headers)
+
+    # ✅ OPTIMIZACIÓN: Solo el ciclo actual (el de la última inspección), por índice
+    # (usuario_id, ciclo), de la más antigua a la más nueva. Nunca está archivado:
+    # solo se archiva lo consolidado.
+    # Solo las columnas del listado, sin entidades ORM (app/lecturas.py)
+    ciclo = ciclos.ciclo_actual(db, usuario_actual.id)
+    registros = lecturas.inspecciones_del_ciclo(db, usuario_actual.id, ciclo)
+ 
+    # Reportes consolidados (historial de PDFs generados) — por usuario_id, indexado
+    reportes_consolidados = lecturas.reportes_del_usuario(db, usuario_actual.id)
+ 
+    # ✅ Contador correcto: len(registros) será siempre <= 15
+    # Si hay 90 inspecciones totales (6 ciclos), muestra 15 del ciclo actual
+    total_activas = len(registros)
+    puede_generar_pdf15 = total_activas >= 15
  
     # Formato HTML (original)
     return _TEMPLATES.TemplateResponse(
@@ -916,6 +929,32 @@ async def mis_inspecciones(
     )
  
  
+# ==========================================================
+#   RUTA: PRECARGA DE DATOS DEL VEHÍCULO (por placa)
+# ==========================================================
+ 
+@router.get("/vehiculo/{placa}")
+async def datos_vehiculo(
+    placa: str,
+    usuario_actual: models.Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Últimos datos registrados del vehículo para precargar el formulario
+    (marca, modelo, motor, línea, documentos). 404 si la placa no tiene
+    inspecciones. Respuesta pequeña y cacheada en servidor y navegador.
+    """
+    placa = normalize_placa(placa)
+    if len(placa) < 5:
+        return JSONResponse({"error": "Placa inválida. Ejemplo: GSZ34F"}, status_code=422)
+ 
+    datos = vehiculos.prefill(db, placa)
+    if datos is None:
+        return JSONResponse({"error": "Vehículo sin inspecciones registradas"}, status_code=404)
+ 
+    return JSONResponse(datos, headers={"Cache-Control": "private, max-age=60"})
+ 
+ 
 # ==========================================================
 #   RUTA: DESCARGA PDF CONSOLIDADO (por id de reporte)
 # ==========================================================
@@ -923,22 +962,22 @@ async def mis_inspecciones(
 @router.get("/reporte-consolidado/{reporte_id}")
 async def descargar_reporte_consolidado(
     reporte_id: int,
+    request: Request,
     usuario_actual: models.Usuario = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
     """
     Descarga un PDF consolidado del historial.
-    El conductor solo puede descargar sus propios reportes.
+    El conductor solo puede descargar sus propios reportes (por usuario_id).
     El admin puede descargar cualquiera.
+    ETag = sha256 guardado: un If-None-Match que coincide → 304 sin cuerpo.
+    Un id siempre es el mismo PDF: caché immutable; Range para reanudar.
     """
-    reporte = db.query(models.ReporteInspeccion).filter_by(id=reporte_id).first()
+    reporte = db.get(models.ReporteInspeccion, reporte_id)
     if not reporte:
         return JSONResponse({"error": "Reporte no encontrado"}, status_code=404)
  
-    nombre_conductor = normalize_name(
-        usuario_actual.nombre_visible or usuario_actual.nombre
-    )
-    if usuario_actual.rol != "admin" and reporte.nombre_conductor != nombre_conductor:
+    if usuario_actual.rol != "admin" and reporte.usuario_id != usuario_actual.id:
         return JSONResponse({"error": "Sin acceso a este reporte"}, status_code=403)
  
     pdf_path = Path(reporte.archivo_pdf)
@@ -952,7 +991,12 @@ async def descargar_reporte_consolidado(
     if not filename.lower().endswith(".pdf"):
         filename += ".pdf"
  
-    return safe_return_pdf(pdf_path, filename)
+    respuesta = safe_return_pdf(
+        pdf_path, filename, request, etag=reportes.etag(reporte, pdf_path), inmutable=True,
+    )
+    if descargas.es_descarga_nueva(respuesta, request):
+        auditoria.registrar("DESCARGAR_REPORTE", f"Reporte #{reporte.id} ({filename})", usuario_actual.id)
+    return respuesta
  
  
 # ==========================================================
@@ -962,6 +1006,7 @@ async def descargar_reporte_consolidado(
 @router.get("/detalle/{inspeccion_id}")
 async def detalle_inspeccion(
     inspeccion_id: int,
+    request: Request,
     formato: str = "json",
     usuario_actual: models.Usuario = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -969,11 +1014,12 @@ async def detalle_inspeccion(
     """
     Devuelve el detalle de una inspección individual.
     ?formato=json → datos en JSON (para modal del frontend)
-    ?formato=pdf  → regenera y descarga el PDF individual
+    ?formato=pdf  → descarga el PDF individual (se genera solo si falta
+                    o si la plantilla cambió: ETag estable → 304 / Range)
     El conductor solo puede ver/descargar sus propias inspecciones.
     El admin puede acceder a cualquiera.
     """
-    inspeccion = db.query(models.Inspeccion).filter_by(id=inspeccion_id).first()
+    inspeccion = archivo.obtener(db, inspeccion_id)  # ✅ tabla caliente o archivo
     if not inspeccion:
         return JSONResponse({"error": "Inspección no encontrada"}, status_code=404)
  
@@ -986,22 +1032,28 @@ async def detalle_inspeccion(
         timestamp  = inspeccion.fecha.strftime("%Y%m%d_%H%M%S")
         pdf_filename = f"inspeccion_{inspeccion.nombre_conductor.replace(' ','_')}_{timestamp}.pdf"
         user_paths = get_user_paths(inspeccion.usuario_id)
-        pdf_path   = user_paths["inspecciones"] / pdf_filename
+        # El id en el archivo guardado: dos inspecciones del mismo segundo no comparten PDF
+        pdf_path   = user_paths["inspecciones"] / f"inspeccion_{inspeccion.id}_{timestamp}.pdf"
  
-        render_pdf_from_template(
-            "pdf_template.html",
-            {
-                "registro":       inspeccion,
-                "fecha":          inspeccion.fecha.strftime("%d - %m - %Y"),
-                "codigo":         "FO-SST-063",
-                "version":        "01",
-                "logo_path":      build_file_uri(LOGO_PATH),
-                "aspectos_lista": inspeccion.aspectos_lista,
-                "titulo_tipo":    inspeccion.titulo_tipo,
-            },
-            output_path=str(pdf_path),
-        )
-        return safe_return_pdf(pdf_path, pdf_filename)
+        # Las inspecciones no se editan: el PDF guardado sirve mientras la plantilla no cambie
+        if not pdf_path.exists() or pdf_path.stat().st_mtime < PLANTILLA_INDIVIDUAL.stat().st_mtime:
+            render_pdf_from_template(
+                "pdf_template.html",
+                {
+                    "registro":       inspeccion,
+                    "fecha":          inspeccion.fecha.strftime("%d - %m - %Y"),
+                    "codigo":         reportes.CODIGO_FORMATO,
+                    "version":        reportes.VERSION_FORMATO,
+                    "logo_path":      build_file_uri(LOGO_PATH),
+                    "aspectos_lista": inspeccion.aspectos_lista,
+                    "titulo_tipo":    inspeccion.titulo_tipo,
+                },
+                output_path=str(pdf_path),
+            )
+        respuesta = safe_return_pdf(pdf_path, pdf_filename, request)
+        if descargas.es_descarga_nueva(respuesta, request):
+            auditoria.registrar("DESCARGAR_PDF", f"Inspección #{inspeccion_id} ({pdf_filename})", usuario_actual.id)
+        return respuesta
  
     # Formato JSON — datos completos para el modal
     asp   = inspeccion.aspectos_parsed or {}
@@ -1029,6 +1081,8 @@ async def detalle_inspeccion(
         "licencia_venc":       inspeccion.licencia_venc,
         "porte_propiedad":     inspeccion.porte_propiedad,
         "soat":                inspeccion.soat,
+        "soat_venc":           inspeccion.soat_venc.isoformat() if inspeccion.soat_venc else "",
+        "tecnomecanica_venc":  inspeccion.tecnomecanica_venc.isoformat() if inspeccion.tecnomecanica_venc else "",
         "certificado_emision": inspeccion.certificado_emision,
         "poliza_seguro":       inspeccion.poliza_seguro,
         "condiciones_optimas": inspeccion.condiciones_optimas,
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Mueve inspecciones antiguas y ya consolidadas de `inspecciones`
+a `inspecciones_archivo` (ver app/archivo.py).
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.archivar_inspecciones              # horizonte ARCHIVO_HORIZONTE_DIAS
+    python -m app.scripts.archivar_inspecciones --dias 180
+    python -m app.scripts.archivar_inspecciones --dry-run    # solo cuenta
+
+Se archiva una inspección si:
+- su fecha es anterior a hoy menos --dias, y
+- ya quedó en un reporte consolidado del conductor.
+
+Las que nunca se consolidaron se quedan en la tabla caliente
+aunque sean viejas. El panel admin, las APIs y las exportaciones
+leen del archivo cuando el rango lo pide; el detalle por id
+también lo encuentra. Programarlo semanal o mensual (cron).
+"""
+
+import argparse
+
+from app.database import Base, SessionLocal, engine
+from app import models  # noqa: F401  (registra las tablas en Base)
+from app import archivo
+from app.migraciones import asegurar_esquema
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archivo de inspecciones antiguas")
+    parser.add_argument("--dias", type=int, default=archivo.ARCHIVO_HORIZONTE_DIAS,
+                        help=f"antigüedad mínima en días (defecto {archivo.ARCHIVO_HORIZONTE_DIAS})")
+    parser.add_argument("--lote", type=int, default=archivo.LOTE_ARCHIVO)
+    parser.add_argument("--dry-run", action="store_true", help="solo cuenta las archivables")
+    args = parser.parse_args()
+
+    if args.dias < 1:
+        raise SystemExit("❌ --dias debe ser al menos 1")
+
+    Base.metadata.create_all(bind=engine)
+    asegurar_esquema(engine)
+
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            n = archivo.contar_archivables(db, args.dias)
+            print(f"🔎 {n} inspecciones se moverían al archivo (> {args.dias} días y consolidadas)")
+            return
+
+        print(f"📦 Archivando inspecciones consolidadas de hace más de {args.dias} días...")
+        n = archivo.archivar(db, args.dias, args.lote)
+        print(f"✅ {n} inspecciones movidas a inspecciones_archivo")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error archivando inspecciones: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark: filtros del panel admin con ILIKE '%x%' (antes) vs
+columnas normalizadas con índice de prefijo (app/busqueda.py).
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.bench_busqueda
+    python -m app.scripts.bench_busqueda --filas 500000 --repeticiones 30
+    python -m app.scripts.bench_busqueda --url "mysql+pymysql://u:p@host/bench_db"
+
+Por defecto trabaja sobre una BD SQLite aparte
+(app/data/bench_busqueda.db), NUNCA sobre la de producción.
+Con --url se puede apuntar a un MySQL de pruebas. Si la BD ya
+tiene las filas pedidas, se reutiliza.
+
+Cada consulta es la del panel: WHERE filtro ORDER BY fecha DESC
+LIMIT 300. Se miden términos raros (placa concreta, conductor con
+pocas inspecciones, nombre inexistente) y uno frecuente (apellido
+común): el ILIKE es rápido solo cuando encuentra 300 coincidencias
+pronto; con términos raros recorre la tabla entera.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import string
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Sin caché compartida: el benchmark no debe escribir en la de la app
+os.environ["CACHE_BACKEND"] = "ninguno"
+
+from sqlalchemy import create_engine, func, insert, select, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app import models, busqueda  # noqa: E402
+
+_HERE = Path(__file__).resolve().parent.parent  # app/
+URL_DEFECTO = f"sqlite:///{_HERE / 'data' / 'bench_busqueda.db'}"
+
+NOMBRES   = ["Juan", "Carlos", "Andrés", "Luis", "Jorge", "María", "Ana", "Sofía", "José", "Diego"]
+APELLIDOS = ["Pérez", "Gómez", "Rodríguez", "López", "Martínez", "García", "Ramírez", "Díaz", "Muñoz", "Rojas"]
+TIPOS     = ["Moto", "Carro", "Camion"]
+LOTE      = 5000
+LIMITE    = 300
+
+
+# ══════════════════════════════════════════════════════════════
+#  DATOS
+# ══════════════════════════════════════════════════════════════
+
+def _placa(rnd: random.Random) -> str:
+    letras = "".join(rnd.choices(string.ascii_uppercase, k=3))
+    return f"{letras}{rnd.randint(10, 99)}{rnd.choice(string.ascii_uppercase)}"
+
+
+def poblar(engine, filas: int, usuarios: int = 200):
+    rnd = random.Random(42)
+    with Session(engine) as db:
+        existentes = db.scalar(select(func.count()).select_from(models.Inspeccion))
+        if existentes >= filas:
+            print(f"♻️  Reutilizando {existentes} inspecciones existentes")
+            return
+        if existentes:
+            raise SystemExit("❌ La BD de benchmark tiene datos parciales; bórrala y vuelve a lanzar")
+
+        print(f"🔧 Generando {usuarios} usuarios y {filas} inspecciones...")
+        conductores = []
+        for i in range(usuarios):
+            nombre = f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}"
+            conductores.append(nombre)
+            db.add(models.Usuario(id=i + 1, cedula=str(10_000_000 + i), nombre_visible=nombre, rol="user", activo=1))
+        db.commit()
+
+        placas = [_placa(rnd) for _ in range(usuarios * 3)]
+        inicio = datetime.now() - timedelta(days=5 * 365)
+        paso = (5 * 365 * 86400) / filas
+        t0 = time.perf_counter()
+        for base in range(0, filas, LOTE):
+            lote = []
+            for n in range(base, min(base + LOTE, filas)):
+                uid = rnd.randint(1, usuarios)
+                placa = placas[(uid - 1) * 3 + rnd.randint(0, 2)]
+                nombre = conductores[uid - 1]
+                lote.append({
+                    "usuario_id": uid,
+                    "fecha": inicio + timedelta(seconds=n * paso),
+                    "nombre_conductor": nombre,
+                    "placa": placa,
+                    "tipo_vehiculo": rnd.choice(TIPOS),
+                    "proceso": "Traslado",
+                    "observaciones": "",
+                    "placa_norm": busqueda.normalizar_placa(placa),
+                    "conductor_norm": busqueda.normalizar_nombre(nombre),
+                })
+            db.execute(insert(models.Inspeccion), lote)
+            db.commit()
+        print(f"   {filas} filas en {time.perf_counter() - t0:.1f}s")
+
+
+# ══════════════════════════════════════════════════════════════
+#  MEDICIÓN
+# ══════════════════════════════════════════════════════════════
+
+def _consulta(condicion):
+    return (
+        select(models.Inspeccion.id, models.Inspeccion.fecha, models.Inspeccion.placa)
+        .where(condicion)
+        .order_by(models.Inspeccion.fecha.desc())
+        .limit(LIMITE)
+    )
+
+
+def _medir(db: Session, construir, repeticiones: int) -> dict:
+    tiempos = []
+    n = 0
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        n = len(db.execute(_consulta(construir())).all())
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    tiempos.sort()
+    return {
+        "p50": statistics.median(tiempos),
+        "p95": tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))],
+        "filas": n,
+    }
+
+
+def _plan(db: Session, condicion) -> str:
+    sql = _consulta(condicion).compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    if db.get_bind().dialect.name == "sqlite":
+        filas = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+        return " | ".join(str(f[-1]) for f in filas)
+    filas = db.execute(text(f"EXPLAIN {sql}")).mappings().all()
+    return " | ".join(f"{f['table']}:{f['type']} key={f['key']} rows={f['rows']}" for f in filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de búsqueda de inspecciones")
+    parser.add_argument("--url", default=URL_DEFECTO, help="BD de pruebas (defecto: SQLite local)")
+    parser.add_argument("--filas", type=int, default=500_000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    Base.metadata.create_all(bind=engine)
+    poblar(engine, args.filas)
+
+    I = models.Inspeccion
+    with Session(engine) as db:
+        placa_rara = db.scalar(select(I.placa).where(I.id == args.filas // 2))
+        apellido = "Pérez"
+        # Conductor con menos inspecciones: el peor caso del ILIKE (recorre casi toda la tabla)
+        conductor_raro = db.execute(
+            select(I.nombre_conductor, func.count().label("n"))
+            .group_by(I.nombre_conductor).order_by("n").limit(1)
+        ).scalar()
+
+        casos = [
+            (f"placa '{placa_rara}'",
+             lambda: I.placa.ilike(f"%{placa_rara}%"),
+             lambda: busqueda.condicion_placa(placa_rara)),
+            (f"placa prefijo '{placa_rara[:3]}'",
+             lambda: I.placa.ilike(f"%{placa_rara[:3]}%"),
+             lambda: busqueda.condicion_placa(placa_rara[:3])),
+            (f"conductor '{apellido}'",
+             lambda: I.nombre_conductor.ilike(f"%{apellido}%"),
+             lambda: busqueda.condicion_conductor(db, apellido)),
+            (f"conductor '{conductor_raro}'",
+             lambda: I.nombre_conductor.ilike(f"%{conductor_raro}%"),
+             lambda: busqueda.condicion_conductor(db, conductor_raro)),
+            ("sin resultados 'Zuleta'",
+             lambda: I.nombre_conductor.ilike("%Zuleta%"),
+             lambda: busqueda.condicion_conductor(db, "Zuleta")),
+        ]
+
+        print(f"\n📊 {args.filas} inspecciones · {args.repeticiones} repeticiones · LIMIT {LIMITE}\n")
+        print(f"{'caso':40} {'ILIKE p50':>10} {'p95':>8}   {'índice p50':>10} {'p95':>8}  {'filas':>6}")
+        print("─" * 92)
+        for nombre, antes, ahora in casos:
+            a = _medir(db, antes, args.repeticiones)
+            b = _medir(db, ahora, args.repeticiones)
+            print(
+                f"{nombre:40} {a['p50']:9.1f}ms {a['p95']:7.1f}ms   "
+                f"{b['p50']:9.1f}ms {b['p95']:7.1f}ms  {b['filas']:>6}"
+            )
+
+        print("\n🔎 Planes de ejecución")
+        for nombre, antes, ahora in casos:
+            print(f"  {nombre}")
+            print(f"    ILIKE:  {_plan(db, antes())}")
+            print(f"    índice: {_plan(db, ahora())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: coste por fila de los listados con entidades ORM +
+json (antes) vs select() de columnas → DTOs con __slots__ + orjson
+(app/lecturas.py).
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.bench_lecturas
+    python -m app.scripts.bench_lecturas --filas 20000 --repeticiones 50
+
+Trabaja sobre una BD SQLite aparte (app/data/bench_lecturas.db),
+NUNCA sobre la de producción. Las inspecciones sintéticas llevan
+aspectos y observaciones de tamaño real: es lo que la versión ORM
+cargaba sin usarlo.
+
+Casos (el mismo JSON de salida en ambas versiones):
+    ciclo del conductor   15 filas   (mis_inspecciones?formato=json)
+    usuarios              todos      (/api/admin/usuarios)
+    listado grande        --filas    (peor caso: misma consulta sin filtro)
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Sin caché compartida: el benchmark no debe escribir en la de la app
+os.environ["CACHE_BACKEND"] = "ninguno"
+
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app import lecturas, models  # noqa: E402
+
+_HERE = Path(__file__).resolve().parent.parent  # app/
+URL_DEFECTO = f"sqlite:///{_HERE / 'data' / 'bench_lecturas.db'}"
+
+USUARIOS = 300
+LOTE     = 5000
+I = models.Inspeccion
+
+
+# ══════════════════════════════════════════════════════════════
+#  DATOS
+# ══════════════════════════════════════════════════════════════
+
+def poblar(engine, filas: int):
+    rnd = random.Random(42)
+    with Session(engine) as db:
+        existentes = db.scalar(select(func.count()).select_from(I))
+        if existentes >= filas:
+            print(f"♻️  Reutilizando {existentes} inspecciones existentes")
+            return
+        if existentes:
+            raise SystemExit("❌ La BD de benchmark tiene datos parciales; bórrala y vuelve a lanzar")
+
+        print(f"🔧 Generando {USUARIOS} usuarios y {filas} inspecciones...")
+        db.execute(insert(models.Usuario), [
+            {"id": i + 1, "cedula": str(10_000_000 + i), "nombre_visible": f"Conductor {i + 1}",
+             "rol": "user", "activo": 1, "pin_hash": "x" * 60}
+            for i in range(USUARIOS)
+        ])
+        aspectos = json.dumps({str(n): "B" for n in range(1, 51)})   # camión: 50 aspectos
+        inicio = datetime.now() - timedelta(days=365)
+        for base in range(0, filas, LOTE):
+            db.execute(insert(I), [
+                {
+                    "usuario_id": (n % USUARIOS) + 1,
+                    "fecha": inicio + timedelta(minutes=n),
+                    "ciclo": n // (USUARIOS * 15) + 1,
+                    "nombre_conductor": f"Conductor {(n % USUARIOS) + 1}",
+                    "placa": f"ABC{n % 900 + 100}", "tipo_vehiculo": "Camion",
+                    "proceso": "Traslado", "desde": "Planta", "hasta": "Granja",
+                    "condiciones_optimas": "SI", "aspectos": aspectos,
+                    "observaciones": "Sin novedad. " * rnd.randint(0, 20),
+                }
+                for n in range(base, min(base + LOTE, filas))
+            ])
+            db.commit()
+
+
+# ══════════════════════════════════════════════════════════════
+#  ANTES / AHORA
+# ══════════════════════════════════════════════════════════════
+
+def _json_inspecciones(registros) -> list:
+    return [
+        {
+            "id": r.id, "fecha": r.fecha.strftime("%Y-%m-%d"), "placa": r.placa,
+            "tipo_vehiculo": r.tipo_vehiculo or "Moto", "proceso": r.proceso,
+            "desde": r.desde, "hasta": r.hasta, "condiciones_optimas": r.condiciones_optimas,
+            "observaciones": r.observaciones or "",
+        }
+        for r in registros
+    ]
+
+
+def _json_usuarios(usuarios) -> list:
+    return [
+        {"id": u.id, "cedula": u.cedula, "nombre_visible": u.nombre_visible, "rol": u.rol, "activo": bool(u.activo)}
+        for u in usuarios
+    ]
+
+
+def casos(filas: int) -> list:
+    """(nombre, antes(db), ahora(db)) → bytes del JSON."""
+    def ciclo_orm(db):
+        regs = db.query(I).filter(I.usuario_id == 7, I.ciclo == 1).order_by(I.fecha, I.id).all()
+        return json.dumps({"registros": _json_inspecciones(regs)}).encode()
+
+    def ciclo_dto(db):
+        return lecturas.dumps({"registros": _json_inspecciones(lecturas.inspecciones_del_ciclo(db, 7, 1))})
+
+    def usuarios_orm(db):
+        return json.dumps({"usuarios": _json_usuarios(db.query(models.Usuario).all())}).encode()
+
+    def usuarios_dto(db):
+        return lecturas.dumps({"usuarios": _json_usuarios(lecturas.usuarios(db))})
+
+    def grande_orm(db):
+        return json.dumps({"registros": _json_inspecciones(db.query(I).order_by(I.fecha, I.id).all())}).encode()
+
+    def grande_dto(db):
+        cols = lecturas.columnas(lecturas.InspeccionLista, I)
+        dtos = lecturas.proyectar(db, lecturas.InspeccionLista, select(*cols).order_by(I.fecha, I.id))
+        return lecturas.dumps({"registros": _json_inspecciones(dtos)})
+
+    return [
+        ("ciclo del conductor", ciclo_orm, ciclo_dto),
+        ("usuarios", usuarios_orm, usuarios_dto),
+        (f"listado de {filas}", grande_orm, grande_dto),
+    ]
+
+
+def _medir(engine, fn, repeticiones: int) -> tuple:
+    tiempos, salida = [], b""
+    for _ in range(repeticiones):
+        with Session(engine) as db:   # sesión nueva por request, como get_db
+            t0 = time.perf_counter()
+            salida = fn(db)
+            tiempos.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(tiempos), salida
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de listados: ORM vs DTOs")
+    parser.add_argument("--url", default=URL_DEFECTO, help="BD de pruebas (defecto: SQLite local)")
+    parser.add_argument("--filas", type=int, default=10_000)
+    parser.add_argument("--repeticiones", type=int, default=30)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    Base.metadata.create_all(bind=engine)
+    poblar(engine, args.filas)
+
+    print(f"\n📊 mediana de {args.repeticiones} repeticiones · serializador: "
+          f"{'orjson' if lecturas.orjson is not None else 'json (sin orjson)'}\n")
+    print(f"{'caso':24} {'filas':>6}   {'ORM ms':>8} {'µs/fila':>8}   {'DTO ms':>8} {'µs/fila':>8}   {'×':>5}")
+    print("─" * 80)
+    for nombre, antes, ahora in casos(args.filas):
+        t_antes, json_antes = _medir(engine, antes, args.repeticiones)
+        t_ahora, json_ahora = _medir(engine, ahora, args.repeticiones)
+        if json.loads(json_antes) != json.loads(json_ahora):
+            raise SystemExit(f"❌ {nombre}: el JSON no coincide")
+        n = max(len(next(iter(json.loads(json_ahora).values()))), 1)
+        print(
+            f"{nombre:24} {n:>6}   {t_antes:8.2f} {t_antes * 1000 / n:8.1f}   "
+            f"{t_ahora:8.2f} {t_ahora * 1000 / n:8.1f}   {t_antes / t_ahora:5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark: consultas por fecha del panel sobre `inspecciones` con y
+sin particionado por rango (app/particiones.py). Solo MySQL.
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.generar_datos --url "mysql+pymysql://u:p@host/escala_db"   # 1M filas
+    python -m app.scripts.bench_particiones --url "mysql+pymysql://u:p@host/escala_db"
+    python -m app.scripts.bench_particiones --url ... --granularidad anio --repeticiones 20
+    python -m app.scripts.bench_particiones --url ... --limpiar     # borra las copias al terminar
+
+Copia `inspecciones` de esa BD a dos tablas nuevas (bench_insp_plana
+y bench_insp_part, esta particionada con particionar()) y corre las
+mismas consultas sobre ambas. Las copias se reutilizan entre
+ejecuciones mientras tengan las mismas filas (--reconstruir para
+rehacerlas). No toca `inspecciones`. Usar una BD de pruebas.
+
+Consultas (las de las rutas, con la fecha como rango → pruning):
+    ventana 90 días     conteo por día y tipo (dashboard, rollups)
+    por mes (1 año)     agrupación mensual
+    filtro de un mes    página de 50 del panel de inspecciones
+    exportación trim.   todas las columnas de un trimestre
+    histórico           conteo total, sin filtro (control: no poda)
+Para cada una muestra las particiones que abre MySQL (EXPLAIN).
+"""
+
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+# Sin caché compartida: el benchmark no debe escribir en la de la app
+os.environ["CACHE_BACKEND"] = "ninguno"
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from app import particiones  # noqa: E402
+
+PLANA = "bench_insp_plana"
+PART  = "bench_insp_part"
+
+CONSULTAS = [
+    ("ventana 90 días",
+     "SELECT DATE(fecha), tipo_vehiculo, COUNT(*) FROM {t} WHERE fecha >= :d90 GROUP BY DATE(fecha), tipo_vehiculo"),
+    ("por mes (1 año)",
+     "SELECT YEAR(fecha), MONTH(fecha), COUNT(*) FROM {t} WHERE fecha >= :d365 GROUP BY YEAR(fecha), MONTH(fecha)"),
+    ("filtro de un mes",
+     "SELECT id, fecha, placa, tipo_vehiculo, proceso, condiciones_optimas FROM {t} "
+     "WHERE fecha >= :m0 AND fecha < :m1 ORDER BY fecha DESC, id DESC LIMIT 50"),
+    ("exportación trim.",
+     "SELECT * FROM {t} WHERE fecha >= :q0 AND fecha < :q1"),
+    ("histórico",
+     "SELECT COUNT(*) FROM {t}"),
+]
+
+
+def _parametros() -> dict:
+    hoy = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    mes = hoy.replace(day=1)
+    mes_anterior = (mes - timedelta(days=1)).replace(day=1)
+    return {
+        "d90": hoy - timedelta(days=90), "d365": hoy - timedelta(days=365),
+        "m0": mes_anterior, "m1": mes,
+        "q0": hoy - timedelta(days=180), "q1": hoy - timedelta(days=90),
+    }
+
+
+def preparar(engine, granularidad: str, reconstruir: bool):
+    with engine.connect() as conn:
+        total = conn.execute(text("SELECT COUNT(*) FROM inspecciones")).scalar()
+        if not total:
+            raise SystemExit("❌ `inspecciones` está vacía: poblarla antes con app.scripts.generar_datos --url ...")
+
+        listas = not reconstruir and all(
+            conn.execute(text(
+                "SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :t"
+            ), {"t": t}).scalar() and conn.execute(text(f"SELECT COUNT(*) FROM {t}")).scalar() == total
+            for t in (PLANA, PART)
+        )
+        if listas:
+            print(f"♻️  Reutilizando las copias de {total} inspecciones")
+            return total
+
+        print(f"🔧 Copiando {total} inspecciones a {PLANA} y {PART}...")
+        for t in (PLANA, PART):
+            t0 = time.perf_counter()
+            conn.execute(text(f"DROP TABLE IF EXISTS {t}"))
+            conn.execute(text(f"CREATE TABLE {t} LIKE inspecciones"))
+            if particiones.particiones(conn, t):   # la original ya estaba particionada
+                conn.execute(text(f"ALTER TABLE {t} REMOVE PARTITIONING"))
+            conn.execute(text(f"INSERT INTO {t} SELECT * FROM inspecciones"))
+            conn.commit()
+            print(f"   {t}: {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    r = particiones.particionar(engine, granularidad, tabla=PART)
+    print(f"   {PART} particionada por {granularidad} ({r['particiones']} particiones): {time.perf_counter() - t0:.1f}s")
+    with engine.connect() as conn:
+        for t in (PLANA, PART):
+            conn.execute(text(f"ANALYZE TABLE {t}"))
+    return total
+
+
+def _medir(conn, sql: str, params: dict, repeticiones: int) -> tuple:
+    tiempos, filas = [], 0
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        filas = len(conn.execute(text(sql), params).all())
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(tiempos), filas
+
+
+def _particiones_abiertas(conn, sql: str, params: dict) -> str:
+    plan = conn.execute(text("EXPLAIN " + sql), params).mappings().first()
+    abiertas = (plan or {}).get("partitions") or ""
+    return str(len(abiertas.split(","))) if abiertas else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de consultas por fecha con y sin particiones")
+    parser.add_argument("--url", required=True, help="MySQL de pruebas con `inspecciones` poblada")
+    parser.add_argument("--granularidad", choices=particiones.GRANULARIDADES, default="mes")
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--reconstruir", action="store_true", help="rehace las copias aunque existan")
+    parser.add_argument("--limpiar", action="store_true", help="borra las copias al terminar")
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    if not particiones.soportado(engine):
+        raise SystemExit(f"❌ El particionado es de MySQL (motor: {engine.dialect.name})")
+
+    preparar(engine, args.granularidad, args.reconstruir)
+    params = _parametros()
+
+    print(f"\n📊 mediana de {args.repeticiones} repeticiones\n")
+    print(f"{'consulta':20} {'filas':>8}   {'plana ms':>9}   {'part. ms':>9} {'abiertas':>9}   {'×':>5}")
+    print("─" * 72)
+    with engine.connect() as conn:
+        total_part = len(particiones.particiones(conn, PART))
+        for nombre, plantilla in CONSULTAS:
+            # Una pasada sin medir para que ambas partan con el buffer pool caliente
+            for t in (PLANA, PART):
+                conn.execute(text(plantilla.format(t=t)), params).all()
+            t_plana, filas = _medir(conn, plantilla.format(t=PLANA), params, args.repeticiones)
+            t_part, _ = _medir(conn, plantilla.format(t=PART), params, args.repeticiones)
+            abiertas = _particiones_abiertas(conn, plantilla.format(t=PART), params)
+            print(f"{nombre:20} {filas:>8}   {t_plana:9.2f}   {t_part:9.2f} "
+                  f"{abiertas + '/' + str(total_part):>9}   {t_plana / t_part:5.1f}")
+
+        if args.limpiar:
+            for t in (PLANA, PART):
+                conn.execute(text(f"DROP TABLE IF EXISTS {t}"))
+            conn.commit()
+            print(f"\n🧹 {PLANA} y {PART} borradas")
+
+
+if __name__ == "__main__":
+    main()
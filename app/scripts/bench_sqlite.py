@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQLite local (WAL + pragmas de app/sqlite_local.py) vs
+MySQL con la carga de la app.
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.bench_sqlite
+    python -m app.scripts.bench_sqlite --mysql-url "mysql+pymysql://u:p@host/bench_db"
+    python -m app.scripts.bench_sqlite --filas 200000 --hilos 8 --submits 400
+
+SQLite trabaja sobre una BD aparte (app/data/bench_sqlite.db),
+NUNCA sobre la de producción; --mysql-url debe ser un MySQL de
+pruebas (se le añaden inspecciones). Si la BD ya tiene las filas
+pedidas, se reutiliza.
+
+Lecturas (mismas consultas que las rutas):
+    detalle          inspección por id
+    mis inspecciones últimas 15 del conductor (índice usuario, fecha)
+    precarga         vehículo por placa (GET /inspecciones/vehiculo)
+    panel admin      últimas 300
+    búsqueda placa   prefijo de placa (app/busqueda.py)
+
+Escrituras: la transacción del submit (contador de ciclo,
+inspección, rollups, vehículo) con 1 hilo y con --hilos a la vez.
+Con SQLite pasan por la cola de escritor único
+(sqlite_local.escritura); con MySQL van en paralelo.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import string
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Sin caché compartida: el benchmark no debe escribir en la de la app
+os.environ["CACHE_BACKEND"] = "ninguno"
+
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app import models, busqueda, ciclos, conexiones, estadisticas, sqlite_local, vehiculos  # noqa: E402
+
+_HERE = Path(__file__).resolve().parent.parent  # app/
+URL_SQLITE = f"sqlite:///{_HERE / 'data' / 'bench_sqlite.db'}"
+
+NOMBRES   = ["Juan", "Carlos", "Andrés", "Luis", "Jorge", "María", "Ana", "Sofía", "José", "Diego"]
+APELLIDOS = ["Pérez", "Gómez", "Rodríguez", "López", "Martínez", "García", "Ramírez", "Díaz", "Muñoz", "Rojas"]
+TIPOS     = ["Moto", "Carro", "Camion"]
+USUARIOS  = 200
+LOTE      = 5000
+
+I = models.Inspeccion
+V = models.Vehiculo
+
+
+# ══════════════════════════════════════════════════════════════
+#  DATOS
+# ══════════════════════════════════════════════════════════════
+
+def _placa(rnd: random.Random) -> str:
+    letras = "".join(rnd.choices(string.ascii_uppercase, k=3))
+    return f"{letras}{rnd.randint(10, 99)}{rnd.choice(string.ascii_uppercase)}"
+
+
+def _engine(url: str, hilos: int):
+    opciones = conexiones.opciones_engine()
+    opciones["pool_size"] = max(opciones["pool_size"], hilos + 1)
+    if sqlite_local.es_sqlite(url):
+        opciones.update(sqlite_local.opciones_engine())
+    engine = create_engine(url, **opciones)
+    if sqlite_local.es_sqlite(url):
+        sqlite_local.instalar(engine)
+    return engine
+
+
+def poblar(engine, filas: int) -> list:
+    """Crea usuarios, inspecciones y vehículos si faltan. Returns: placas."""
+    rnd = random.Random(42)
+    placas = [_placa(rnd) for _ in range(USUARIOS * 3)]
+    with Session(engine) as db:
+        existentes = db.scalar(select(func.count()).select_from(I))
+        if existentes >= filas:
+            print(f"   ♻️  Reutilizando {existentes} inspecciones existentes")
+            return placas
+        if existentes:
+            raise SystemExit("❌ La BD de benchmark tiene datos parciales; bórrala y vuelve a lanzar")
+
+        print(f"   🔧 Generando {USUARIOS} usuarios y {filas} inspecciones...")
+        conductores = []
+        for i in range(USUARIOS):
+            nombre = f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}"
+            conductores.append(nombre)
+            db.add(models.Usuario(id=i + 1, cedula=str(10_000_000 + i), nombre_visible=nombre, rol="user", activo=1))
+        db.commit()
+
+        inicio = datetime.now() - timedelta(days=2 * 365)
+        paso = (2 * 365 * 86400) / filas
+        t0 = time.perf_counter()
+        for base in range(0, filas, LOTE):
+            lote = []
+            for n in range(base, min(base + LOTE, filas)):
+                uid = rnd.randint(1, USUARIOS)
+                placa = placas[(uid - 1) * 3 + rnd.randint(0, 2)]
+                nombre = conductores[uid - 1]
+                lote.append({
+                    "usuario_id": uid,
+                    "fecha": inicio + timedelta(seconds=n * paso),
+                    "nombre_conductor": nombre,
+                    "placa": placa,
+                    "tipo_vehiculo": rnd.choice(TIPOS),
+                    "proceso": "Traslado",
+                    "observaciones": "",
+                    "placa_norm": busqueda.normalizar_placa(placa),
+                    "conductor_norm": busqueda.normalizar_nombre(nombre),
+                })
+            db.execute(insert(I), lote)
+            db.commit()
+        db.execute(insert(V), [
+            {"placa": p, "tipo_vehiculo": rnd.choice(TIPOS), "marca": "Honda", "inspecciones": 1,
+             "ultimo_usuario_id": n // 3 + 1, "actualizado": datetime.now()}
+            for n, p in enumerate(placas)
+        ])
+        db.commit()
+        print(f"   {filas} filas en {time.perf_counter() - t0:.1f}s")
+    return placas
+
+
+# ══════════════════════════════════════════════════════════════
+#  MEDICIÓN
+# ══════════════════════════════════════════════════════════════
+
+def _resumen(tiempos: list) -> dict:
+    tiempos.sort()
+    return {
+        "p50": statistics.median(tiempos),
+        "p95": tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))],
+    }
+
+
+def lecturas(engine, placas: list, filas: int, repeticiones: int) -> dict:
+    rnd = random.Random(7)
+    casos = {
+        "detalle (id)":
+            lambda db: db.execute(select(I).where(I.id == rnd.randint(1, filas))).scalar_one_or_none(),
+        "mis inspecciones (15)":
+            lambda db: db.scalars(
+                select(I).where(I.usuario_id == rnd.randint(1, USUARIOS)).order_by(I.fecha.desc()).limit(15)
+            ).all(),
+        "precarga vehículo":
+            lambda db: db.execute(select(V).where(V.placa == rnd.choice(placas))).scalar_one_or_none(),
+        "panel admin (300)":
+            lambda db: db.execute(
+                select(I.id, I.fecha, I.placa, I.nombre_conductor).order_by(I.fecha.desc()).limit(300)
+            ).all(),
+        "búsqueda placa (prefijo)":
+            lambda db: db.execute(
+                select(I.id).where(busqueda.condicion_placa(rnd.choice(placas)[:4]))
+                .order_by(I.fecha.desc()).limit(300)
+            ).all(),
+    }
+    resultados = {}
+    with Session(engine) as db:
+        for nombre, consulta in casos.items():
+            consulta(db)   # calienta caché de páginas / plan
+            tiempos = []
+            for _ in range(repeticiones):
+                t0 = time.perf_counter()
+                consulta(db)
+                tiempos.append((time.perf_counter() - t0) * 1000)
+                db.expunge_all()
+            db.rollback()
+            resultados[nombre] = _resumen(tiempos)
+    return resultados
+
+
+def _submit(db: Session, rnd: random.Random, placas: list) -> float:
+    uid = rnd.randint(1, USUARIOS)
+    placa = placas[(uid - 1) * 3]
+    t0 = time.perf_counter()
+    db.get(models.Usuario, uid)   # como get_current_user: la transacción empieza leyendo
+    with sqlite_local.escritura(db):
+        inspeccion = I(
+            usuario_id=uid, fecha=datetime.now(), nombre_conductor="Bench", placa=placa,
+            tipo_vehiculo=rnd.choice(TIPOS), proceso="Traslado", marca="Honda", observaciones="",
+            aspectos='{"1": "B"}', placa_norm=placa, conductor_norm="bench",
+        )
+        total = ciclos.siguiente(db, uid)
+        inspeccion.ciclo = ciclos.ciclo_de(total)
+        db.add(inspeccion)
+        estadisticas.registrar_inspeccion(db, inspeccion)
+        vehiculos.registrar(db, inspeccion)
+        db.commit()
+    return (time.perf_counter() - t0) * 1000
+
+
+def escrituras(engine, placas: list, submits: int, hilos: int) -> dict:
+    resultados = {}
+    for n_hilos in sorted({1, hilos}):
+        tiempos, errores = [], []
+        por_hilo = max(submits // n_hilos, 1)
+
+        def trabajar(semilla):
+            rnd = random.Random(semilla)
+            with Session(engine) as db:
+                for _ in range(por_hilo):
+                    try:
+                        tiempos.append(_submit(db, rnd, placas))
+                    except Exception as e:
+                        db.rollback()
+                        errores.append(type(e).__name__)
+
+        t0 = time.perf_counter()
+        trabajadores = [threading.Thread(target=trabajar, args=(s,)) for s in range(n_hilos)]
+        for t in trabajadores:
+            t.start()
+        for t in trabajadores:
+            t.join()
+        duracion = time.perf_counter() - t0
+        resultados[f"submit × {n_hilos} hilo{'s' if n_hilos > 1 else ''}"] = {
+            **(_resumen(tiempos) if tiempos else {"p50": 0.0, "p95": 0.0}),
+            "por_seg": len(tiempos) / duracion,
+            "errores": len(errores),
+        }
+    return resultados
+
+
+def medir(nombre: str, url: str, args) -> dict:
+    print(f"\n▶ {nombre}: {url.split('@')[-1]}")
+    engine = _engine(url, args.hilos)
+    Base.metadata.create_all(bind=engine)
+    placas = poblar(engine, args.filas)
+    if sqlite_local.es_sqlite(url):
+        with engine.connect() as cn:
+            modo = cn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        print(f"   journal_mode={modo} synchronous={sqlite_local.SQLITE_SYNCHRONOUS} "
+              f"cache={sqlite_local.SQLITE_CACHE_MB}MB mmap={sqlite_local.SQLITE_MMAP_MB}MB")
+    datos = {**lecturas(engine, placas, args.filas, args.repeticiones),
+             **escrituras(engine, placas, args.submits, args.hilos)}
+    engine.dispose()
+    return datos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite local vs MySQL")
+    parser.add_argument("--sqlite-url", default=URL_SQLITE, help="BD SQLite de pruebas (defecto: app/data/bench_sqlite.db)")
+    parser.add_argument("--mysql-url", default=None, help="MySQL de pruebas para comparar (opcional)")
+    parser.add_argument("--filas", type=int, default=100_000)
+    parser.add_argument("--repeticiones", type=int, default=500)
+    parser.add_argument("--submits", type=int, default=200)
+    parser.add_argument("--hilos", type=int, default=4)
+    args = parser.parse_args()
+
+    motores = {"SQLite": medir("SQLite", args.sqlite_url, args)}
+    if args.mysql_url:
+        motores["MySQL"] = medir("MySQL", args.mysql_url, args)
+
+    print(f"\n📊 {args.filas} inspecciones · {args.repeticiones} lecturas · {args.submits} submits por caso\n")
+    cabecera = f"{'caso':28}" + "".join(f" {m + ' p50':>12} {'p95':>8} {'/s':>7}" for m in motores)
+    print(cabecera)
+    print("─" * len(cabecera))
+    for caso in next(iter(motores.values())):
+        fila = f"{caso:28}"
+        for datos in motores.values():
+            d = datos[caso]
+            por_seg = f"{d['por_seg']:7.0f}" if "por_seg" in d else f"{'':7}"
+            fila += f" {d['p50']:10.3f}ms {d['p95']:6.2f}ms {por_seg}"
+            if d.get("errores"):
+                fila += f"  ⚠️ {d['errores']} errores"
+        print(fila)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Genera un conjunto de datos sintético a escala (1M+ inspecciones)
+escribiendo directo en la BD con INSERT por lotes, para medir las
+optimizaciones con el tamaño proyectado a varios años.
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.generar_datos                                  # 500 × 2000 = 1M
+    python -m app.scripts.generar_datos --usuarios 50 --por-usuario 300
+    python -m app.scripts.generar_datos --mezcla Moto=50,Carro=35,Camion=15 --defectos 0.12 --anios 5
+    python -m app.scripts.generar_datos --url "mysql+pymysql://u:p@host/escala_db"
+
+Por defecto escribe en una BD SQLite aparte (app/data/bench_datos.db),
+NUNCA en la de producción. Para levantar la app sobre ella:
+    DATABASE_URL=sqlite:///app/data/bench_datos.db uvicorn app.main:app
+Todos los usuarios generados entran con el PIN de --pin (el primero es admin).
+
+Qué genera, coherente con lo que dejaría la app:
+- usuarios (cédulas desde --cedula-base) con 1–2 vehículos cada uno;
+  el tipo de cada vehículo sale de --mezcla
+- --por-usuario inspecciones por usuario repartidas en los últimos
+  --anios (horario 6–18 h), con ids crecientes en fecha como en
+  producción; aspectos completos del tipo, y con probabilidad
+  --defectos de 1 a 3 en "M" con observación
+- columnas derivadas: placa_norm, conductor_norm, ciclo,
+  vencimientos (licencia, SOAT, tecnomecánica)
+- contadores de ciclo, un reporte consolidado por ciclo cerrado
+  (solo la fila: el PDF no se renderiza), registro de vehículos y
+  rollups del dashboard; los backfills quedan marcados como aplicados
+- firmas PNG con trazo a mano alzada (RGBA, ~600×150, tamaño y
+  formato de las del canvas del formulario) en --firmas-dir:
+  --firmas-por-usuario distintas por usuario, repartidas entre sus
+  inspecciones (una por inspección serían ~15 GB con 1M).
+  Con --firmas-dir app/data/firmas la app las encuentra al generar PDFs.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import struct
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+_HERE = Path(__file__).resolve().parent.parent  # app/
+URL_DEFECTO    = f"sqlite:///{_HERE / 'data' / 'bench_datos.db'}"
+FIRMAS_DEFECTO = _HERE / "data" / "firmas_generadas"
+
+# Sin caché compartida: el generador no debe escribir en la de la app
+os.environ["CACHE_BACKEND"] = "ninguno"
+# app.database exige una BD configurada al importarse; el generador
+# usa su propio engine (--url), así que basta sin el .env de producción
+os.environ.setdefault("DATABASE_URL", URL_DEFECTO)
+
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import Base  # noqa: E402
+from app import models, busqueda, ciclos, estadisticas, migraciones, sqlite_local  # noqa: E402
+from app import reportes, vehiculos, vencimientos  # noqa: E402,F401  (registran sus backfills)
+from app.migraciones import asegurar_esquema  # noqa: E402
+from app.security import hash_pin  # noqa: E402
+
+# Cantidad de aspectos del formulario por tipo (ASPECTOS_POR_TIPO en app/routes/inspecciones.py)
+N_ASPECTOS = {"Moto": 18, "Carro": 22, "Camion": 50}
+MEZCLA_DEFECTO = "Moto=60,Carro=30,Camion=10"
+
+NOMBRES   = ["Juan", "Carlos", "Andrés", "Luis", "Jorge", "María", "Ana", "Sofía", "José", "Diego",
+             "Camila", "Valentina", "Santiago", "Felipe", "Daniela", "Manuela", "Sebastián", "Laura"]
+APELLIDOS = ["Pérez", "Gómez", "Rodríguez", "López", "Martínez", "García", "Ramírez", "Díaz", "Muñoz",
+             "Rojas", "Zapata", "Restrepo", "Osorio", "Henao", "Cardona", "Giraldo", "Ospina", "Vélez"]
+MARCAS    = {"Moto": ["Yamaha", "Honda", "Suzuki", "AKT", "Bajaj"],
+             "Carro": ["Chevrolet", "Renault", "Mazda", "Toyota", "Kia"],
+             "Camion": ["Hino", "Chevrolet", "Foton", "JAC", "International"]}
+PROCESOS  = ["Traslado", "Mandado", "Actividad misional"]
+LUGARES   = ["La Esperanza", "La Planta", "La Fe", "Municipio", "Granja 1", "Granja 2", "Incubadora"]
+GASOLINA  = ["1/4", "1/2", "3/4", "Lleno"]
+OBSERVACIONES_MALO = [
+    "Freno trasero con desgaste, se reporta a mantenimiento",
+    "Luz de stop no enciende",
+    "Llanta delantera baja de presión",
+    "Fuga leve de aceite",
+    "Espejo retrovisor flojo",
+]
+
+
+# ══════════════════════════════════════════════════════════════
+#  FIRMAS PNG
+# ══════════════════════════════════════════════════════════════
+
+def _png(ancho: int, alto: int, rgba: bytearray) -> bytes:
+    def bloque(tipo: bytes, datos: bytes) -> bytes:
+        return struct.pack(">I", len(datos)) + tipo + datos + struct.pack(">I", zlib.crc32(tipo + datos))
+
+    fila = ancho * 4
+    crudo = b"".join(b"\x00" + bytes(rgba[y * fila:(y + 1) * fila]) for y in range(alto))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + bloque(b"IHDR", struct.pack(">IIBBBBB", ancho, alto, 8, 6, 0, 0, 0))
+        + bloque(b"IDAT", zlib.compress(crudo, 6))
+        + bloque(b"IEND", b"")
+    )
+
+
+def firma_png(rnd: random.Random, ancho: int = 600, alto: int = 150) -> bytes:
+    """Trazo continuo tipo firma (suma de senos + deriva), tinta azul oscura sobre fondo transparente."""
+    rgba = bytearray(ancho * alto * 4)
+    tinta = (20, 30, 90)
+    ondas = [(rnd.uniform(0.01, 0.08), rnd.uniform(0, math.tau), rnd.uniform(8, 35)) for _ in range(3)]
+    radio = rnd.choice((1, 2, 2, 3))
+    x0, x1 = rnd.randint(20, 80), ancho - rnd.randint(20, 120)
+    for paso in range((x1 - x0) * 3):
+        t = paso / 3
+        x = x0 + t + 12 * math.sin(t * 0.2)
+        y = alto / 2 + sum(a * math.sin(f * t + fase) for f, fase, a in ondas)
+        for dy in range(-radio, radio + 1):
+            for dx in range(-radio, radio + 1):
+                px, py = int(x) + dx, int(y) + dy
+                if 0 <= px < ancho and 0 <= py < alto and dx * dx + dy * dy <= radio * radio:
+                    i = (py * ancho + px) * 4
+                    rgba[i:i + 4] = bytes((*tinta, 255))
+    return _png(ancho, alto, rgba)
+
+
+# ══════════════════════════════════════════════════════════════
+#  GENERACIÓN
+# ══════════════════════════════════════════════════════════════
+
+def _mezcla(texto: str) -> tuple:
+    pesos = {}
+    for parte in texto.split(","):
+        tipo, _, peso = parte.partition("=")
+        tipo = tipo.strip().capitalize()
+        if tipo not in N_ASPECTOS:
+            raise SystemExit(f"❌ Tipo desconocido en --mezcla: {tipo!r} (use {', '.join(N_ASPECTOS)})")
+        pesos[tipo] = float(peso)
+    return tuple(pesos), tuple(pesos.values())
+
+
+def _placa(rnd: random.Random, tipo: str) -> str:
+    letras = "".join(rnd.choices("ABCDEFGHIJKLMNOPRSTUVWXYZ", k=3))
+    if tipo == "Moto":
+        return f"{letras}{rnd.randint(10, 99)}{rnd.choice('ABCDEFGHJKLMNPRSTUVWXYZ')}"
+    return f"{letras}{rnd.randint(100, 999)}"
+
+
+def _usuarios(db: Session, args, rnd: random.Random, tipos, pesos) -> list:
+    pin_hash = hash_pin(args.pin)   # un solo bcrypt: todos comparten PIN
+    hoy = date.today()
+    usuarios = []
+    for i in range(args.usuarios):
+        nombre = f"{rnd.choice(NOMBRES)} {rnd.choice(APELLIDOS)} {rnd.choice(APELLIDOS)}"
+        vehiculos_u = []
+        for _ in range(rnd.choice((1, 1, 1, 2))):
+            tipo = rnd.choices(tipos, pesos)[0]
+            vehiculos_u.append({
+                "placa": _placa(rnd, tipo), "tipo_vehiculo": tipo, "marca": rnd.choice(MARCAS[tipo]),
+                "modelo": str(rnd.randint(2012, 2025)), "motor": str(rnd.choice((110, 125, 150, 1600, 2000, 4000))),
+                "linea": rnd.choice(("Estándar", "Sport", "Cargo", "LX")),
+                "porte_propiedad": str(rnd.randint(10**7, 10**8)), "soat": str(rnd.randint(10**7, 10**8)),
+                "certificado_emision": str(rnd.randint(10**5, 10**6)), "poliza_seguro": str(rnd.randint(10**6, 10**7)),
+                "soat_venc": hoy + timedelta(days=rnd.randint(-30, 365)),
+                "tecnomecanica_venc": hoy + timedelta(days=rnd.randint(-30, 365)),
+            })
+        usuarios.append({
+            "id": None,
+            "cedula": str(args.cedula_base + i),
+            "nombre": nombre,
+            "conductor_norm": busqueda.normalizar_nombre(nombre),
+            "licencia_num": str(rnd.randint(10**7, 10**9)),
+            "licencia_venc": hoy + timedelta(days=rnd.randint(-15, 3 * 365)),
+            "vehiculos": vehiculos_u,
+            "firmas": [],
+        })
+
+    db.execute(insert(models.Usuario), [
+        {"cedula": u["cedula"], "nombre_visible": u["nombre"], "rol": "admin" if n == 0 else "user",
+         "pin_hash": pin_hash, "activo": 1}
+        for n, u in enumerate(usuarios)
+    ])
+    db.commit()
+    ids = dict(db.execute(
+        select(models.Usuario.cedula, models.Usuario.id)
+        .where(models.Usuario.cedula.in_([u["cedula"] for u in usuarios]))
+    ).all())
+    for u in usuarios:
+        u["id"] = ids[u["cedula"]]
+    return usuarios
+
+
+def _firmas(usuarios: list, args, rnd: random.Random):
+    if args.firmas_por_usuario < 1:
+        return
+    t0 = time.perf_counter()
+    for u in usuarios:
+        carpeta = args.firmas_dir / "usuarios" / str(u["id"])
+        carpeta.mkdir(parents=True, exist_ok=True)
+        for k in range(args.firmas_por_usuario):
+            nombre = f"firma_gen_{u['id']}_{k}.png"
+            (carpeta / nombre).write_bytes(firma_png(rnd))
+            u["firmas"].append(nombre)
+    n = len(usuarios) * args.firmas_por_usuario
+    print(f"   ✍️  {n} firmas en {args.firmas_dir} ({time.perf_counter() - t0:.1f}s)")
+
+
+def _inspeccion(u: dict, k: int, fecha: datetime, args, rnd: random.Random) -> dict:
+    v = u["vehiculos"][k % len(u["vehiculos"])]
+    n = N_ASPECTOS[v["tipo_vehiculo"]]
+    aspectos = {str(i): "B" for i in range(1, n + 1)}
+    malo = rnd.random() < args.defectos
+    if malo:
+        for i in rnd.sample(range(1, n + 1), rnd.randint(1, 3)):
+            aspectos[str(i)] = "M"
+    desde, hasta = rnd.sample(LUGARES, 2)
+    return {
+        "usuario_id": u["id"], "fecha": fecha, "nombre_conductor": u["nombre"],
+        "placa": v["placa"], "proceso": rnd.choice(PROCESOS), "desde": desde, "hasta": hasta,
+        "marca": v["marca"], "gasolina": rnd.choice(GASOLINA), "modelo": v["modelo"], "motor": v["motor"],
+        "tipo_vehiculo": v["tipo_vehiculo"], "linea": v["linea"],
+        "licencia_num": u["licencia_num"], "licencia_venc": u["licencia_venc"].isoformat(),
+        "licencia_venc_fecha": u["licencia_venc"],
+        "porte_propiedad": v["porte_propiedad"], "soat": v["soat"], "soat_venc": v["soat_venc"],
+        "certificado_emision": v["certificado_emision"], "tecnomecanica_venc": v["tecnomecanica_venc"],
+        "poliza_seguro": v["poliza_seguro"],
+        "aspectos": json.dumps(aspectos), "observaciones": rnd.choice(OBSERVACIONES_MALO) if malo else "",
+        "condiciones_optimas": "NO" if malo else "SI",
+        "firma_file": u["firmas"][k % len(u["firmas"])] if u["firmas"] else None,
+        "placa_norm": busqueda.normalizar_placa(v["placa"]), "conductor_norm": u["conductor_norm"],
+        "ciclo": ciclos.ciclo_de(k + 1),
+    }
+
+
+def _inspecciones(db: Session, usuarios: list, args, rnd: random.Random) -> int:
+    """
+    Ronda k = k-ésima inspección de cada usuario, dentro de la ventana
+    [inicio + k·paso, inicio + (k+1)·paso): las rondas no se solapan,
+    así que ordenando cada ronda por fecha los ids crecen con la fecha
+    sin tener el millón de filas en memoria.
+    """
+    fin = datetime.now().replace(microsecond=0)
+    inicio = fin - timedelta(days=int(365 * args.anios))
+    paso = (fin - inicio).total_seconds() / args.por_usuario
+    total = args.usuarios * args.por_usuario
+    lote, escritas, t0 = [], 0, time.perf_counter()
+
+    for k in range(args.por_usuario):
+        ronda = []
+        for u in usuarios:
+            while True:
+                fecha = inicio + timedelta(seconds=int((k + rnd.random()) * paso))
+                # Ventanas de un día o más: solo horario laboral (6–18 h)
+                if paso < 86400 or 6 <= fecha.hour < 18:
+                    break
+            ronda.append((fecha, u))
+        ronda.sort(key=lambda t: t[0])
+        for fecha, u in ronda:
+            lote.append(_inspeccion(u, k, fecha, args, rnd))
+            if len(lote) >= args.lote:
+                db.execute(insert(models.Inspeccion), lote)
+                db.commit()
+                escritas += len(lote)
+                lote = []
+                ritmo = escritas / (time.perf_counter() - t0)
+                print(f"   … {escritas}/{total} inspecciones · {ritmo:.0f} filas/s "
+                      f"· faltan ~{(total - escritas) / ritmo:.0f}s", flush=True)
+    if lote:
+        db.execute(insert(models.Inspeccion), lote)
+        db.commit()
+        escritas += len(lote)
+    print(f"   📝 {escritas} inspecciones en {time.perf_counter() - t0:.1f}s")
+    return escritas
+
+
+def _derivados(db: Session, usuarios: list, args):
+    ahora = datetime.now()
+    n = args.por_usuario
+    db.execute(insert(models.ContadorUsuario), [
+        {"usuario_id": u["id"], "total": n, "version": n + n // ciclos.TAMANO_CICLO, "actualizado": ahora}
+        for u in usuarios
+    ])
+
+    # Un reporte por ciclo cerrado, con la fecha de su inspección número 15
+    I = models.Inspeccion
+    cierres = db.execute(
+        select(I.usuario_id, I.ciclo, func.max(I.fecha))
+        .where(I.usuario_id.in_([u["id"] for u in usuarios]))
+        .group_by(I.usuario_id, I.ciclo)
+    ).all()
+    nombres = {u["id"]: u["nombre"] for u in usuarios}
+    completos = n // ciclos.TAMANO_CICLO
+    filas = [
+        {"usuario_id": uid, "ciclo": ciclo, "fecha_reporte": fecha, "nombre_conductor": nombres[uid],
+         "total_incluidas": ciclos.TAMANO_CICLO, "version_plantilla": reportes.VERSION_PLANTILLA,
+         "archivo_pdf": f"reporte15_{uid}_{fecha:%Y%m%d_%H%M}.pdf"}
+        for uid, ciclo, fecha in cierres if ciclo <= completos
+    ]
+    for i in range(0, len(filas), args.lote):
+        db.execute(insert(models.ReporteInspeccion), filas[i:i + args.lote])
+
+    # Registro de vehículos: datos fijos por placa, último uso = última ronda
+    ultima = db.execute(
+        select(I.placa_norm, func.count(), func.max(I.fecha))
+        .where(I.usuario_id.in_([u["id"] for u in usuarios]))
+        .group_by(I.placa_norm)
+    ).all()
+    por_placa = {busqueda.normalizar_placa(v["placa"]): (u["id"], v) for u in usuarios for v in u["vehiculos"]}
+    db.execute(insert(models.Vehiculo), [
+        {**{c: por_placa[placa][1][c] for c in vehiculos.CAMPOS + vehiculos.FECHAS},
+         "placa": placa, "inspecciones": cuenta, "ultima_inspeccion": fecha,
+         "ultimo_usuario_id": por_placa[placa][0], "actualizado": ahora}
+        for placa, cuenta, fecha in ultima if placa in por_placa
+    ])
+    db.commit()
+    print(f"   📄 {len(filas)} reportes consolidados · 🚗 {len(ultima)} vehículos")
+
+    resumen = estadisticas.reconstruir(db)
+    print(f"   📊 rollups: {resumen['stats_diarias']} diarios · {resumen['stats_mensuales']} mensuales")
+
+    # Los datos ya salen con sus columnas derivadas: nada que migrar
+    pendientes = migraciones.pendientes(db)
+    if pendientes:
+        db.execute(insert(models.MigracionAplicada), [
+            {"nombre": nombre, "aplicada": ahora, "filas": 0} for nombre in pendientes
+        ])
+        db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Datos sintéticos a escala (inserción directa por lotes)")
+    parser.add_argument("--url", default=URL_DEFECTO, help="BD destino (defecto: SQLite aparte)")
+    parser.add_argument("--usuarios", type=int, default=500)
+    parser.add_argument("--por-usuario", type=int, default=2000, help="inspecciones por usuario")
+    parser.add_argument("--mezcla", default=MEZCLA_DEFECTO, help=f"pesos por tipo (defecto {MEZCLA_DEFECTO})")
+    parser.add_argument("--defectos", type=float, default=0.08, help="probabilidad de inspección con aspectos en M")
+    parser.add_argument("--anios", type=float, default=3, help="años hacia atrás que cubren las fechas")
+    parser.add_argument("--firmas-por-usuario", type=int, default=3, help="0 = sin firmas")
+    parser.add_argument("--firmas-dir", type=Path, default=FIRMAS_DEFECTO)
+    parser.add_argument("--cedula-base", type=int, default=90_000_000)
+    parser.add_argument("--pin", default="482915", help="PIN de todos los usuarios generados")
+    parser.add_argument("--lote", type=int, default=5000)
+    parser.add_argument("--semilla", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.usuarios < 1 or args.por_usuario < 1 or args.lote < 1:
+        raise SystemExit("❌ --usuarios, --por-usuario y --lote deben ser al menos 1")
+    if not 0 <= args.defectos <= 1:
+        raise SystemExit("❌ --defectos es una probabilidad entre 0 y 1")
+    tipos, pesos = _mezcla(args.mezcla)
+    rnd = random.Random(args.semilla)
+
+    opciones = {}
+    if sqlite_local.es_sqlite(args.url):
+        opciones.update(sqlite_local.opciones_engine())
+    engine = create_engine(args.url, **opciones)
+    if sqlite_local.es_sqlite(args.url):
+        sqlite_local.instalar(engine)
+    Base.metadata.create_all(bind=engine)
+    asegurar_esquema(engine)
+
+    with Session(engine) as db:
+        ya = db.scalar(select(func.count()).select_from(models.Usuario).where(
+            models.Usuario.cedula.in_([str(args.cedula_base + i) for i in range(min(args.usuarios, 1000))])
+        ))
+        if ya:
+            raise SystemExit(f"❌ Ya hay usuarios generados desde la cédula {args.cedula_base}: "
+                             f"usa otra BD o --cedula-base")
+
+        total = args.usuarios * args.por_usuario
+        print(f"🔧 Generando {args.usuarios} usuarios × {args.por_usuario} = {total} inspecciones "
+              f"en {args.url.split('@')[-1]}")
+        t0 = time.perf_counter()
+        usuarios = _usuarios(db, args, rnd, tipos, pesos)
+        _firmas(usuarios, args, rnd)
+        _inspecciones(db, usuarios, args, rnd)
+        _derivados(db, usuarios, args)
+        print(f"✅ Listo en {time.perf_counter() - t0:.0f}s · usuarios {args.cedula_base}… "
+              f"(el primero es admin) · PIN {args.pin}")
+
+
+if __name__ == "__main__":
+    main()
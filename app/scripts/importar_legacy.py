@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Importa el histórico anterior a la BD (app/data/inspecciones.json +
+firmas de app/data/_backup_legacy/) a `inspecciones` (ver
+app/importacion.py).
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.importar_legacy                        # rutas por defecto
+    python -m app.scripts.importar_legacy --json otro.json --lote 5000
+    python -m app.scripts.importar_legacy --cedula-defecto 1000001   # filas sin conductor reconocible
+    python -m app.scripts.importar_legacy --dry-run              # solo cuenta
+
+Requiere las migraciones de datos al día (python -m app.scripts.migrar):
+si no, ciclos_v1 numeraría después también las importadas. En una BD
+vacía no hay nada que migrar y se importa directamente.
+
+Idempotente: se puede relanzar (tras un corte o con un JSON
+ampliado) sin duplicar filas. Al terminar recalcula las
+estadísticas del dashboard y el registro de vehículos
+(--sin-recalcular para omitirlo si se importan varios archivos
+seguidos; luego correr reconstruir_estadisticas).
+"""
+
+import argparse
+from pathlib import Path
+
+from app.database import Base, SessionLocal, engine
+from app import models  # noqa: F401  (registra las tablas en Base)
+from app import cache, estadisticas, importacion, vehiculos
+from app import migraciones
+from app.migraciones import asegurar_esquema
+from app.routes.inspecciones import BASE_FIRMAS_DIR
+
+_HERE = Path(__file__).resolve().parent.parent  # app/
+JSON_DEFECTO   = _HERE / "data" / "inspecciones.json"
+LEGACY_DEFECTO = _HERE / "data" / "_backup_legacy"
+
+
+def _progreso(r: dict):
+    print(
+        f"   … {r['leidas']} leídas · {r['insertadas']} nuevas · {r['duplicadas']} ya estaban"
+        f" · {r['filas_por_seg']:.0f} filas/s",
+        flush=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importación del histórico JSON anterior a la BD")
+    parser.add_argument("--json", type=Path, default=JSON_DEFECTO)
+    parser.add_argument("--legacy-dir", type=Path, default=LEGACY_DEFECTO, help="carpeta con las firmas antiguas")
+    parser.add_argument("--lote", type=int, default=importacion.LOTE_IMPORTACION)
+    parser.add_argument("--cedula-defecto", default=None, help="usuario para filas sin conductor reconocible")
+    parser.add_argument("--sin-recalcular", action="store_true", help="no reconstruir estadísticas ni vehículos")
+    parser.add_argument("--dry-run", action="store_true", help="no escribe filas ni firmas")
+    args = parser.parse_args()
+
+    if args.lote < 1:
+        raise SystemExit("❌ --lote debe ser al menos 1")
+    if not args.json.exists():
+        raise SystemExit(f"❌ No existe {args.json}")
+    if args.json.stat().st_size == 0:
+        print(f"ℹ️  {args.json} está vacío: nada que importar")
+        return
+
+    Base.metadata.create_all(bind=engine)
+    asegurar_esquema(engine)
+
+    db = SessionLocal()
+    try:
+        if not args.dry_run:
+            migraciones.marcar_sin_datos(db)
+        faltan = migraciones.pendientes(db)
+        if faltan and not args.dry_run:
+            raise SystemExit(f"❌ Migraciones de datos pendientes ({', '.join(faltan)}): "
+                             "ejecutar antes python -m app.scripts.migrar")
+        print(f"📥 Importando {args.json} (lotes de {args.lote}){' — DRY RUN' if args.dry_run else ''}...")
+        r = importacion.importar(
+            db, args.json, args.legacy_dir, BASE_FIRMAS_DIR,
+            lote=args.lote, cedula_defecto=args.cedula_defecto,
+            dry_run=args.dry_run, progreso=_progreso,
+        )
+        print(f"✅ {r['insertadas']} inspecciones importadas en {r['segundos']}s "
+              f"({r['filas_por_seg']} filas leídas/s)")
+        print(f"   ya estaban:   {r['duplicadas']}")
+        print(f"   sin fecha:    {r['sin_fecha']} (descartadas)")
+        print(f"   sin usuario:  {r['sin_usuario']} (importadas sin conductor; ver --cedula-defecto)")
+        print(f"   firmas:       {r['firmas_enlazadas']} enlazadas · {r['firmas_sin_enlazar']} sin enlazar (archivo no encontrado o sin conductor)")
+
+        if r["insertadas"] and not args.dry_run and not args.sin_recalcular:
+            print("🔄 Recalculando estadísticas y registro de vehículos...")
+            estadisticas.reconstruir(db)
+            vehiculos.backfill_vehiculos(db)
+            cache.invalidar_inspecciones()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error importando: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
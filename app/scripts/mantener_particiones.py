@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Mantenimiento de las particiones por fecha de `inspecciones`
+(MySQL con PARTICIONES_INSPECCIONES = mes | anio; ver
+app/particiones.py).
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.mantener_particiones                 # crea las futuras
+    python -m app.scripts.mantener_particiones --estado        # solo muestra
+    python -m app.scripts.mantener_particiones --futuras 6
+    python -m app.scripts.mantener_particiones --retirar-antes 2023-01 --dry-run
+    python -m app.scripts.mantener_particiones --retirar-antes 2023-01 --modo borrar
+
+Programarlo mensual (cron): mantiene PARTICIONES_FUTURAS periodos
+creados por delante para que las inspecciones nuevas no caigan en
+p_futuro. Si la tabla aún no está particionada y la variable está
+activa, la particiona (igual que migrar).
+
+--retirar-antes AAAA-MM saca las particiones enteras anteriores a
+ese mes: --modo intercambio (defecto) las deja en tablas sueltas
+inspecciones_pAAAAMM; --modo borrar las elimina. Esas filas dejan
+de verse en la app y ya no se cuentan en los rollups: se pide
+confirmación salvo con --si.
+"""
+
+import argparse
+from datetime import datetime
+
+from app.database import Base, engine
+from app import models  # noqa: F401  (registra las tablas en Base)
+from app import particiones
+from app.migraciones import asegurar_esquema
+
+
+def _mostrar_estado():
+    e = particiones.estado(engine)
+    if not e["particionada"]:
+        print(f"ℹ️  {particiones.TABLA} sin particionar"
+              + (f" ({e['motivo']})" if e.get("motivo") else ""))
+        return
+    print(f"🧱 {particiones.TABLA}: {e['particiones']} particiones por {e['granularidad']} "
+          f"· desde {e['primera']} · hasta {e['hasta'][:10]} · {e['filas_en_p_futuro']} filas en p_futuro")
+    with engine.connect() as conn:
+        for p in particiones.particiones(conn):
+            hasta = p["hasta"].strftime("%Y-%m-%d") if p["hasta"] else "MAXVALUE"
+            print(f"   {p['nombre']:10} < {hasta:10}  ~{p['filas']} filas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de particiones de inspecciones")
+    parser.add_argument("--estado", action="store_true", help="solo muestra las particiones")
+    parser.add_argument("--futuras", type=int, default=particiones.PARTICIONES_FUTURAS,
+                        help=f"periodos por delante (defecto {particiones.PARTICIONES_FUTURAS})")
+    parser.add_argument("--retirar-antes", default=None, metavar="AAAA-MM",
+                        help="retira las particiones anteriores a ese mes")
+    parser.add_argument("--modo", choices=("intercambio", "borrar"), default="intercambio")
+    parser.add_argument("--dry-run", action="store_true", help="solo muestra lo que se retiraría")
+    parser.add_argument("--si", action="store_true", help="no pedir confirmación al retirar")
+    args = parser.parse_args()
+
+    if not particiones.soportado(engine):
+        print(f"ℹ️  Particionado solo disponible en MySQL (motor actual: {engine.dialect.name}): nada que hacer")
+        return
+    if args.estado:
+        _mostrar_estado()
+        return
+    if args.futuras < 1:
+        raise SystemExit("❌ --futuras debe ser al menos 1")
+
+    Base.metadata.create_all(bind=engine)
+    asegurar_esquema(engine)
+
+    try:
+        if particiones.GRANULARIDAD:
+            r = particiones.particionar(engine, particiones.GRANULARIDAD, args.futuras)
+            if r["particionada"]:
+                print(f"🧱 {particiones.TABLA} particionada por {r['granularidad']} ({r['particiones']} particiones)")
+        nuevas = particiones.agregar_futuras(engine, args.futuras)
+        print(f"➕ Particiones nuevas: {', '.join(nuevas)}" if nuevas else "✅ Particiones futuras al día")
+
+        if args.retirar_antes:
+            try:
+                corte = datetime.strptime(args.retirar_antes, "%Y-%m")
+            except ValueError:
+                raise SystemExit("❌ --retirar-antes debe ser AAAA-MM")
+            candidatas = particiones.retirables(engine, corte)
+            if not candidatas:
+                print(f"✅ Ninguna partición completa anterior a {corte:%Y-%m}")
+                return
+            for p in candidatas:
+                print(f"   {p['nombre']}: ~{p['filas']} filas")
+            if args.dry_run:
+                print(f"ℹ️  {len(candidatas)} particiones se retirarían ({args.modo})")
+                return
+            if not args.si and input(f"¿Retirar {len(candidatas)} particiones ({args.modo})? [s/N] ").strip().lower() != "s":
+                print("Cancelado")
+                return
+            for nombre, filas, destino in particiones.retirar(engine, corte, args.modo):
+                print(f"📦 {nombre}: ~{filas} filas → {destino or 'borrada'}")
+    except Exception as e:
+        print(f"❌ Error manteniendo particiones: {e}")
+        raise
+
+    _mostrar_estado()
+
+
+if __name__ == "__main__":
+    main()
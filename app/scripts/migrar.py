@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Pone la base de datos al día con models.py.
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.migrar            # esquema + backfills pendientes
+    python -m app.scripts.migrar --estado   # solo lista lo pendiente
+
+Pasos:
+1. create_all()        → tablas nuevas
+2. asegurar_esquema()  → columnas e índices nuevos en tablas existentes
+                         y ON DELETE de las FK (MySQL)
+3. particiones         → si PARTICIONES_INSPECCIONES está activo (MySQL):
+                         particiona `inspecciones` la primera vez y
+                         crea las particiones futuras (app/particiones.py)
+4. backfills           → migraciones de datos registradas con
+                         @migraciones.backfill(...) que aún no corrieron
+
+Ejecutarlo tras cada despliegue que agregue columnas. Es idempotente.
+"""
+
+import sys
+
+from app.database import Base, SessionLocal, engine
+from app import models  # noqa: F401  (registra las tablas en Base)
+from app import migraciones, particiones
+from app import busqueda  # noqa: F401  (registra sus backfills)
+from app import reportes  # noqa: F401  (registra sus backfills)
+from app import ciclos  # noqa: F401  (registra sus backfills)
+from app import vehiculos  # noqa: F401  (registra sus backfills)
+from app import vencimientos  # noqa: F401  (registra sus backfills)
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    resumen = migraciones.asegurar_esquema(engine)
+    for col in resumen["columnas"]:
+        print(f"➕ Columna: {col}")
+    for idx in resumen["indices"]:
+        print(f"➕ Índice:  {idx}")
+    for fk in resumen["claves_foraneas"]:
+        print(f"🔗 ON DELETE: {fk}")
+    if "--estado" not in sys.argv:
+        part = particiones.asegurar(engine)
+        if part.get("particionada"):
+            print(f"🧱 {particiones.TABLA} particionada por {part['granularidad']} ({part['particiones']} particiones)")
+        if part.get("nuevas"):
+            print(f"➕ Particiones: {', '.join(part['nuevas'])}")
+
+    db = SessionLocal()
+    try:
+        pendientes = migraciones.pendientes(db)
+        if not pendientes:
+            print("✅ Sin migraciones de datos pendientes")
+            return
+        if "--estado" in sys.argv:
+            print("⏳ Pendientes: " + ", ".join(pendientes))
+            return
+
+        for nombre, filas in migraciones.ejecutar_backfills(db).items():
+            print(f"✅ {nombre}: {filas} filas")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error migrando: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Precalcula la lista de documentos próximos a vencer (licencias,
+SOAT y revisión tecnomecánica) en la tabla alertas_vencimiento
+(ver app/vencimientos.py).
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.precalcular_vencimientos              # VENCIMIENTOS_DIAS (30)
+    python -m app.scripts.precalcular_vencimientos --dias 60
+    python -m app.scripts.precalcular_vencimientos --dry-run    # solo muestra la lista
+
+Programarlo cada noche (cron), p. ej. a las 00:15:
+    15 0 * * *  cd /ruta/proyecto && python -m app.scripts.precalcular_vencimientos
+
+GET /api/admin/vencimientos usa esta lista mientras sea del día;
+si no se corrió hoy, o se pide una ventana mayor que la precalculada,
+calcula en vivo.
+"""
+
+import argparse
+
+from app.database import Base, SessionLocal, engine
+from app import models  # noqa: F401  (registra las tablas en Base)
+from app import vencimientos
+from app.migraciones import asegurar_esquema
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precálculo de vencimientos de documentos")
+    parser.add_argument("--dias", type=int, default=vencimientos.VENCIMIENTOS_DIAS,
+                        help=f"ventana en días (defecto {vencimientos.VENCIMIENTOS_DIAS})")
+    parser.add_argument("--dry-run", action="store_true", help="solo muestra la lista, no la guarda")
+    args = parser.parse_args()
+
+    if args.dias < 1:
+        raise SystemExit("❌ --dias debe ser al menos 1")
+
+    Base.metadata.create_all(bind=engine)
+    asegurar_esquema(engine)
+
+    db = SessionLocal()
+    try:
+        if args.dry_run:
+            alertas = vencimientos.calcular(db, args.dias)
+            for a in alertas:
+                print(f"   {a['vence']:%Y-%m-%d}  {a['documento']:<14} {a['placa'] or '':<8} {a['titular'] or ''}")
+            print(f"🔎 {len(alertas)} documentos vencen en los próximos {args.dias} días")
+            return
+
+        n = vencimientos.precalcular(db, args.dias)
+        print(f"✅ {n} alertas de vencimiento guardadas (próximos {args.dias} días)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error precalculando vencimientos: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
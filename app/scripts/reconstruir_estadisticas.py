@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Reconstruye las tablas de estadísticas del dashboard (stats_*)
+a partir de la tabla `inspecciones`.
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.reconstruir_estadisticas
+
+Cuándo ejecutarlo:
+- Una vez, al desplegar los rollups sobre una BD con historial.
+- Tras correcciones manuales de datos en `inspecciones`.
+
+En operación normal NO hace falta: cada submit actualiza los
+contadores en la misma transacción.
+"""
+
+from app.database import Base, SessionLocal, engine
+from app import models  # noqa: F401  (registra las tablas en Base)
+from app import estadisticas
+from app.migraciones import asegurar_esquema
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    asegurar_esquema(engine)
+
+    db = SessionLocal()
+    try:
+        print("🔄 Reconstruyendo estadísticas...")
+        resumen = estadisticas.reconstruir(db)
+        print(f"✅ {resumen['inspecciones']} inspecciones procesadas")
+        print(f"   stats_diarias:   {resumen['stats_diarias']} filas")
+        print(f"   stats_mensuales: {resumen['stats_mensuales']} filas")
+        print(f"   stats_usuarios:  {resumen['stats_usuarios']} filas")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error reconstruyendo estadísticas: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Retención de logs de auditoría: saca de `logs_auditoria` los meses
+más antiguos que el periodo de retención.
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.retener_logs                     # archivo, 12 meses
+    python -m app.scripts.retener_logs --dry-run           # solo cuenta
+    python -m app.scripts.retener_logs --meses 6 --modo tabla
+    python -m app.scripts.retener_logs --modo borrar
+
+Modos (--modo, o LOGS_RETENCION_MODO):
+    archivo → app/data/archivo_logs/logs_auditoria_AAAAMM.jsonl.gz
+              (una línea JSON por log, comprimido)
+    tabla   → tabla mensual logs_auditoria_AAAAMM en la misma BD,
+              mismas columnas; consultable con SQL
+    borrar  → se eliminan sin copia
+
+Se procesan meses COMPLETOS anteriores al corte (primer día del
+mes actual menos --meses). Cada lote de ids se copia y se borra en
+la misma transacción: si el proceso se corta, se relanza sin perder
+filas (en modo archivo, como mucho un lote queda repetido en el .gz).
+
+Programarlo mensual (cron) tras el cierre de mes. La tabla viva
+queda acotada a ~N meses y /admin/logs pagina siempre sobre ella.
+"""
+
+import argparse
+import gzip
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import Column, MetaData, Table, delete, func, insert, inspect, select
+
+from app.database import Base, SessionLocal, engine
+from app import models
+from app.migraciones import asegurar_esquema
+
+_HERE = Path(__file__).resolve().parent.parent  # app/
+DIR_ARCHIVO = _HERE / "data" / "archivo_logs"
+
+MESES_DEFECTO = int(os.getenv("LOGS_RETENCION_MESES", "12"))
+MODO_DEFECTO  = os.getenv("LOGS_RETENCION_MODO", "archivo")
+LOTE          = 5000
+
+_L = models.LogAuditoria
+
+
+def _sumar_meses(fecha: datetime, meses: int) -> datetime:
+    total = fecha.year * 12 + (fecha.month - 1) + meses
+    return datetime(total // 12, total % 12 + 1, 1)
+
+
+def _meses_a_procesar(db, corte: datetime) -> list:
+    """[(inicio, fin), ...] de cada mes con logs anteriores al corte."""
+    primera = db.scalar(select(func.min(_L.fecha)).where(_L.fecha < corte))
+    if primera is None:
+        return []
+    meses = []
+    inicio = datetime(primera.year, primera.month, 1)
+    while inicio < corte:
+        fin = _sumar_meses(inicio, 1)
+        meses.append((inicio, fin))
+        inicio = fin
+    return meses
+
+
+def _tabla_mensual(inicio: datetime) -> Table:
+    """logs_auditoria_AAAAMM con las columnas de logs_auditoria (sin FK: el usuario puede ya no existir)."""
+    nombre = f"logs_auditoria_{inicio:%Y%m}"
+    tabla = Table(
+        nombre, MetaData(),
+        *[Column(c.name, c.type, primary_key=c.primary_key) for c in _L.__table__.columns],
+    )
+    if not inspect(engine).has_table(nombre):
+        tabla.create(bind=engine)
+    return tabla
+
+
+def _escribir_archivo(ruta: Path, filas: list):
+    # gzip en modo "ab" agrega un miembro nuevo; zcat/gzip.open leen todos seguidos
+    with gzip.open(ruta, "at", encoding="utf-8") as f:
+        for fila in filas:
+            registro = dict(fila._mapping)
+            registro["fecha"] = registro["fecha"].isoformat() if registro["fecha"] else None
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def procesar_mes(db, inicio: datetime, fin: datetime, modo: str) -> int:
+    """Copia (según el modo) y borra los logs del mes, por lotes de id."""
+    destino = None
+    if modo == "tabla":
+        destino = _tabla_mensual(inicio)
+    elif modo == "archivo":
+        DIR_ARCHIVO.mkdir(parents=True, exist_ok=True)
+        destino = DIR_ARCHIVO / f"logs_auditoria_{inicio:%Y%m}.jsonl.gz"
+
+    del_mes = (_L.fecha >= inicio, _L.fecha < fin)
+    total = 0
+    while True:
+        filas = db.execute(
+            select(*_L.__table__.columns).where(*del_mes).order_by(_L.id).limit(LOTE)
+        ).all()
+        if not filas:
+            return total
+        ids = [f.id for f in filas]
+
+        try:
+            if modo == "tabla":
+                db.execute(insert(destino), [dict(f._mapping) for f in filas])
+            elif modo == "archivo":
+                _escribir_archivo(destino, filas)
+            db.execute(delete(_L).where(_L.id.in_(ids)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        total += len(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retención de logs de auditoría")
+    parser.add_argument("--meses", type=int, default=MESES_DEFECTO,
+                        help=f"meses que se conservan en logs_auditoria (defecto {MESES_DEFECTO})")
+    parser.add_argument("--modo", choices=("archivo", "tabla", "borrar"), default=MODO_DEFECTO)
+    parser.add_argument("--dry-run", action="store_true", help="solo muestra lo que se movería")
+    args = parser.parse_args()
+
+    if args.meses < 1:
+        raise SystemExit("❌ --meses debe ser al menos 1")
+
+    Base.metadata.create_all(bind=engine)
+    asegurar_esquema(engine)
+
+    ahora = datetime.now()
+    corte = _sumar_meses(datetime(ahora.year, ahora.month, 1), -args.meses)
+    print(f"🗓️  Corte: logs anteriores a {corte:%Y-%m-%d} · modo {args.modo}")
+
+    db = SessionLocal()
+    try:
+        meses = _meses_a_procesar(db, corte)
+        if not meses:
+            print("✅ Nada que retener")
+            return
+
+        total = 0
+        for inicio, fin in meses:
+            if args.dry_run:
+                n = db.scalar(select(func.count()).where(_L.fecha >= inicio, _L.fecha < fin))
+                if n:
+                    print(f"   {inicio:%Y-%m}: {n} logs")
+                total += n
+                continue
+            n = procesar_mes(db, inicio, fin, args.modo)
+            if n:
+                print(f"📦 {inicio:%Y-%m}: {n} logs → {args.modo}")
+            total += n
+
+        verbo = "se moverían" if args.dry_run else "procesados"
+        print(f"✅ {total} logs {verbo}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error en la retención de logs: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
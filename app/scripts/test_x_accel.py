@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Prueba de integración de PDF_DELIVERY=x-accel (app/descargas.py) con
+un proxy de juguete que imita a nginx.
+
+Uso (desde la raíz del proyecto):
+    python -m app.scripts.test_x_accel
+
+No necesita nginx ni MySQL: usa una SQLite temporal, una carpeta
+temporal como PDF_ACCEL_RAIZ y un proxy HTTP local que
+    - reenvía cada petición a la app (en proceso)
+    - si la respuesta trae X-Accel-Redirect, sirve él mismo el archivo
+      de la raíz interna (con Range), como `location ... { internal; }`
+    - responde 404 a quien pida la location interna directamente
+Comprueba que la autorización sigue en la app (401 / 403 sin bytes),
+que el archivo llega completo y por rangos a través del proxy, que la
+cabecera interna no se filtra al cliente, que el 304 lo sigue dando
+la app y que la auditoría cuenta una sola descarga.
+"""
+
+import http.client
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote
+
+TMP = Path(tempfile.mkdtemp(prefix="x_accel_"))
+RAIZ = TMP / "pdfs"
+PREFIJO = "/_pdfs/"
+
+# Antes de importar la app: descargas lee PDF_DELIVERY al cargar
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP / 'prueba.db'}"
+os.environ["PDF_DELIVERY"] = "x-accel"
+os.environ["PDF_ACCEL_RAIZ"] = str(RAIZ)
+os.environ["PDF_ACCEL_PREFIJO"] = PREFIJO
+os.environ["CACHE_BACKEND"] = "ninguno"
+os.environ["ALLOWED_HOSTS"] = "testserver"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app import models  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.security import hash_pin  # noqa: E402
+
+PIN = "482915"
+_app = TestClient(app)
+_app_lock = threading.Lock()   # TestClient no es para varios hilos a la vez
+
+# Cabeceras de la respuesta de la app que nginx conserva tras el X-Accel-Redirect
+_CONSERVADAS = {"content-type", "content-disposition", "cache-control", "accept-ranges",
+                "x-content-type-options", "set-cookie", "expires"}
+
+
+# ══════════════════════════════════════════════════════════════
+#  PROXY DE JUGUETE ("nginx")
+# ══════════════════════════════════════════════════════════════
+
+class ProxyNginx(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status: int, headers: dict, cuerpo: bytes = b""):
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _interno(self, uri: str, arriba: dict):
+        """location /_pdfs/ { internal; alias RAIZ/; }"""
+        archivo = (RAIZ / unquote(uri[len(PREFIJO):])).resolve()
+        if not archivo.is_relative_to(RAIZ.resolve()) or not archivo.is_file():
+            return self._responder(404, {})
+        datos = archivo.read_bytes()
+        headers = {k: v for k, v in arriba.items() if k.lower() in _CONSERVADAS}
+
+        m = re.fullmatch(r"bytes=(\d*)-(\d*)", self.headers.get("Range", "").replace(" ", ""))
+        if m and (m.group(1) or m.group(2)):
+            if m.group(1):
+                inicio = int(m.group(1))
+                fin = min(int(m.group(2)), len(datos) - 1) if m.group(2) else len(datos) - 1
+            else:
+                inicio, fin = max(len(datos) - int(m.group(2)), 0), len(datos) - 1
+            if inicio >= len(datos) or fin < inicio:
+                return self._responder(416, {"Content-Range": f"bytes */{len(datos)}"})
+            headers["Content-Range"] = f"bytes {inicio}-{fin}/{len(datos)}"
+            return self._responder(206, headers, datos[inicio:fin + 1])
+        return self._responder(200, headers, datos)
+
+    def _reenviar(self):
+        if self.path.startswith(PREFIJO):
+            return self._responder(404, {})   # internal: solo por X-Accel-Redirect
+        cuerpo = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        reenviadas = {k: v for k, v in self.headers.items() if k.lower() not in ("host", "content-length")}
+        with _app_lock:
+            r = _app.request(self.command, self.path, headers=reenviadas, content=cuerpo,
+                             follow_redirects=False)
+        accel = r.headers.get("x-accel-redirect")
+        if accel:
+            return self._interno(accel, dict(r.headers))
+        headers = {k: v for k, v in r.headers.items()
+                   if k.lower() not in ("content-length", "transfer-encoding", "connection")}
+        return self._responder(r.status_code, headers, r.content)
+
+    do_GET = _reenviar
+    do_POST = _reenviar
+
+
+# ══════════════════════════════════════════════════════════════
+#  CLIENTE
+# ══════════════════════════════════════════════════════════════
+
+def pedir(puerto: int, metodo: str, ruta: str, headers: dict = None, cuerpo: bytes = None):
+    conn = http.client.HTTPConnection("127.0.0.1", puerto, timeout=10)
+    conn.request(metodo, ruta, body=cuerpo, headers=headers or {})
+    r = conn.getresponse()
+    datos = r.read()
+    conn.close()
+    return r.status, {k.lower(): v for k, v in r.getheaders()}, datos
+
+
+def login(puerto: int, cedula: str) -> dict:
+    status, headers, _ = pedir(
+        puerto, "POST", "/auth/login",
+        {"Content-Type": "application/x-www-form-urlencoded"},
+        f"cedula={cedula}&pin={PIN}".encode(),
+    )
+    assert status == 200, f"login {cedula}: {status}"
+    token = re.search(r"access_token=(\"[^\"]*\"|[^;]*)", headers["set-cookie"]).group(1)
+    return {"Cookie": f"access_token={token}"}
+
+
+def _preparar_datos():
+    db = SessionLocal()
+    usuarios = []
+    for cedula, nombre in (("1000001", "Juan Perez"), ("1000002", "Ana Gomez")):
+        u = models.Usuario(cedula=cedula, nombre_visible=nombre, rol="user", pin_hash=hash_pin(PIN), activo=1)
+        db.add(u)
+        db.commit()
+        usuarios.append(u.id)
+
+    dentro = RAIZ / "usuarios" / str(usuarios[0]) / "reportes" / "reporte 1.pdf"
+    dentro.parent.mkdir(parents=True)
+    dentro.write_bytes(b"%PDF-1.4\n" + os.urandom(200_000) + b"\n%%EOF\n")
+    fuera = TMP / "fuera.pdf"
+    fuera.write_bytes(b"%PDF-1.4\n" + os.urandom(5_000) + b"\n%%EOF\n")
+
+    ids = []
+    for path in (dentro, fuera):
+        r = models.ReporteInspeccion(nombre_conductor="Juan Perez", archivo_pdf=str(path),
+                                     usuario_id=usuarios[0], ciclo=1)
+        db.add(r)
+        db.commit()
+        ids.append(r.id)
+    db.close()
+    return ids, dentro.read_bytes(), fuera.read_bytes()
+
+
+def _descargas_auditadas() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(models.LogAuditoria).filter_by(accion="DESCARGAR_REPORTE").count()
+    finally:
+        db.close()
+
+
+# ══════════════════════════════════════════════════════════════
+#  PRUEBA
+# ══════════════════════════════════════════════════════════════
+
+def main():
+    (id_dentro, id_fuera), pdf, pdf_fuera = _preparar_datos()
+    proxy = ThreadingHTTPServer(("127.0.0.1", 0), ProxyNginx)
+    threading.Thread(target=proxy.serve_forever, daemon=True).start()
+    puerto = proxy.server_address[1]
+    ruta = f"/inspecciones/reporte-consolidado/{id_dentro}"
+    fallos = []
+
+    def comprobar(nombre: str, condicion: bool):
+        print(f"{'✅' if condicion else '❌'} {nombre}")
+        if not condicion:
+            fallos.append(nombre)
+
+    try:
+        status, _, datos = pedir(puerto, "GET", ruta)
+        comprobar("sin sesión: rechazado y sin bytes del PDF", status in (401, 403, 302) and pdf not in datos)
+
+        conductor = login(puerto, "1000001")
+        otro = login(puerto, "1000002")
+
+        status, _, datos = pedir(puerto, "GET", ruta, otro)
+        comprobar("otro conductor: 403 sin bytes del PDF", status == 403 and not datos.startswith(b"%PDF"))
+
+        # La app sola: cuerpo vacío y la cabecera para el proxy
+        with _app_lock:
+            directa = _app.get(ruta, headers=conductor)
+        comprobar("la app responde X-Accel-Redirect sin cuerpo",
+                  directa.headers.get("x-accel-redirect", "").startswith(PREFIJO) and directa.content == b"")
+
+        status, headers, datos = pedir(puerto, "GET", ruta, conductor)
+        comprobar("por el proxy: 200 con el PDF completo", status == 200 and datos == pdf)
+        comprobar("cabecera interna no llega al cliente", "x-accel-redirect" not in headers)
+        comprobar("Content-Disposition y Cache-Control de la app conservados",
+                  "reporte 1.pdf" in headers.get("content-disposition", "")
+                  and "immutable" in headers.get("cache-control", ""))
+
+        status, headers, datos = pedir(puerto, "GET", ruta, {**conductor, "Range": "bytes=100000-"})
+        comprobar("Range resuelto por el proxy: 206 con el resto",
+                  status == 206 and datos == pdf[100000:]
+                  and headers.get("content-range") == f"bytes 100000-{len(pdf) - 1}/{len(pdf)}")
+
+        status, _, _ = pedir(puerto, "GET", ruta, {**conductor, "If-None-Match": directa.headers["etag"]})
+        comprobar("If-None-Match con el ETag de la app: 304", status == 304)
+
+        status, _, datos = pedir(puerto, "GET", PREFIJO + "usuarios/1/reportes/reporte%201.pdf", conductor)
+        comprobar("location interna pedida directamente: 404", status == 404 and datos != pdf)
+
+        status, headers, datos = pedir(puerto, "GET", f"/inspecciones/reporte-consolidado/{id_fuera}", conductor)
+        comprobar("PDF fuera de PDF_ACCEL_RAIZ: lo sirve la app",
+                  status == 200 and datos == pdf_fuera and "x-accel-redirect" not in headers)
+
+        # Completa + consulta directa a la app + fuera de la raíz; ni el 206 de continuación ni el 304
+        comprobar("auditoría: una entrada por descarga nueva", _descargas_auditadas() == 3)
+    finally:
+        proxy.shutdown()
+        shutil.rmtree(TMP, ignore_errors=True)
+
+    if fallos:
+        print(f"\n❌ {len(fallos)} comprobaciones fallaron")
+        sys.exit(1)
+    print("\n✅ PDF_DELIVERY=x-accel OK")
+
+
+if __name__ == "__main__":
+    main()
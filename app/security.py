@@ -15,14 +15,24 @@
 
 import bcrypt
 import hashlib
+import jwt
+import logging
+import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
 from fastapi import Header, HTTPException, Depends, Request
 from fastapi.security.utils import get_authorization_scheme_param
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
 
-from app.database import SessionLocal
-from app.models import Usuario
+from app import metricas
+from app.database import SessionLocal, get_db, upsert_incremento
+from app.models import Usuario, SesionEpoca, SesionRevocada
+
+_log = logging.getLogger("security")
 
 
 # ══════════════════════════════════════════════════════════════
@@ -34,6 +44,23 @@ MAX_PIN_LENGTH  = 20
 BCRYPT_ROUNDS   = 12
 DEFAULT_TOKEN_EXPIRATION_HOURS = 24
 
+# Caché de sesiones (token → usuario) — ver _CacheSesiones
+TOKEN_CACHE_MAX     = int(os.getenv("TOKEN_CACHE_MAX", "2048"))
+TOKEN_CACHE_TTL_SEG = int(os.getenv("TOKEN_CACHE_TTL_SEG", "30"))
+
+# Modo de sesión:
+#   opaco   → token hex aleatorio guardado en usuarios.token (defecto,
+#             una sesión por usuario)
+#   firmado → JWT HS256 firmado con SECRET_KEY; se valida sin BD y
+#             permite varias sesiones (dispositivos) por usuario
+SESSION_MODE            = os.getenv("SESSION_MODE", "opaco").lower()
+SECRET_KEY              = os.getenv("SECRET_KEY", "")
+JWT_ALGORITHM           = "HS256"
+REVOCACION_CACHE_TTL_SEG = int(os.getenv("REVOCACION_CACHE_TTL_SEG", "15"))
+
+if SESSION_MODE == "firmado" and len(SECRET_KEY) < 32:
+    raise RuntimeError("❌ SESSION_MODE=firmado requiere SECRET_KEY de al menos 32 caracteres")
+
 _PINES_PROHIBIDOS = {
     "0000","1234","4321","1111","2222","3333","4444","5555",
     "6666","7777","8888","9999",
@@ -161,16 +188,325 @@ def calcular_expiracion(horas: int = DEFAULT_TOKEN_EXPIRATION_HOURS) -> datetime
 
 
 # ══════════════════════════════════════════════════════════════
-#  DEPENDENCIAS FASTAPI
+#  CACHÉ DE SESIONES (token → usuario)
+#
+#  get_current_user corre en TODOS los requests autenticados
+#  (incluido el polling de /auth/verify). En vez de un SELECT por
+#  token, guardamos una foto de las columnas del usuario durante
+#  TOKEN_CACHE_TTL_SEG segundos en un LRU acotado.
+#
+#  Se invalida explícitamente en logout, cambio de PIN y en las
+#  rutas admin que suspenden / editan / eliminan usuarios. Es por
+#  worker: entre workers el TTL corto acota la desincronización.
+# ══════════════════════════════════════════════════════════════
+
+class _CacheSesiones:
+    def __init__(self, max_entradas: int, ttl_seg: int):
+        self.max_entradas = max_entradas
+        self.ttl_seg = ttl_seg
+        self._datos: OrderedDict = OrderedDict()   # token → (guardado_en, columnas)
+        self._por_usuario: dict = {}               # usuario_id → {tokens}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expirados = 0
+        self.desalojados = 0
+        self.invalidaciones = 0
+
+    def obtener(self, token: str):
+        with self._lock:
+            item = self._datos.get(token)
+            if item is None:
+                self.misses += 1
+                return None
+            guardado_en, columnas = item
+            if time.monotonic() - guardado_en > self.ttl_seg:
+                self._quitar(token)
+                self.expirados += 1
+                self.misses += 1
+                return None
+            self._datos.move_to_end(token)
+            self.hits += 1
+            return columnas
+
+    def guardar(self, token: str, columnas: dict):
+        if self.max_entradas <= 0:
+            return
+        with self._lock:
+            self._quitar(token)
+            self._datos[token] = (time.monotonic(), columnas)
+            self._por_usuario.setdefault(columnas["id"], set()).add(token)
+            while len(self._datos) > self.max_entradas:
+                viejo, _ = next(iter(self._datos.items()))
+                self._quitar(viejo)
+                self.desalojados += 1
+
+    def invalidar_token(self, token: str):
+        with self._lock:
+            self._quitar(token)
+            self.invalidaciones += 1
+
+    def invalidar_usuario(self, usuario_id: int):
+        with self._lock:
+            for token in list(self._por_usuario.get(usuario_id, ())):
+                self._quitar(token)
+            self.invalidaciones += 1
+
+    def _quitar(self, token: str):
+        item = self._datos.pop(token, None)
+        if item is None:
+            return
+        usuario_id = item[1]["id"]
+        tokens = self._por_usuario.get(usuario_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._por_usuario[usuario_id]
+
+    def estadisticas(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entradas": len(self._datos),
+            "max_entradas": self.max_entradas,
+            "ttl_seg": self.ttl_seg,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirados": self.expirados,
+            "desalojados": self.desalojados,
+            "invalidaciones": self.invalidaciones,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+_cache_sesiones = _CacheSesiones(TOKEN_CACHE_MAX, TOKEN_CACHE_TTL_SEG)
+metricas.registrar("cache_sesiones", _cache_sesiones.estadisticas)
+
+
+def invalidar_sesion(token: str):
+    """Quita un token concreto de la caché de sesiones."""
+    _cache_sesiones.invalidar_token(token)
+
+
+def invalidar_sesiones_usuario(usuario_id: int):
+    """Quita de la caché todas las sesiones de un usuario."""
+    _cache_sesiones.invalidar_usuario(usuario_id)
+
+
+def _columnas_usuario(usuario: Usuario) -> dict:
+    return {c.key: getattr(usuario, c.key) for c in Usuario.__table__.columns}
+
+
+def _usuario_desde_cache(db: Session, columnas: dict) -> Usuario:
+    """
+    Reconstruye el Usuario cacheado y lo adjunta a la sesión SIN SELECT
+    (merge con load=False). Las rutas pueden modificarlo y hacer commit
+    igual que con uno leído de la BD.
+    """
+    usuario = Usuario(**columnas)
+    make_transient_to_detached(usuario)
+    return db.merge(usuario, load=False)
+
+
+def _validar_vigencia(token_expira, activo):
+    if not token_expira:
+        raise HTTPException(
+            status_code=401,
+            detail="Token sin fecha de expiración. Contacta al administrador."
+        )
+
+    if token_expira < datetime.utcnow():
+        raise HTTPException(
+            status_code=401,
+            detail="Sesión expirada. Por favor inicia sesión nuevamente."
+        )
+
+    if not activo:
+        raise HTTPException(
+            status_code=403,
+            detail="Usuario inactivo. Contacta al administrador."
+        )
+
+
 # ══════════════════════════════════════════════════════════════
+#  TOKENS FIRMADOS (SESSION_MODE=firmado)
+#
+#  Claims: sub (usuario id), rol, exp, iat, jti (id del token),
+#  ep (época de sesión del usuario al emitirlo).
+#
+#  Revocación sin consulta por request:
+#    - logout          → jti a `sesiones_revocadas` (hasta su exp)
+#    - suspensión, PIN, edición/eliminación admin
+#                      → sube la época en `sesiones_epoca`; todo
+#                        token con ep menor queda inválido
+#  Cada worker guarda ambas tablas en memoria y las relee cada
+#  REVOCACION_CACHE_TTL_SEG segundos. Los cambios hechos en el
+#  propio worker se aplican al instante.
+# ══════════════════════════════════════════════════════════════
+
+def es_token_firmado(token: str) -> bool:
+    return SESSION_MODE == "firmado" and token.count(".") == 2
+
+
+class _EstadoRevocacion:
+    def __init__(self, ttl_seg: int):
+        self.ttl_seg = ttl_seg
+        self._jtis: set = set()
+        self._epocas: dict = {}
+        self._cargado_en = float("-inf")
+        self._lock = threading.Lock()
+        self.recargas = 0
+        self.errores = 0
+
+    def _refrescar_si_hace_falta(self):
+        if time.monotonic() - self._cargado_en < self.ttl_seg:
+            return
+        db = SessionLocal()
+        try:
+            ahora = datetime.utcnow()
+            jtis = {
+                jti for (jti,) in
+                db.query(SesionRevocada.jti).filter(SesionRevocada.expira > ahora)
+            }
+            epocas = dict(db.query(SesionEpoca.usuario_id, SesionEpoca.epoca).all())
+        except Exception:
+            # BD caída: se mantiene la última foto y se reintenta en el próximo TTL
+            self.errores += 1
+            _log.exception("No se pudo recargar la lista de revocación")
+            self._cargado_en = time.monotonic()
+            return
+        finally:
+            db.close()
+
+        with self._lock:
+            self._jtis = jtis
+            self._epocas = epocas
+            self._cargado_en = time.monotonic()
+            self.recargas += 1
+
+    def revocado(self, claims: dict) -> bool:
+        self._refrescar_si_hace_falta()
+        if claims.get("jti") in self._jtis:
+            return True
+        return int(claims.get("ep", 0)) < self._epocas.get(int(claims["sub"]), 0)
+
+    def marcar_jti(self, jti: str):
+        with self._lock:
+            self._jtis.add(jti)
+
+    def marcar_epoca(self, usuario_id: int, epoca: int):
+        with self._lock:
+            self._epocas[usuario_id] = max(epoca, self._epocas.get(usuario_id, 0))
+
+    def estadisticas(self) -> dict:
+        return {
+            "modo": SESSION_MODE,
+            "jtis_revocados": len(self._jtis),
+            "usuarios_con_epoca": len(self._epocas),
+            "ttl_seg": self.ttl_seg,
+            "recargas": self.recargas,
+            "errores": self.errores,
+        }
+
+
+_revocacion = _EstadoRevocacion(REVOCACION_CACHE_TTL_SEG)
+metricas.registrar("revocacion_sesiones", _revocacion.estadisticas)
+
+
+def _epoca_actual(db: Session, usuario_id: int) -> int:
+    return db.query(SesionEpoca.epoca).filter(SesionEpoca.usuario_id == usuario_id).scalar() or 0
+
+
+def emitir_token_firmado(db: Session, usuario: Usuario, horas: int = DEFAULT_TOKEN_EXPIRATION_HOURS):
+    """Genera un JWT de sesión. Returns: (token, expiracion_utc_naive)."""
+    ahora = datetime.now(timezone.utc)
+    expira = ahora + timedelta(hours=horas)
+    claims = {
+        "sub": str(usuario.id),
+        "rol": usuario.rol,
+        "iat": ahora,
+        "exp": expira,
+        "jti": secrets.token_hex(16),
+        "ep": _epoca_actual(db, usuario.id),
+    }
+    token = jwt.encode(claims, SECRET_KEY, algorithm=JWT_ALGORITHM)
+    return token, expira.replace(tzinfo=None)
+
+
+def decodificar_token_firmado(token: str) -> dict:
+    """
+    Verifica firma, expiración y revocación. Sin acceso a BD
+    (salvo la recarga periódica de la lista de revocación).
 
-def get_db():
-    db = SessionLocal()
+    Raises:
+        HTTPException 401: firma inválida, expirado o revocado.
+    """
     try:
-        yield db
-    finally:
-        db.close()
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(
+            status_code=401,
+            detail="Sesión expirada. Por favor inicia sesión nuevamente."
+        )
+    except jwt.InvalidTokenError:
+        raise HTTPException(
+            status_code=401,
+            detail="Sesión no válida. Por favor inicia sesión nuevamente."
+        )
+
+    if _revocacion.revocado(claims):
+        raise HTTPException(
+            status_code=401,
+            detail="Sesión cerrada. Por favor inicia sesión nuevamente."
+        )
+    return claims
+
+
+def revocar_token_firmado(db: Session, claims: dict):
+    """Logout de UN dispositivo: agrega el jti a la lista. NO hace commit."""
+    expira = datetime.fromtimestamp(int(claims["exp"]), tz=timezone.utc).replace(tzinfo=None)
+    db.query(SesionRevocada).filter(SesionRevocada.expira < datetime.utcnow()).delete(
+        synchronize_session=False
+    )
+    db.add(SesionRevocada(jti=claims["jti"], usuario_id=int(claims["sub"]), expira=expira))
+    _revocacion.marcar_jti(claims["jti"])
+
+
+def revocar_sesiones_usuario(db: Session, usuario_id: int):
+    """
+    Invalida TODOS los tokens firmados del usuario subiendo su época
+    (también el de quien llama: emitir uno nuevo tras el commit si debe
+    seguir dentro). No-op en modo opaco (allí basta con limpiar
+    usuarios.token). NO hace commit: la época nueva se marca en la
+    caché local cuando el commit de `db` sale bien.
+    """
+    if SESSION_MODE != "firmado":
+        return
+    upsert_incremento(
+        db, SesionEpoca,
+        {"usuario_id": usuario_id},
+        {"epoca": 1},
+        {"actualizado": datetime.now()},
+    )
+    db.info.setdefault("epocas_pendientes", {})[usuario_id] = _epoca_actual(db, usuario_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _aplicar_epocas(db: Session):
+    for usuario_id, epoca in db.info.pop("epocas_pendientes", {}).items():
+        _revocacion.marcar_epoca(usuario_id, epoca)
+
 
+@event.listens_for(Session, "after_rollback")
+def _descartar_epocas(db: Session):
+    db.info.pop("epocas_pendientes", None)
+
+
+# ══════════════════════════════════════════════════════════════
+#  DEPENDENCIAS FASTAPI
+#  get_db es el de app.database: FastAPI cachea la dependencia por
+#  request, así que el usuario y la ruta comparten UNA sesión (y
+#  una sola conexión del pool).
+# ══════════════════════════════════════════════════════════════
 
 def get_current_user(
     request: Request,
@@ -209,6 +545,14 @@ def get_current_user(
             detail="Se requiere autenticación. Inicia sesión para continuar."
         )
 
+    if es_token_firmado(token):
+        return _usuario_de_token_firmado(request, token, db)
+
+    columnas = _cache_sesiones.obtener(token)
+    if columnas is not None:
+        _validar_vigencia(columnas["token_expira"], columnas["activo"])
+        return _usuario_desde_cache(db, columnas)
+
     usuario = db.query(Usuario).filter(Usuario.token == token).first()
 
     if not usuario:
@@ -217,24 +561,34 @@ def get_current_user(
             detail="Sesión no válida. Por favor inicia sesión nuevamente."
         )
 
-    if not usuario.token_expira:
-        raise HTTPException(
-            status_code=401,
-            detail="Token sin fecha de expiración. Contacta al administrador."
-        )
+    _validar_vigencia(usuario.token_expira, usuario.activo)
+
+    _cache_sesiones.guardar(token, _columnas_usuario(usuario))
+    return usuario
 
-    if usuario.token_expira < datetime.utcnow():
-        raise HTTPException(
-            status_code=401,
-            detail="Sesión expirada. Por favor inicia sesión nuevamente."
-        )
 
-    if hasattr(usuario, "activo") and not usuario.activo:
+def _usuario_de_token_firmado(request: Request, token: str, db: Session) -> Usuario:
+    """Camino de get_current_user para SESSION_MODE=firmado."""
+    claims = decodificar_token_firmado(token)
+    request.state.sesion = claims
+
+    columnas = _cache_sesiones.obtener(token)
+    if columnas is not None:
+        usuario = _usuario_desde_cache(db, columnas)
+    else:
+        usuario = db.get(Usuario, int(claims["sub"]))
+        if not usuario:
+            raise HTTPException(
+                status_code=401,
+                detail="Sesión no válida. Por favor inicia sesión nuevamente."
+            )
+        _cache_sesiones.guardar(token, _columnas_usuario(usuario))
+
+    if not usuario.activo:
         raise HTTPException(
             status_code=403,
             detail="Usuario inactivo. Contacta al administrador."
         )
-
     return usuario
 
 
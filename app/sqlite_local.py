@@ -0,0 +1,258 @@
+# app/sqlite_local.py
+# ─────────────────────────────────────────────────────────────
+#  SQLite como backend de primera clase (sucursales pequeñas)
+#
+#  Las sucursales corren la app en un mini-PC sin servidor MySQL.
+#  Con DATABASE_URL=sqlite:////ruta/misionales.db (ver
+#  app/database.py) cada conexión nueva recibe:
+#
+#    journal_mode=WAL     lectores y un escritor a la vez; las lecturas
+#                         no esperan a los submits
+#    synchronous=NORMAL   fsync solo en checkpoint (seguro con WAL: un
+#                         corte de luz puede perder la última
+#                         transacción, no corromper la BD)
+#    cache_size           SQLITE_CACHE_MB de páginas en memoria
+#    mmap_size            SQLITE_MMAP_MB del archivo mapeado: lecturas
+#                         sin copiar páginas → sub-milisegundo
+#    busy_timeout         SQLITE_BUSY_TIMEOUT_MS esperando el lock de
+#                         escritura antes de "database is locked"
+#    temp_store=MEMORY    ORDER BY / GROUP BY temporales en RAM
+#
+#  Escritor único: SQLite admite UN escritor. Una transacción que
+#  empieza leyendo (snapshot) y luego escribe falla al instante con
+#  SQLITE_BUSY si otro escribió entretanto (el busy_timeout no
+#  aplica). escritura(db) pone los submits en cola:
+#    - cierra la transacción de lectura previa (auth, validaciones)
+#    - espera su turno: lock del proceso (entre hilos) + flock sobre
+#      <bd>.escritor.lock (entre workers de gunicorn), como mucho
+#      SQLITE_BUSY_TIMEOUT_MS; agotado, sigue sin turno y decide el
+#      busy_timeout de SQLite (como sin cola)
+#    - BEGIN IMMEDIATE: el lock de escritura se toma al empezar
+#  Desde rutas async usar escritura_async(db): la espera corre en el
+#  threadpool y el event loop sigue atendiendo requests mientras
+#  otro worker escribe (escritura() bloquearía el hilo del loop).
+#  Con MySQL es un no-op.
+#
+#  Métricas → /api/admin/metricas ("sqlite", solo con SQLite)
+#  Comparativa con MySQL: python -m app.scripts.bench_sqlite
+# ─────────────────────────────────────────────────────────────
+
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import metricas
+
+try:
+    import fcntl
+except ImportError:   # Windows: solo cola por proceso (el busy_timeout cubre el resto)
+    fcntl = None
+
+_log = logging.getLogger("sqlite_local")
+
+SQLITE_SYNCHRONOUS     = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").strip().upper()
+SQLITE_CACHE_MB        = int(os.getenv("SQLITE_CACHE_MB", "64"))
+SQLITE_MMAP_MB         = int(os.getenv("SQLITE_MMAP_MB", "256"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+MODOS_SYNCHRONOUS = ("OFF", "NORMAL", "FULL", "EXTRA")
+if SQLITE_SYNCHRONOUS not in MODOS_SYNCHRONOUS:
+    raise RuntimeError(
+        f"❌ SQLITE_SYNCHRONOUS inválido: {SQLITE_SYNCHRONOUS!r} (use {' | '.join(MODOS_SYNCHRONOUS)})"
+    )
+
+_cola = threading.Lock()
+_lock_stats = threading.Lock()
+_archivo_lock = {"ruta": None, "fd": None}
+_stats = {
+    "conexiones": 0,
+    "escrituras": 0,
+    "espera_ms_total": 0.0,
+    "espera_ms_max": 0.0,
+    "en_cola": 0,
+    "esperas_agotadas": 0,
+    "journal_mode": None,
+}
+
+
+def es_sqlite(url) -> bool:
+    return str(url).startswith("sqlite")
+
+
+# ══════════════════════════════════════════════════════════════
+#  PRAGMAS POR CONEXIÓN
+# ══════════════════════════════════════════════════════════════
+
+def _al_conectar(dbapi_conn, registro):
+    cursor = dbapi_conn.cursor()
+    try:
+        modo = cursor.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_MB * 1024}")        # negativo = KiB
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_MB * 1024 * 1024}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+    if modo != "wal" and _stats["journal_mode"] != modo:
+        # BD en memoria o sistema de archivos sin memoria compartida (red)
+        _log.warning("SQLite sin WAL (journal_mode=%s): lecturas y escrituras se bloquearán entre sí", modo)
+    with _lock_stats:
+        _stats["conexiones"] += 1
+        _stats["journal_mode"] = modo
+
+
+def opciones_engine() -> dict:
+    """connect_args de create_engine para un archivo SQLite."""
+    return {
+        "connect_args": {
+            "check_same_thread": False,               # el pool reparte conexiones entre hilos
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+        },
+    }
+
+
+def instalar(engine: Engine):
+    """Engancha los pragmas, la cola de escritura y las métricas a un engine SQLite. Idempotente."""
+    if not event.contains(engine, "connect", _al_conectar):
+        event.listen(engine, "connect", _al_conectar)
+    # La cola es la del primer engine (la primaria); una réplica SQLite no escribe
+    if _archivo_lock["ruta"] is None and engine.url.database and engine.url.database != ":memory:":
+        _archivo_lock["ruta"] = f"{engine.url.database}.escritor.lock"
+    metricas.registrar("sqlite", estadisticas)
+
+
+# ══════════════════════════════════════════════════════════════
+#  ESCRITOR ÚNICO
+# ══════════════════════════════════════════════════════════════
+
+def _flock_con_limite(fd, limite: float) -> bool:
+    """flock exclusivo esperando hasta `limite` (monotonic). False si se agota."""
+    pausa = 0.001
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            if time.monotonic() >= limite:
+                return False
+            time.sleep(min(pausa, max(limite - time.monotonic(), 0)))
+            pausa = min(pausa * 2, 0.05)
+
+
+def _tomar_turno() -> tuple:
+    """
+    Espera el turno de escritura (bloqueante, acotado por
+    SQLITE_BUSY_TIMEOUT_MS). Returns: (cola_tomada, flock_tomado)
+    para _soltar_turno.
+    """
+    with _lock_stats:
+        _stats["en_cola"] += 1
+    t0 = time.perf_counter()
+    limite = time.monotonic() + SQLITE_BUSY_TIMEOUT_MS / 1000
+    cola = _cola.acquire(timeout=SQLITE_BUSY_TIMEOUT_MS / 1000)
+    archivo = False
+    if cola and fcntl is not None and _archivo_lock["ruta"] is not None:
+        if _archivo_lock["fd"] is None:
+            # Un descriptor por proceso: dentro del proceso ya serializa _cola
+            _archivo_lock["fd"] = open(_archivo_lock["ruta"], "a+")
+        archivo = _flock_con_limite(_archivo_lock["fd"], limite)
+    espera_ms = (time.perf_counter() - t0) * 1000
+    with _lock_stats:
+        _stats["en_cola"] -= 1
+        _stats["escrituras"] += 1
+        _stats["espera_ms_total"] += espera_ms
+        _stats["espera_ms_max"] = max(_stats["espera_ms_max"], espera_ms)
+        if not cola or (fcntl is not None and _archivo_lock["ruta"] is not None and not archivo):
+            _stats["esperas_agotadas"] += 1
+    return cola, archivo
+
+
+def _soltar_turno(turno: tuple):
+    cola, archivo = turno
+    if archivo:
+        fcntl.flock(_archivo_lock["fd"], fcntl.LOCK_UN)
+    if cola:
+        _cola.release()
+
+
+def _escribir(db: Session, turno: tuple):
+    try:
+        db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+    except Exception:
+        _soltar_turno(turno)
+        raise
+    return turno
+
+
+@contextmanager
+def escritura(db: Session):
+    """
+    Serializa la transacción de escritura del bloque. El bloque debe
+    hacer su propio commit; si lanza, se hace rollback antes de ceder
+    el turno. Con MySQL no hace nada. Espera bloqueando el hilo: desde
+    rutas async, escritura_async().
+
+    Hace commit de lo que la sesión tuviera pendiente antes de entrar.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        yield
+        return
+
+    db.commit()   # termina el snapshot de lectura (auth, validaciones)
+    turno = _escribir(db, _tomar_turno())
+    try:
+        yield
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        _soltar_turno(turno)
+
+
+@asynccontextmanager
+async def escritura_async(db: Session):
+    """
+    escritura() para rutas async (submit): la espera del turno va al
+    threadpool. run_in_threadpool no se cancela a mitad, así que un
+    turno tomado siempre llega al finally que lo suelta.
+    """
+    if db.get_bind().dialect.name != "sqlite":
+        yield
+        return
+
+    db.commit()   # termina el snapshot de lectura (auth, validaciones)
+    turno = _escribir(db, await run_in_threadpool(_tomar_turno))
+    try:
+        yield
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        _soltar_turno(turno)
+
+
+def estadisticas() -> dict:
+    with _lock_stats:
+        n = _stats["escrituras"]
+        return {
+            **_stats,
+            "espera_ms_total": round(_stats["espera_ms_total"], 1),
+            "espera_ms_max": round(_stats["espera_ms_max"], 1),
+            "espera_ms_promedio": round(_stats["espera_ms_total"] / n, 2) if n else 0.0,
+            "config": {
+                "synchronous": SQLITE_SYNCHRONOUS,
+                "cache_mb": SQLITE_CACHE_MB,
+                "mmap_mb": SQLITE_MMAP_MB,
+                "busy_timeout_ms": SQLITE_BUSY_TIMEOUT_MS,
+                "lock_entre_workers": fcntl is not None and _archivo_lock["ruta"] is not None,
+            },
+        }
@@ -116,8 +116,8 @@ self.addEventListener('fetch', (event) => {
   return event.respondWith(
     fetch(request)
       .then(response => {
-        // Cachear páginas HTML exitosas
-        if (response.ok && request.method === 'GET') {
+        // Cachear páginas HTML exitosas (solo 200: Cache Storage no admite 206 de descargas por rangos)
+        if (response.status === 200 && request.method === 'GET') {
           const responseClone = response.clone();
           caches.open(CACHE_NAME).then(cache => {
             cache.put(request, responseClone);
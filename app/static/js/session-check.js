@@ -9,6 +9,9 @@
  * - Aumenta timeout a 10 segundos (conexión lenta)
  * - Verifica cada 10 minutos (no cada 5)
  * - Advertencias en console, sin logout forzado
+ * - Con sesión válida emite el evento "session:activa" en document:
+ *   las páginas lo usan para refrescar sus datos (lista_inspecciones
+ *   pide solo los cambios: 304 si no hay nada nuevo)
  * 
  * INSTALACIÓN:
  *   1. Copiar este archivo a: app/static/js/session-check.js
@@ -74,6 +77,7 @@
             rol: data.rol,
             expires_at: data.expires_at
           });
+          document.dispatchEvent(new CustomEvent('session:activa', { detail: data }));
           return true;
         } else {
           console.warn('⚠️ [SESSION] Sesión no válida según servidor');
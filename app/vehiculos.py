@@ -0,0 +1,140 @@
+# app/vehiculos.py
+# ─────────────────────────────────────────────────────────────
+#  Registro de vehículos (tabla vehiculos, clave = placa)
+#
+#  Cada inspección repite los datos fijos del vehículo (marca,
+#  modelo, motor, línea, documentos) y el conductor los vuelve a
+#  escribir en form.html todos los días.
+#
+#  Ahora:
+#    registrar() → UN UPSERT por submit, en su misma transacción:
+#                  inspecciones + 1 y los últimos valores NO vacíos
+#    prefill()   → datos para precargar el formulario al escribir
+#                  la placa (GET /inspecciones/vehiculo/{placa}),
+#                  cacheados con clave "vehiculos:<placa>"
+#
+#  La placa es la de normalize_placa(), la misma que queda en
+#  inspecciones.placa_norm (indexada): "inspecciones del vehículo
+#  X" es un rango por índice y se puede unir con esta tabla.
+#
+#  Las inspecciones conservan su copia de los datos: el PDF es un
+#  registro de lo declarado ESE día (el SOAT vigente de hoy puede
+#  estar vencido mañana).
+#
+#  Filas anteriores: backfill "vehiculos_v1".
+# ─────────────────────────────────────────────────────────────
+
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import cache, models
+from app.database import upsert_incremento
+from app.migraciones import backfill
+
+_V = models.Vehiculo
+_MODELOS = (models.InspeccionArchivo, models.Inspeccion)
+
+# Datos del vehículo que se guardan y precargan (gasolina no: es el nivel del día)
+CAMPOS = (
+    "tipo_vehiculo", "marca", "modelo", "motor", "linea",
+    "porte_propiedad", "soat", "certificado_emision", "poliza_seguro",
+)
+# Fechas de vencimiento del vehículo (ver app/vencimientos.py)
+FECHAS = ("soat_venc", "tecnomecanica_venc")
+
+
+def _clave_cache(placa: str) -> str:
+    return f"vehiculos:{placa}"
+
+
+# ══════════════════════════════════════════════════════════════
+#  API
+# ══════════════════════════════════════════════════════════════
+
+def registrar(db: Session, inspeccion: models.Inspeccion):
+    """
+    Upsert del vehículo de la inspección (placa ya normalizada).
+    Solo pisa los campos que vienen con valor. NO hace commit:
+    tras el commit del submit llamar a invalidar(placa).
+    """
+    if not inspeccion.placa:
+        return
+    asignar = {c: getattr(inspeccion, c) for c in CAMPOS if (getattr(inspeccion, c) or "").strip()}
+    asignar.update({c: getattr(inspeccion, c) for c in FECHAS if getattr(inspeccion, c) is not None})
+    asignar.update(
+        ultimo_usuario_id=inspeccion.usuario_id,
+        ultima_inspeccion=inspeccion.fecha,
+        actualizado=datetime.now(),
+    )
+    upsert_incremento(db, _V, {"placa": inspeccion.placa}, {"inspecciones": 1}, asignar=asignar)
+
+
+def invalidar(placa: str):
+    cache.invalidar(_clave_cache(placa))
+
+
+def prefill(db: Session, placa: str):
+    """Datos para precargar el formulario, o None si la placa no está registrada. Cacheado."""
+    def calcular():
+        v = db.get(_V, placa)
+        if v is None:
+            return None
+        return {
+            "placa": v.placa,
+            **{c: getattr(v, c) or "" for c in CAMPOS},
+            **{c: getattr(v, c).isoformat() if getattr(v, c) else "" for c in FECHAS},
+            "ultima_inspeccion": v.ultima_inspeccion.isoformat() if v.ultima_inspeccion else None,
+            "inspecciones": v.inspecciones,
+        }
+
+    return cache.obtener(_clave_cache(placa), calcular)
+
+
+# ══════════════════════════════════════════════════════════════
+#  BACKFILL — registro desde el historial de inspecciones
+# ══════════════════════════════════════════════════════════════
+
+@backfill("vehiculos_v1", origen=(models.Inspeccion, models.InspeccionArchivo))
+def backfill_vehiculos(db: Session) -> int:
+    """
+    Recorre ambas tablas (archivo y caliente) y deja por placa el
+    último valor no vacío de cada campo, el total de inspecciones y
+    la última inspección. Sobrescribe filas existentes.
+    """
+    from app.routes.inspecciones import normalize_placa
+
+    columnas = ("placa", "fecha", "usuario_id") + CAMPOS
+    vehiculos: dict = {}
+    for M in _MODELOS:
+        consulta = select(*(getattr(M, c) for c in columnas)).order_by(M.fecha, M.id)
+        for fila in db.execute(consulta):
+            placa = normalize_placa(fila.placa)
+            if not placa:
+                continue
+            fecha = fila.fecha or datetime.min
+            v = vehiculos.setdefault(placa, {"inspecciones": 0, "ultima": (datetime.min, None), "campos": {}})
+            v["inspecciones"] += 1
+            if fecha >= v["ultima"][0]:
+                v["ultima"] = (fecha, fila.usuario_id)
+            for c in CAMPOS:
+                valor = getattr(fila, c)
+                if (valor or "").strip() and fecha >= v["campos"].get(c, (datetime.min, None))[0]:
+                    v["campos"][c] = (fecha, valor)
+
+    for placa, v in vehiculos.items():
+        fecha, usuario_id = v["ultima"]
+        upsert_incremento(
+            db, _V, {"placa": placa}, {},
+            asignar={
+                **{c: valor for c, (_, valor) in v["campos"].items()},
+                "inspecciones": v["inspecciones"],
+                "ultimo_usuario_id": usuario_id,
+                "ultima_inspeccion": fecha if fecha != datetime.min else None,
+                "actualizado": datetime.now(),
+            },
+        )
+    db.commit()
+    cache.invalidar("vehiculos:")
+    return len(vehiculos)
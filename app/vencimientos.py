@@ -0,0 +1,228 @@
+# app/vencimientos.py
+# ─────────────────────────────────────────────────────────────
+#  Vencimientos de documentos: licencia, SOAT y tecnomecánica
+#
+#  Antes: licencia_venc era texto libre en tres formatos y el
+#  submit lo parseaba dos veces con un bucle de strptime; SOAT y
+#  tecnomecánica no tenían fecha. "Licencias que vencen en 30
+#  días" era un full scan + parseo en Python.
+#
+#  Ahora:
+#    parsear_fecha()  → una sola vez al recibir el formulario
+#    inspecciones.licencia_venc_fecha / soat_venc / tecnomecanica_venc
+#                       columnas DATE (la de licencia con índice)
+#    vehiculos.soat_venc / tecnomecanica_venc
+#                       última fecha declarada por placa, con índice
+#
+#  Consultas (rangos por índice, sin parsear nada):
+#    licencias → candidatos con licencia_venc_fecha en el rango y,
+#                solo para ellos, MAX por usuario (índice usuario_id,
+#                licencia_venc_fecha): un conductor que ya declaró una
+#                licencia renovada no sale en la lista
+#    vehículos → rango directo sobre vehiculos.<documento>
+#
+#  La lista se precalcula cada noche en alertas_vencimiento
+#  (python -m app.scripts.precalcular_vencimientos) y el panel la
+#  lee de ahí; GET /api/admin/vencimientos calcula en vivo si la
+#  lista no es de hoy o se pide una ventana mayor que la guardada.
+#
+#  Filas anteriores: backfill "vencimientos_v1" (licencia_venc → DATE).
+# ─────────────────────────────────────────────────────────────
+
+import os
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from app import cache, models, replica
+from app.migraciones import backfill
+
+VENCIMIENTOS_DIAS = int(os.getenv("VENCIMIENTOS_DIAS", "30"))
+
+FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y")
+
+_MODELOS = (models.Inspeccion, models.InspeccionArchivo)
+_V = models.Vehiculo
+_A = models.AlertaVencimiento
+_LOTE_BACKFILL = 2000
+
+# documento → columna de vehiculos
+DOCUMENTOS_VEHICULO = {
+    "soat":          _V.soat_venc,
+    "tecnomecanica": _V.tecnomecanica_venc,
+}
+
+
+def parsear_fecha(texto: str):
+    """'2026-03-01' | '01/03/2026' | '01-03-2026' → date. None si viene vacío o no se reconoce."""
+    if not texto or not texto.strip():
+        return None
+    for fmt in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+# ══════════════════════════════════════════════════════════════
+#  CONSULTAS EN VIVO
+# ══════════════════════════════════════════════════════════════
+
+def _licencias(db: Session, desde: date, hasta: date) -> list:
+    candidatos = set()
+    for M in _MODELOS:
+        candidatos.update(db.scalars(
+            select(M.usuario_id)
+            .where(M.licencia_venc_fecha >= desde, M.licencia_venc_fecha <= hasta)
+            .distinct()
+        ))
+    candidatos.discard(None)
+    if not candidatos:
+        return []
+
+    # Licencia vigente = la más reciente declarada por el conductor
+    vigente: dict = {}
+    for M in _MODELOS:
+        for uid, fecha in db.execute(
+            select(M.usuario_id, func.max(M.licencia_venc_fecha))
+            .where(M.usuario_id.in_(candidatos))
+            .group_by(M.usuario_id)
+        ):
+            if fecha and (uid not in vigente or fecha > vigente[uid]):
+                vigente[uid] = fecha
+
+    usuarios = {
+        u.id: u for u in db.scalars(
+            select(models.Usuario).where(models.Usuario.id.in_(list(vigente)))
+        )
+    }
+    alertas = []
+    for uid, vence in vigente.items():
+        if not desde <= vence <= hasta:
+            continue
+        u = usuarios.get(uid)
+        alertas.append({
+            "documento": "licencia",
+            "usuario_id": uid,
+            "placa": None,
+            "titular": (u.nombre_visible or u.nombre or u.cedula) if u else None,
+            "vence": vence,
+        })
+    return alertas
+
+
+def _documentos_vehiculo(db: Session, desde: date, hasta: date) -> list:
+    U = models.Usuario
+    alertas = []
+    for documento, columna in DOCUMENTOS_VEHICULO.items():
+        filas = db.execute(
+            select(_V.placa, _V.ultimo_usuario_id, columna, U.nombre_visible, U.nombre)
+            .outerjoin(U, U.id == _V.ultimo_usuario_id)
+            .where(columna >= desde, columna <= hasta)
+        )
+        for placa, uid, vence, nombre_visible, nombre in filas:
+            alertas.append({
+                "documento": documento,
+                "usuario_id": uid,
+                "placa": placa,
+                "titular": nombre_visible or nombre,
+                "vence": vence,
+            })
+    return alertas
+
+
+def calcular(db: Session, dias: int = VENCIMIENTOS_DIAS, hoy: date = None) -> list:
+    """Documentos que vencen entre hoy y hoy + dias, ordenados por fecha de vencimiento."""
+    hoy = hoy or date.today()
+    hasta = hoy + timedelta(days=dias)
+    alertas = _licencias(db, hoy, hasta) + _documentos_vehiculo(db, hoy, hasta)
+    return sorted(alertas, key=lambda a: (a["vence"], a["documento"], a["placa"] or "", a["usuario_id"] or 0))
+
+
+# ══════════════════════════════════════════════════════════════
+#  LISTA PRECALCULADA (alertas_vencimiento)
+# ══════════════════════════════════════════════════════════════
+
+def precalcular(db: Session, dias: int = VENCIMIENTOS_DIAS) -> int:
+    """Reemplaza la lista precalculada en una sola transacción. Returns: alertas."""
+    alertas = calcular(db, dias)
+    ahora = datetime.now()
+    hasta = ahora.date() + timedelta(days=dias)
+    try:
+        db.execute(delete(_A))
+        if alertas:
+            db.execute(_A.__table__.insert(), [{**a, "calculado": ahora, "hasta": hasta} for a in alertas])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    cache.invalidar("vencimientos:")
+    return len(alertas)
+
+
+def _precalculadas(db: Session) -> dict:
+    def leer():
+        filas = db.scalars(select(_A).order_by(_A.vence, _A.id)).all()
+        return {
+            "calculado": max((f.calculado for f in filas), default=None),
+            "hasta": min((f.hasta for f in filas if f.hasta), default=None),
+            "alertas": [
+                {"documento": f.documento, "usuario_id": f.usuario_id, "placa": f.placa,
+                 "titular": f.titular, "vence": f.vence}
+                for f in filas
+            ],
+        }
+
+    return cache.obtener("vencimientos:lista", leer, guardar=not replica.es_replica(db))
+
+
+def proximos(db: Session, dias: int = VENCIMIENTOS_DIAS) -> dict:
+    """
+    Vencimientos de los próximos `dias`. Usa la lista de la noche si
+    es de hoy y cubre la ventana pedida; si no, calcula en vivo.
+    """
+    hoy = date.today()
+    hasta = hoy + timedelta(days=dias)
+    lista = _precalculadas(db)
+    if lista["calculado"] and lista["calculado"].date() == hoy and lista["hasta"] and hasta <= lista["hasta"]:
+        alertas = [a for a in lista["alertas"] if hoy <= a["vence"] <= hasta]
+        return {"origen": "precalculado", "calculado": lista["calculado"], "alertas": alertas}
+    return {"origen": "vivo", "calculado": datetime.now(), "alertas": calcular(db, dias, hoy)}
+
+
+# ══════════════════════════════════════════════════════════════
+#  BACKFILL — licencia_venc (texto) → licencia_venc_fecha (DATE)
+# ══════════════════════════════════════════════════════════════
+
+@backfill("vencimientos_v1", origen=(models.Inspeccion, models.InspeccionArchivo))
+def backfill_vencimientos(db: Session) -> int:
+    """
+    Parsea licencia_venc de las filas sin fecha, por lotes de id, en
+    la tabla caliente y en el archivo. Textos no reconocidos quedan
+    en NULL. SOAT y tecnomecánica no tienen historial que migrar.
+    """
+    total = 0
+    for M in _MODELOS:
+        ultimo_id = 0
+        while True:
+            filas = db.execute(
+                select(M.id, M.licencia_venc)
+                .where(M.id > ultimo_id, M.licencia_venc_fecha.is_(None), M.licencia_venc.is_not(None))
+                .order_by(M.id)
+                .limit(_LOTE_BACKFILL)
+            ).all()
+            if not filas:
+                break
+            ultimo_id = filas[-1].id
+            cambios = [
+                {"id": f.id, "licencia_venc_fecha": fecha}
+                for f in filas
+                if (fecha := parsear_fecha(f.licencia_venc)) is not None
+            ]
+            if cambios:
+                db.execute(update(M), cambios)
+            db.commit()
+            total += len(cambios)
+    return total